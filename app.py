@@ -1,20 +1,28 @@
 #region IMPORTS
 import sys
 import os
+import bisect
 from PyQt5.QtGui import *
 from PyQt5.QtCore import *
 from PyQt5.QtWidgets import *
 
-from mesh_model import MeshModel
+from inspect import currentframe, getframeinfo
+from mesh_model import EmptySource, MeshModel, COMPARISON_STAGES
+from mesh_distance import DISTANCE_PERCENTILES
+from mesh_lod import decimateMesh
 
-import vtk
-
-from vtkmodules.vtkCommonColor import vtkNamedColors
-from vtk.qt.QVTKRenderWindowInteractor import QVTKRenderWindowInteractor # type: ignore
+# The OpenGL backend and the default interactor styles register themselves on import, nothing is used from them directly
+import vtkmodules.vtkInteractionStyle
+import vtkmodules.vtkRenderingOpenGL2
+from vtkmodules.qt.QVTKRenderWindowInteractor import QVTKRenderWindowInteractor # type: ignore
 from vtkmodules.vtkCommonColor import vtkNamedColors
+from vtkmodules.vtkCommonCore import vtkLookupTable
 from vtkmodules.vtkInteractionWidgets import vtkCameraOrientationWidget
+from vtkmodules.vtkRenderingCore import vtkActor, vtkDataSetMapper, vtkPolyDataMapper, vtkRenderer
 #endregion IMPORTS
 
+RESOURCE_SCAN_DELAY = 200														# Milliseconds the resources folder must be quiet before it is rescanned
+
 class App(QMainWindow):
 	def __init__(self):
 		super().__init__()
@@ -43,7 +51,7 @@ class TabContainer(QWidget):
 		super(QWidget, self).__init__(parent)
 		self.layout = QVBoxLayout(self)
 
-		self.resourceList = os.listdir(os.path.join(os.getcwd(), 'resources'))
+		self.resourceCatalog = ResourceCatalog(os.path.join(os.getcwd(), 'resources'), self)
 
 		# Initialize tab objects
 		self.tabs = QTabWidget()
@@ -71,7 +79,7 @@ class TabContainer(QWidget):
 
 		self.loadHboxAB = QHBoxLayout()
 		self.loadInputAB = QComboBox()
-		self.loadInputAB.addItems(self.resourceList)
+		self.loadInputAB.setModel(self.resourceCatalog.model)
 		self.loadButtonAB = QPushButton("Load Mesh", self)
 		self.loadButtonAB.clicked.connect(lambda:self.loadMesh(self.vtkFrameAB, self.loadInputAB))
 		self.loadHboxAB.addWidget(self.loadInputAB)
@@ -130,6 +138,13 @@ class TabContainer(QWidget):
 
 		self.scalingGbox.setLayout(self.scalingGboxLayout)
 
+		self.propertiesGboxAB = QGroupBox("Mesh Properties")
+		self.propertiesGboxLayoutAB = QVBoxLayout()
+		self.propertiesGboxLayoutAB.addWidget(self.volumeLabelAB)
+		self.propertiesGboxLayoutAB.addWidget(self.areaLabelAB)
+		self.propertiesGboxAB.setLayout(self.propertiesGboxLayoutAB)
+
+		self.editVboxAB.addWidget(self.propertiesGboxAB)
 		self.editVboxAB.addWidget(self.loadSaveGboxAB)
 		self.editVboxAB.addWidget(self.creationGbox)
 		self.editVboxAB.addWidget(self.scalingGbox)
@@ -166,7 +181,7 @@ class TabContainer(QWidget):
 		self.sourceHbox = QHBoxLayout()
 		self.sourceLabel = QLabel("Source Mesh:",  minimumWidth=80)
 		self.sourceInput = QComboBox()
-		self.sourceInput.addItems(self.resourceList)
+		self.sourceInput.setModel(self.resourceCatalog.model)
 		self.sourceLoadButton = QPushButton("Load")
 		self.sourceLoadButton.clicked.connect(lambda:self.loadMesh(self.vtkFrameCSource, self.sourceInput))
 		self.sourceHbox.addWidget(self.sourceLabel)
@@ -177,7 +192,7 @@ class TabContainer(QWidget):
 		self.targetHbox = QHBoxLayout()
 		self.targetLabel = QLabel("Target Mesh:", minimumWidth=80)
 		self.targetInput = QComboBox()
-		self.targetInput.addItems(self.resourceList)
+		self.targetInput.setModel(self.resourceCatalog.model)
 		self.targetLoadButton = QPushButton("Load")
 		self.targetLoadButton.clicked.connect(lambda:self.loadMesh(self.vtkFrameCTarget, self.targetInput))
 		self.targetHbox.addWidget(self.targetLabel)
@@ -185,20 +200,32 @@ class TabContainer(QWidget):
 		self.targetHbox.addWidget(self.targetLoadButton)
 		self.comparisonGboxLayout.addLayout(self.targetHbox)
 
+		self.comparisonWorker = None
 		self.compareButton = QPushButton("Compare Meshes")
 		self.compareButton.clicked.connect(lambda:self.compareMeshes(self.vtkFrameCSource, self.vtkFrameCTarget, self.vtkFrameCComparison, 0.01))
 		self.comparisonGboxLayout.addWidget(self.compareButton)
 
+		self.compareProgress = QProgressBar()
+		self.compareProgress.setRange(0, len(COMPARISON_STAGES))
+		self.comparisonGboxLayout.addWidget(self.compareProgress)
+
 		self.compareResultsHeading = QLabel("Calculated Hausdorff Distances:")
 		self.compareNoAlignResult = QLabel("\tBefore aligning: ")
 		self.compareBBResult = QLabel("\tAligned using oriented bounding box: ")
 		self.compareICPResult = QLabel("\tAligned using IterativeClosestPoint: ")
+		self.compareDeviationResult = QLabel("\tDeviation after aligning: ")
 		self.compareOverallResult = QLabel("Overall Result: ")
+		self.compareStageLabels = {
+			"noAlignment": (self.compareNoAlignResult, "\tBefore aligning: "),
+			"obb": (self.compareBBResult, "\tAligned using oriented bounding box: "),
+			"icp": (self.compareICPResult, "\tAligned using IterativeClosestPoint: "),
+		}
 
 		self.comparisonGboxLayout.addWidget(self.compareResultsHeading)
 		self.comparisonGboxLayout.addWidget(self.compareNoAlignResult)
 		self.comparisonGboxLayout.addWidget(self.compareBBResult)
 		self.comparisonGboxLayout.addWidget(self.compareICPResult)
+		self.comparisonGboxLayout.addWidget(self.compareDeviationResult)
 		self.comparisonGboxLayout.addWidget(self.compareOverallResult)
 
 		self.comparisonGbox.setLayout(self.comparisonGboxLayout)
@@ -221,6 +248,7 @@ class TabContainer(QWidget):
 			return
 		vtkFrame.meshModel.setSphereSource(float(radiusInput.text()))	# safe to cast as we already have double validator and empty check
 		vtkFrame.refreshMapper()
+		self.updateMeshProperties(vtkFrame)
 		vtkFrame.resetCamera()
 		radiusInput.clear()
 
@@ -229,6 +257,7 @@ class TabContainer(QWidget):
 			return
 		vtkFrame.meshModel.setConeSource(float(radiusInput.text()), float(heightInput.text()))	# safe to cast as we already have double validator and empty check
 		vtkFrame.refreshMapper()
+		self.updateMeshProperties(vtkFrame)
 		vtkFrame.resetCamera()
 		radiusInput.clear()
 		heightInput.clear()
@@ -246,6 +275,7 @@ class TabContainer(QWidget):
 			msg.exec_()
 			return
 		vtkFrame.refreshMapper()
+		self.updateMeshProperties(vtkFrame)
 		vtkFrame.resetCamera()
 	
 	def saveMesh(self, vtkFrame, saveInput):
@@ -260,65 +290,356 @@ class TabContainer(QWidget):
 			msg.setWindowTitle("Error")
 			msg.exec_()
 			return
-		vtkFrame.refreshMapper()
 		saveInput.clear()
-		self.updateResourceList()
+		self.resourceCatalog.scheduleScan()										# The watcher sees the new file too, but not on every filesystem
 	
 	def scaleMesh(self, vtkFrame, scaleInput):
 		if scaleInput.text() == "":
 			return
 		vtkFrame.meshModel.scaleMesh(float(scaleInput.text()))	# safe to cast as we already have double validator and empty check
 		vtkFrame.refreshMapper()
+		self.updateMeshProperties(vtkFrame)
 		scaleInput.clear()
 
 	def resetMeshScale(self, vtkFrame):
 		vtkFrame.meshModel.resetScale()
 		vtkFrame.refreshMapper()
+		self.updateMeshProperties(vtkFrame)
+
+	def updateMeshProperties(self, vtkFrame):
+		# Only the first tab shows mesh properties. They are cached on the model, so this is cheap after every edit.
+		if vtkFrame is not self.vtkFrameAB:
+			return
+		self.volumeLabelAB.setText("Volume: {:0.5f}".format(vtkFrame.meshModel.getVolume()))
+		self.areaLabelAB.setText("Area: {:0.5f}".format(vtkFrame.meshModel.getSurfaceArea()))
 
 	def resetCamera(self, vtkFrame):
 		vtkFrame.resetCamera()
 
 	def compareMeshes(self, vtkFrameSource, vtkFrameTarget, vtkFrameResult, threshold):
-		result, transformedSource, originalDistance, obbDist, icpDist = MeshModel.compareMeshes(vtkFrameSource.meshModel, vtkFrameTarget.meshModel, threshold)
+		# The compare button doubles as the cancel button while a comparison is running
+		if self.comparisonWorker is not None:
+			self.comparisonWorker.cancel()
+			self.compareButton.setEnabled(False)								# Re-enabled once the worker has actually stopped
+			return
+
+		for label, text in self.compareStageLabels.values():
+			label.setText(text)
+		self.compareDeviationResult.setText("\tDeviation after aligning: ")
+		self.compareOverallResult.setText("Overall Result: Comparing...")
+		self.compareOverallResult.setStyleSheet("")
+		self.compareProgress.setValue(0)
+		self.compareButton.setText("Cancel")
+		self.sourceLoadButton.setEnabled(False)									# The meshes must not change under the running comparison
+		self.targetLoadButton.setEnabled(False)
+
+		self.comparisonWorker = ComparisonWorker(vtkFrameSource.meshModel, vtkFrameTarget.meshModel, threshold)
+		self.comparisonWorker.signals.stageFinished.connect(lambda stage, distance, alignedSource:self.showComparisonStage(vtkFrameTarget, vtkFrameResult, stage, distance, alignedSource))
+		self.comparisonWorker.signals.finished.connect(lambda comparison:self.showComparisonResult(vtkFrameTarget, vtkFrameResult, comparison))
+		self.comparisonWorker.signals.cancelled.connect(self.showComparisonCancelled)
+		QThreadPool.globalInstance().start(self.comparisonWorker)
+
+	def showComparisonStage(self, vtkFrameTarget, vtkFrameResult, stage, distance, alignedSource):
+		label, text = self.compareStageLabels[stage]
+		label.setText("{}{:0.5f}".format(text, distance))
+		self.compareProgress.setValue(COMPARISON_STAGES.index(stage) + 1)
+		if alignedSource is None:
+			return
 		vtkFrameResult.clearActors()
-		vtkFrameResult.addActor(vtkFrameTarget.meshModel.vtkSource.GetOutput(), 1.0, 'Red')
-		vtkFrameResult.addActor(transformedSource, 0.6, 'White')
-		vtkFrameResult.resetCamera()
+		vtkFrameResult.addActor(vtkFrameTarget.meshModel.vtkSource.GetOutput(), 1.0, 'Red', meshModel=vtkFrameTarget.meshModel)
+		vtkFrameResult.addActor(alignedSource, 0.6, 'White')
+		if stage == COMPARISON_STAGES[0]:
+			vtkFrameResult.resetCamera()
+
+	def showComparisonResult(self, vtkFrameTarget, vtkFrameResult, comparison):
+		self.finishComparison()
+		if comparison is None:
+			self.compareOverallResult.setText("Overall Result: Error")
+			return
+
+		# The aligned source is only built here, for display, colored by each point's distance to the target
+		stats = comparison.distanceField.sourceStats
+		vtkFrameResult.clearActors()
+		vtkFrameResult.addActor(vtkFrameTarget.meshModel.vtkSource.GetOutput(), 0.3, 'White', meshModel=vtkFrameTarget.meshModel)
+		vtkFrameResult.addActor(comparison.alignedSource(), 1.0, 'White', (0.0, stats.maximum))
+		self.compareDeviationResult.setText("\tDeviation after aligning: mean {:0.5f}, RMS {:0.5f}, 95% {:0.5f}".format(stats.mean, stats.rms, stats.percentiles[DISTANCE_PERCENTILES.index(95)]))
 
 		# Update distance labels
-		self.compareNoAlignResult.setText("\tBefore aligning: {:0.5f}".format(originalDistance))
-		self.compareBBResult.setText("\tAligned using oriented bounding box: {:0.5f}".format(obbDist))
-		self.compareICPResult.setText("\tAligned using IterativeClosestPoint: {:0.5f}".format(icpDist))
-		if result:
+		self.compareNoAlignResult.setText("\tBefore aligning: {:0.5f}".format(comparison.noAlignmentHausDist))
+		self.compareBBResult.setText("\tAligned using oriented bounding box: {:0.5f}".format(comparison.obbAlignmentHausDist))
+		self.compareICPResult.setText("\tAligned using IterativeClosestPoint: {:0.5f}".format(comparison.icpHausDist))
+		if comparison.result:
 			self.compareOverallResult.setText("Overall Result: Same")
 			self.compareOverallResult.setStyleSheet("background-color: lightgreen")
 		else:
 			self.compareOverallResult.setText("Overall Result: Different")
 			self.compareOverallResult.setStyleSheet("background-color: lightpink")
 
-	def updateResourceList(self):
-		self.resourceList = os.listdir(os.path.join(os.getcwd(), 'resources'))
-		self.loadInputAB.clear()
-		self.loadInputAB.addItems(self.resourceList)
-		self.sourceInput.clear()
-		self.sourceInput.addItems(self.resourceList)
-		self.targetInput.clear()
-		self.targetInput.addItems(self.resourceList)
+	def showComparisonCancelled(self):
+		self.finishComparison()
+		self.compareOverallResult.setText("Overall Result: Cancelled")
+
+	def finishComparison(self):
+		self.comparisonWorker = None
+		self.compareButton.setText("Compare Meshes")
+		self.compareButton.setEnabled(True)
+		self.sourceLoadButton.setEnabled(True)
+		self.targetLoadButton.setEnabled(True)
 
 	def closeCleanly(self):
+		if self.comparisonWorker is not None:
+			self.comparisonWorker.cancel()
+		QThreadPool.globalInstance().waitForDone()								# Let a running comparison stop before its meshes are torn down
 		self.vtkFrameAB.closeCleanly()
 		self.vtkFrameCSource.closeCleanly()
 		self.vtkFrameCTarget.closeCleanly()
 		self.vtkFrameCComparison.closeCleanly()
 
 
+class ResourceCatalog(QObject):
+	"""
+    The names of the files in the resources folder, in one list model shared by every mesh combo box. A filesystem
+    watcher triggers a rescan when the folder changes, and only the names added or removed since the last scan are
+    inserted into or taken out of the model. The combo boxes keep their selections, and a folder of thousands of meshes
+    is only listed in full once.
+
+    Attributes:
+        directory (str): The resources folder.
+        model (QStringListModel): File names in the folder, sorted.
+        watcher (QFileSystemWatcher): Watches the folder for added, removed and renamed files.
+        scanTimer (QTimer): Single shot timer of the pending rescan. A burst of changes, such as copying many meshes
+            in, is scanned once after it settles.
+    """
+
+	def __init__(self, directory, parent=None):
+		"""
+        Initializes a ResourceCatalog object and lists the folder.
+
+        Args:
+            directory (str): The resources folder.
+            parent (QObject): Parent of the catalog.
+        """
+		super().__init__(parent)
+		self.directory = directory
+		self.model = QStringListModel(self)
+		self.watcher = QFileSystemWatcher(self)
+		self.watcher.directoryChanged.connect(self.scheduleScan)
+		self.scanTimer = QTimer(self)
+		self.scanTimer.setSingleShot(True)
+		self.scanTimer.setInterval(RESOURCE_SCAN_DELAY)
+		self.scanTimer.timeout.connect(self.scan)
+		self.scan()
+
+	def scheduleScan(self):
+		"""
+		Requests a rescan of the folder once it has stopped changing for a moment.
+
+		Args:
+			None
+
+		Returns:
+			None
+		"""
+		self.scanTimer.start()
+
+	def scan(self):
+		"""
+		Lists the folder and brings the model up to date with it. Runs of adjacent names are inserted or removed with one
+		model change each.
+
+		Args:
+			None
+
+		Returns:
+			None
+		"""
+		try:
+			names = sorted(entry.name for entry in os.scandir(self.directory) if entry.is_file())
+		except OSError as error:
+			frameinfo = getframeinfo(currentframe())
+			print("[ERROR][{}][{}]: Unable to list {}: {}".format(frameinfo.filename, frameinfo.lineno, self.directory, error))
+			names = []
+		if os.path.isdir(self.directory) and self.directory not in self.watcher.directories():
+			self.watcher.addPath(self.directory)								# Watching stops if the folder is removed, resume once it is back
+
+		current = self.model.stringList()
+		nameSet = set(names)
+		removedRows = [row for row, name in enumerate(current) if name not in nameSet]
+		for row, count in reversed(rowRuns(removedRows)):
+			self.model.removeRows(row, count)
+
+		kept = [name for name in current if name in nameSet]
+		keptSet = set(kept)
+		addedRows = []
+		for name in names:
+			if name not in keptSet:
+				addedRows.append(bisect.bisect_left(kept, name) + len(addedRows))	# Rows shift down by every name inserted above
+		for row, count in rowRuns(addedRows):
+			self.model.insertRows(row, count)
+			for offset in range(count):
+				self.model.setData(self.model.index(row + offset), names[row + offset])
+
+def rowRuns(rows) -> list[tuple[int, int]]:
+	"""
+	Groups sorted row numbers into runs of consecutive rows.
+
+	Args:
+		rows (list[int]): Row numbers in increasing order.
+
+	Returns:
+		list[tuple[int, int]]: First row and length of each run.
+	"""
+	runs = []
+	for row in rows:
+		if runs and runs[-1][0] + runs[-1][1] == row:
+			runs[-1] = (runs[-1][0], runs[-1][1] + 1)
+		else:
+			runs.append((row, 1))
+	return runs
+
+class ComparisonSignals(QObject):
+	"""
+    Signals of a ComparisonWorker. They are emitted from the worker's thread and delivered on the main thread.
+
+    Attributes:
+        stageFinished (pyqtSignal): Emitted as each stage of the comparison finishes, with the stage name, its distance
+            and the source in that stage's pose (None if not available). See MeshModel.compareMeshes.
+        finished (pyqtSignal): Emitted with the comparison's ComparisonResult once it has finished, None if it failed.
+        cancelled (pyqtSignal): Emitted once a cancelled comparison has stopped.
+    """
+	stageFinished = pyqtSignal(str, object, object)
+	finished = pyqtSignal(object)
+	cancelled = pyqtSignal()
+
+class ComparisonWorker(QRunnable):
+	"""
+    A mesh comparison run on a thread pool, so the window stays responsive while it runs.
+
+    Attributes:
+        sourceMesh (MeshModel): Source mesh to use in comparison. Must not be modified until the worker is done.
+        targetMesh (MeshModel): Target mesh to use in comparison. Must not be modified until the worker is done.
+        threshold (float): Hausdorff distance threshold to determine if the two meshes can be considered the same.
+        signals (ComparisonSignals): Progress and completion signals.
+        cancelRequested (bool): Whether cancel was called. The comparison stops at its next check.
+    """
+
+	def __init__(self, sourceMesh, targetMesh, threshold):
+		"""
+        Initializes a ComparisonWorker object.
+
+        Args:
+            sourceMesh (MeshModel): Source mesh to use in comparison.
+            targetMesh (MeshModel): Target mesh to use in comparison.
+            threshold (float): Hausdorff distance threshold to determine if the two meshes can be considered the same.
+        """
+		super().__init__()
+		self.sourceMesh = sourceMesh
+		self.targetMesh = targetMesh
+		self.threshold = threshold
+		self.signals = ComparisonSignals()
+		self.cancelRequested = False
+
+	def cancel(self):
+		"""
+		Asks the comparison to stop. It stops between stages or ICP steps, then emits cancelled.
+
+		Args:
+			None
+
+		Returns:
+			None
+		"""
+		self.cancelRequested = True
+
+	def run(self):
+		"""
+		Runs the comparison, emitting the worker's signals as it goes. Called on a pool thread.
+
+		Args:
+			None
+
+		Returns:
+			None
+		"""
+		try:
+			comparison = MeshModel.compareMeshesLazy(self.sourceMesh, self.targetMesh, self.threshold, progress=self.signals.stageFinished.emit, cancelled=lambda: self.cancelRequested, distances=True)
+		except Exception as error:
+			frameinfo = getframeinfo(currentframe())
+			print("[ERROR][{}][{}]: Comparison failed: {}".format(frameinfo.filename, frameinfo.lineno, error))
+			comparison = None
+
+		if self.cancelRequested:
+			self.signals.cancelled.emit()
+		else:
+			self.signals.finished.emit(comparison)
+
+class LevelSignals(QObject):
+	"""
+    Signals of a LevelWorker. They are emitted from the worker's thread and delivered on the main thread.
+
+    Attributes:
+        finished (pyqtSignal): Emitted with the worker and the coarse level it built, None if the mesh needs no level.
+    """
+	finished = pyqtSignal(object, object)
+
+class LevelWorker(QRunnable):
+	"""
+    Builds the coarse level of detail of an actor's mesh on a thread pool, so large meshes never block the window.
+
+    Attributes:
+        actor (vtkActor): Actor the level is drawn in place of while the camera is moving.
+        build (callable): Builds the level, returning a vtkPolyData or None.
+        signals (LevelSignals): Completion signal.
+    """
+
+	def __init__(self, actor, build):
+		"""
+        Initializes a LevelWorker object.
+
+        Args:
+            actor (vtkActor): Actor the level is drawn in place of while the camera is moving.
+            build (callable): Builds the level, returning a vtkPolyData or None.
+        """
+		super().__init__()
+		self.actor = actor
+		self.build = build
+		self.signals = LevelSignals()
+
+	def run(self):
+		"""
+		Builds the level and emits finished. Called on a pool thread.
+
+		Args:
+			None
+
+		Returns:
+			None
+		"""
+		try:
+			level = self.build()
+		except Exception as error:
+			frameinfo = getframeinfo(currentframe())
+			print("[ERROR][{}][{}]: Level of detail failed: {}".format(frameinfo.filename, frameinfo.lineno, error))
+			level = None
+		self.signals.finished.emit(self, level)
+
 class VtkFrame(QFrame):
 	"""
     A class representing a VTK mesh viewing frame.
 
+    Large meshes are drawn at a coarse level of detail while the camera is moving and at full resolution once it stops.
+    The levels are built on the thread pool, until one is ready the full mesh is drawn throughout. Changes made from
+    the GUI only request a render, all requests made before control returns to the event loop share one.
+
     Attributes:
         title (str): Title of the frame, placed on the top left.
         meshModel (MeshModel): Model of object that is to be presented in viewer.
+        mappedMesh (tuple[vtkAlgorithm, int]): Source the mapper is bound to and the modified time of its output when
+            last refreshed, see refreshMapper.
+        renderTimer (QTimer): Single shot timer of the pending render, see requestRender.
+        levelMappers (dict[vtkActor, tuple[vtkMapper, vtkMapper]]): Full resolution and coarse mapper of each actor
+            that has a coarse level.
+        levelWorkers (dict[vtkActor, LevelWorker]): Latest level requested for each actor, older ones are discarded.
     """
 
 	def __init__(self, parent, title=""):
@@ -333,6 +654,14 @@ class VtkFrame(QFrame):
 
 		self.title = title
 		self.meshModel = MeshModel()
+		self.levelMappers = {}
+		self.levelWorkers = {}
+		self.mappedMesh = None
+
+		# Renders requested while handling one event are coalesced into one, run once control returns to the event loop
+		self.renderTimer = QTimer(self)
+		self.renderTimer.setSingleShot(True)
+		self.renderTimer.timeout.connect(self.renderNow)
 
 		self.colors = vtkNamedColors()
 
@@ -345,15 +674,15 @@ class VtkFrame(QFrame):
 		self.setLayout(self.vboxlayout)
 
 		# vtk renderer setup
-		self.renderer = vtk.vtkRenderer()
+		self.renderer = vtkRenderer()
 		self.vtkWidget.GetRenderWindow().AddRenderer(self.renderer)
 		self.interactor = self.vtkWidget.GetRenderWindow().GetInteractor()
 
 		# Set up a mapper
-		self.mapper = vtk.vtkPolyDataMapper()
+		self.mapper = vtkPolyDataMapper()
 
 		# Set up the source actor
-		self.actor = vtk.vtkActor()
+		self.actor = vtkActor()
 		self.actor.SetMapper(self.mapper)
 
 		# Set up the orientation marker actor
@@ -364,6 +693,7 @@ class VtkFrame(QFrame):
 		# Connect actors to renderer
 		self.renderer.AddActor(self.actor)
 		self.renderer.SetBackground(self.colors.GetColor3d("manganese_blue"))
+		self.renderer.AddObserver("StartEvent", self.selectLevels)
 
 		self.show()
 		self.interactor.Initialize()
@@ -371,7 +701,43 @@ class VtkFrame(QFrame):
 
 	def refreshMapper(self):
 		"""
-		Refresh mapper and render after vtk source update.
+		Refresh mapper and request a render after vtk source update. The mapper is only rebound when the model's source
+		has been replaced, and nothing is done if the source's output has not changed either.
+
+		Args:
+			None
+
+		Returns:
+			None
+		"""
+		if type(self.meshModel.vtkSource) != EmptySource:
+			source = self.meshModel.vtkSource
+			mappedMesh = (source, source.GetOutput().GetMTime())
+			if mappedMesh == self.mappedMesh:
+				return
+			if self.mappedMesh is None or self.mappedMesh[0] is not source:
+				self.mapper.SetInputConnection(source.GetOutputPort())
+			self.mappedMesh = mappedMesh
+			self.dropLevel(self.actor)
+			self.requestRender()
+			self.requestLevel(self.actor, self.meshModel.getInteractiveLevel)
+
+	def requestRender(self):
+		"""
+		Requests a render once control returns to the event loop. Requests made before then are merged into it.
+
+		Args:
+			None
+
+		Returns:
+			None
+		"""
+		if not self.renderTimer.isActive():
+			self.renderTimer.start(0)
+
+	def renderNow(self):
+		"""
+		Renders immediately, taking the place of any pending requested render.
 
 		Args:
 			None
@@ -379,9 +745,8 @@ class VtkFrame(QFrame):
 		Returns:
 			None
 		"""
-		if type(self.meshModel.vtkSource) != vtk.vtkEmptyRepresentation:
-			self.mapper.SetInputConnection(self.meshModel.vtkSource.GetOutputPort())
-			self.vtkWidget.GetRenderWindow().Render()	
+		self.renderTimer.stop()
+		self.vtkWidget.GetRenderWindow().Render()
 	
 	def resetCamera(self):
 		"""
@@ -394,7 +759,7 @@ class VtkFrame(QFrame):
 			None
 		"""
 		self.renderer.ResetCamera()
-		self.vtkWidget.GetRenderWindow().Render()	
+		self.requestRender()
 		
 	def clearActors(self):
 		"""
@@ -407,8 +772,10 @@ class VtkFrame(QFrame):
 			None
 		"""
 		self.renderer.RemoveAllViewProps()
+		for actor in list(self.levelMappers) + list(self.levelWorkers):
+			self.dropLevel(actor)
 		
-	def addActor(self, polyData, opacity, color):
+	def addActor(self, polyData, opacity, color, scalarRange=None, meshModel=None):
 		"""
 		Add actor to the renderer.
 
@@ -416,20 +783,107 @@ class VtkFrame(QFrame):
 			polyData (vtkPolyData): PolyData for the actor to use.
 			opacity (float): Opacity of the actor.
 			color (str): Color of the actor.
+			scalarRange (tuple[float]): Range of the polydata's point scalars to color as a heat map, blue to red. None to
+				use the color instead.
+			meshModel (MeshModel): Model whose current output the polydata is. Its cached coarse level is reused rather
+				than built again for this actor.
 
 		Returns:
 			None
 		"""
-		mapper = vtk.vtkDataSetMapper()
+		mapper = vtkDataSetMapper()
 		mapper.SetInputData(polyData)
-		actor = vtk.vtkActor()
+		if scalarRange is not None:
+			lookupTable = vtkLookupTable()
+			lookupTable.SetHueRange(0.667, 0.0)
+			lookupTable.Build()
+			mapper.SetLookupTable(lookupTable)
+			mapper.SetScalarModeToUsePointData()
+			mapper.SetScalarRange(*scalarRange)
+		actor = vtkActor()
 		actor.GetProperty().SetOpacity(opacity)
 		actor.GetProperty().SetDiffuseColor(self.colors.GetColor3d(color))
 		actor.SetMapper(mapper)
 		self.renderer.AddActor(actor)
-		self.vtkWidget.GetRenderWindow().Render()	
+		self.requestRender()
+		self.requestLevel(actor, meshModel.getInteractiveLevel if meshModel is not None else lambda: decimateMesh(polyData))
+
+	def requestLevel(self, actor, build):
+		"""
+		Starts building the coarse level of an actor's mesh on the thread pool. It replaces any level the actor had.
+
+		Args:
+			actor (vtkActor): Actor to draw the level in place of while the camera is moving.
+			build (callable): Builds the level, returning a vtkPolyData or None if the mesh needs none.
+
+		Returns:
+			None
+		"""
+		worker = LevelWorker(actor, build)
+		worker.signals.finished.connect(self.setLevel)
+		self.levelWorkers[actor] = worker
+		QThreadPool.globalInstance().start(worker)
+
+	def setLevel(self, worker, level):
+		"""
+		Gives an actor the coarse level a worker built, unless the actor has been removed or a newer level requested
+		since. The coarse mapper copies the full mapper's coloring.
+
+		Args:
+			worker (LevelWorker): The finished worker.
+			level (vtkPolyData): The coarse level, None if the mesh needs none.
+
+		Returns:
+			None
+		"""
+		if self.levelWorkers.get(worker.actor) is not worker:
+			return
+		del self.levelWorkers[worker.actor]
+		if level is None:
+			return
+
+		fullMapper = worker.actor.GetMapper()
+		coarseMapper = type(fullMapper)()
+		coarseMapper.ShallowCopy(fullMapper)
+		coarseMapper.SetInputData(level)
+		self.levelMappers[worker.actor] = (fullMapper, coarseMapper)
+
+	def dropLevel(self, actor):
+		"""
+		Forgets an actor's coarse level and any level still being built for it, restoring its full resolution mapper.
+
+		Args:
+			actor (vtkActor): The actor.
+
+		Returns:
+			None
+		"""
+		self.levelWorkers.pop(actor, None)
+		mappers = self.levelMappers.pop(actor, None)
+		if mappers is not None:
+			actor.SetMapper(mappers[0])
+
+	def selectLevels(self, renderer, event):
+		"""
+		Picks the mappers of the actors with a coarse level before each render. The interactor style raises the render
+		window's desired update rate while the camera is moving and drops it back to the still rate, then renders again,
+		once it stops.
+
+		Args:
+			renderer (vtkRenderer): The frame's renderer.
+			event (str): Name of the observed event.
+
+		Returns:
+			None
+		"""
+		moving = self.vtkWidget.GetRenderWindow().GetDesiredUpdateRate() > self.interactor.GetStillUpdateRate()
+		for actor, (fullMapper, coarseMapper) in self.levelMappers.items():
+			mapper = coarseMapper if moving else fullMapper
+			if actor.GetMapper() is not mapper:
+				actor.SetMapper(mapper)
 
 	def closeCleanly(self):
+		self.renderTimer.stop()
 		self.vtkWidget.GetRenderWindow().Finalize()
 		self.interactor.TerminateApp()
 
@@ -0,0 +1,273 @@
+#region IMPORTS
+import os
+import sys
+import time
+import argparse
+from typing import NamedTuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from mesh_cache import MeshCache
+from mesh_model import MeshModel
+#endregion IMPORTS
+
+MESH_EXTENSIONS = (".ply", ".vtp", ".obj", ".stl", ".vtk")
+
+# Meshes loaded by the current worker process, keyed by filepath. Targets are reused across many pairs
+# so keeping them around saves a reparse for every comparison the worker is handed.
+_workerMeshes = {}
+_WORKER_MESH_LIMIT = 64
+
+# On-disk parsed mesh caches opened by the current worker process, keyed by cache directory
+_workerCaches = {}
+
+class PairResult(NamedTuple):
+	"""
+    Result of comparing a single source/target pair.
+
+    Attributes:
+        source (str): Filepath of the source mesh.
+        target (str): Filepath of the target mesh.
+        result (bool): Whether the meshes were found to be the same.
+        noAlignmentHausDist (float): Hausdorff distance after no alignment.
+        obbAlignmentHausDist (float): Hausdorff distance after oriented bounding box alignment.
+        icpHausDist (float): Hausdorff distance after iterative closest point refinement.
+        seconds (float): Wall time spent on the pair inside the worker.
+        error (str): Reason the pair could not be compared, None on success.
+        alignedMatrix (tuple[float]): The 16 elements, row major, of the transform taking the source onto its best
+            alignment with the target. None if the unaligned source was best, or on error.
+    """
+	source: str
+	target: str
+	result: bool
+	noAlignmentHausDist: float
+	obbAlignmentHausDist: float
+	icpHausDist: float
+	seconds: float
+	error: str = None
+	alignedMatrix: tuple = None
+
+class BatchStats:
+	"""
+    Running throughput figures for a batch comparison.
+
+    Attributes:
+        total (int): Number of pairs submitted.
+        completed (int): Number of pairs finished so far.
+        failed (int): Number of finished pairs that reported an error.
+        startTime (float): perf_counter() value when the batch started.
+    """
+
+	def __init__(self, total):
+		"""
+        Initializes a BatchStats object.
+
+        Args:
+            total (int): Number of pairs submitted.
+        """
+		self.total = total
+		self.completed = 0
+		self.failed = 0
+		self.startTime = time.perf_counter()
+
+	def record(self, pairResult):
+		"""
+		Records a finished pair.
+
+		Args:
+			pairResult (PairResult): The finished pair.
+
+		Returns:
+			None
+		"""
+		self.completed += 1
+		if pairResult.error is not None:
+			self.failed += 1
+
+	def elapsed(self) -> float:
+		"""
+		Gets the wall time since the batch started.
+
+		Args:
+			None
+
+		Returns:
+			float: Elapsed seconds.
+		"""
+		return time.perf_counter() - self.startTime
+
+	def throughput(self) -> float:
+		"""
+		Gets the number of pairs completed per second of wall time.
+
+		Args:
+			None
+
+		Returns:
+			float: Pairs per second.
+		"""
+		elapsed = self.elapsed()
+		if elapsed <= 0:
+			return 0.0
+		return self.completed / elapsed
+
+	def summary(self) -> str:
+		"""
+		Gets a one line, human readable summary of the batch progress.
+
+		Args:
+			None
+
+		Returns:
+			str: Summary of completed pairs, elapsed time and throughput.
+		"""
+		return "{}/{} pairs in {:0.2f}s ({:0.2f} pairs/s, {} failed)".format(self.completed, self.total, self.elapsed(), self.throughput(), self.failed)
+
+def collectMeshPaths(inputs) -> list[str]:
+	"""
+	Expands a list of mesh files and/or directories into a sorted list of mesh filepaths. Directories are
+	searched (non-recursively) for files with a supported mesh extension.
+
+	Args:
+		inputs (str | list[str]): Filepaths and directories to expand.
+
+	Returns:
+		list[str]: Absolute filepaths of all meshes found.
+	"""
+	if isinstance(inputs, str):
+		inputs = [inputs]
+
+	paths = []
+	for entry in inputs:
+		if os.path.isdir(entry):
+			for name in sorted(os.listdir(entry)):
+				if os.path.splitext(name)[1].lower() in MESH_EXTENSIONS:
+					paths.append(os.path.abspath(os.path.join(entry, name)))
+		else:
+			paths.append(os.path.abspath(entry))
+	return paths
+
+def _loadWorkerMesh(filepath, cacheDir=None) -> MeshModel:
+	"""
+	Loads a mesh in the current worker, reusing a previously loaded copy if there is one.
+
+	Args:
+		filepath (str): Filepath of the mesh to load.
+		cacheDir (str): Optional directory of an on-disk MeshCache to load parsed meshes from.
+
+	Returns:
+		MeshModel: The loaded mesh, None if it could not be loaded.
+	"""
+	mesh = _workerMeshes.get(filepath)
+	if mesh is not None:
+		return mesh
+
+	cache = None
+	if cacheDir is not None:
+		cache = _workerCaches.get(cacheDir)
+		if cache is None:
+			cache = _workerCaches[cacheDir] = MeshCache(cacheDir)
+
+	mesh = MeshModel()
+	if not mesh.loadMesh(filepath, cache):
+		return None
+
+	if len(_workerMeshes) >= _WORKER_MESH_LIMIT:
+		_workerMeshes.pop(next(iter(_workerMeshes)))		# Drop the oldest entry
+	_workerMeshes[filepath] = mesh
+	return mesh
+
+def comparePair(sourcePath, targetPath, threshold, cacheDir=None, outOfCore=False) -> PairResult:
+	"""
+	Runs the full comparison pipeline (no alignment, OBB, ICP) for a single pair of mesh files. This is the
+	unit of work handed to each worker process, so it only returns picklable values.
+
+	Args:
+		sourcePath (str): Filepath of the source mesh.
+		targetPath (str): Filepath of the target mesh.
+		threshold (float): Hausdorff distance threshold to determine if the two meshes can be considered the same.
+		cacheDir (str): Optional directory of an on-disk MeshCache to load parsed meshes from.
+		outOfCore (bool): Whether to compare with bounded memory, see MeshModel.compareMeshes.
+
+	Returns:
+		PairResult: Outcome of the comparison.
+	"""
+	startTime = time.perf_counter()
+	try:
+		sourceMesh = _loadWorkerMesh(sourcePath, cacheDir)
+		targetMesh = _loadWorkerMesh(targetPath, cacheDir)
+		if sourceMesh is None or targetMesh is None:
+			failedPath = sourcePath if sourceMesh is None else targetPath
+			return PairResult(sourcePath, targetPath, False, None, None, None, time.perf_counter() - startTime, "Could not load {}".format(failedPath))
+
+		# Only the transform of the best alignment is sent back, the aligned mesh is never built
+		comparison = MeshModel.compareMeshesLazy(sourceMesh, targetMesh, threshold, outOfCore=outOfCore)
+	except Exception as error:
+		# One bad pair must not take the whole batch down with it, it is reported as failed like any other
+		return PairResult(sourcePath, targetPath, False, None, None, None, time.perf_counter() - startTime, "{}: {}".format(type(error).__name__, error))
+	if comparison is None:
+		return PairResult(sourcePath, targetPath, False, None, None, None, time.perf_counter() - startTime, "Could not compare the meshes")
+	return PairResult(sourcePath, targetPath, comparison.result, comparison.noAlignmentHausDist, comparison.obbAlignmentHausDist, comparison.icpHausDist, time.perf_counter() - startTime, alignedMatrix=comparison.alignedMatrix)
+
+def compareBatch(sources, targets, threshold, workers=None, stats=None, cacheDir=None, outOfCore=False):
+	"""
+	Compares every source mesh against every target mesh across a pool of worker processes. Results are
+	yielded as soon as each pair finishes, so they do not come back in submission order.
+
+	Args:
+		sources (str | list[str]): Source mesh filepaths and/or directories of meshes.
+		targets (str | list[str]): Target mesh filepaths and/or directories of meshes.
+		threshold (float): Hausdorff distance threshold to determine if two meshes can be considered the same.
+		workers (int): Number of worker processes. Defaults to the number of CPUs.
+		stats (BatchStats): Optional object to record progress and throughput into. Created internally if not given.
+		cacheDir (str): Optional directory of an on-disk MeshCache shared by all workers, so each mesh file is only
+			parsed once across runs.
+		outOfCore (bool): Whether to compare with bounded memory, for meshes larger than memory. Best combined with
+			cacheDir, whose meshes are memory mapped rather than read into memory.
+
+	Returns:
+		Iterator[PairResult]: Results for each pair, in order of completion.
+	"""
+	sourcePaths = collectMeshPaths(sources)
+	targetPaths = collectMeshPaths(targets)
+	pairs = [(sourcePath, targetPath) for sourcePath in sourcePaths for targetPath in targetPaths]
+
+	if stats is None:
+		stats = BatchStats(len(pairs))
+	else:
+		stats.total = len(pairs)
+	if len(pairs) == 0:
+		return
+
+	# Submit target-major so that each worker tends to see the same target repeatedly and hits its mesh cache
+	pairs.sort(key=lambda pair: pair[1])
+	with ProcessPoolExecutor(max_workers=workers) as executor:
+		futures = [executor.submit(comparePair, sourcePath, targetPath, threshold, cacheDir, outOfCore) for sourcePath, targetPath in pairs]
+		for future in as_completed(futures):
+			pairResult = future.result()
+			stats.record(pairResult)
+			yield pairResult
+
+def main(argv=None) -> int:
+	parser = argparse.ArgumentParser(description="Compare every source mesh against every target mesh in a process pool.")
+	parser.add_argument("--sources", nargs="+", required=True, help="source mesh files and/or directories")
+	parser.add_argument("--targets", nargs="+", required=True, help="target mesh files and/or directories")
+	parser.add_argument("--threshold", type=float, default=0.01, help="Hausdorff distance threshold for sameness")
+	parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: CPU count)")
+	parser.add_argument("--cache-dir", default=None, help="directory of an on-disk cache of parsed meshes (default: no cache)")
+	parser.add_argument("--out-of-core", action="store_true", help="compare with bounded memory, for meshes larger than memory")
+	args = parser.parse_args(argv)
+
+	stats = BatchStats(0)
+	for pairResult in compareBatch(args.sources, args.targets, args.threshold, args.workers, stats, args.cache_dir, args.out_of_core):
+		if pairResult.error is not None:
+			print("[ERROR] {} vs {}: {}".format(pairResult.source, pairResult.target, pairResult.error))
+			continue
+		print("{}\t{}\t{}\t{:0.5f}\t{:0.5f}\t{:0.5f}\t{:0.3f}s".format(
+			pairResult.source, pairResult.target, "same" if pairResult.result else "different",
+			pairResult.noAlignmentHausDist, pairResult.obbAlignmentHausDist, pairResult.icpHausDist, pairResult.seconds))
+
+	print(stats.summary(), file=sys.stderr)
+	return 0 if stats.failed == 0 else 1
+
+if __name__ == '__main__':
+	sys.exit(main())
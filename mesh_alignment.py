@@ -0,0 +1,283 @@
+#region IMPORTS
+import os
+import time
+import itertools
+import threading
+from typing import NamedTuple
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from vtkmodules.util.numpy_support import numpy_to_vtk, vtk_to_numpy
+from vtkmodules.vtkCommonCore import vtkPoints
+from vtkmodules.vtkCommonTransforms import vtkLandmarkTransform, vtkTransform
+from vtkmodules.vtkFiltersGeneral import vtkOBBTree
+#endregion IMPORTS
+
+DEFAULT_TOP_K = 8
+DEFAULT_TIE_TOLERANCE = 0.01
+TRANSFORM_CHUNK = 65536														# Points transformed at a time, bounds the double precision temporaries
+
+# Corners of a box in its own frame, as +/-1 multiples of the half axes
+BOX_CORNERS = np.array(list(itertools.product((-1, 1), repeat=3)), dtype=np.float64)
+
+# All 48 signed axis permutations. Each maps the box onto itself; 24 are proper rotations and 24 are reflections.
+BOX_SYMMETRIES = [
+	np.array([[signs[row] if column == permutation[row] else 0 for column in range(3)] for row in range(3)], dtype=np.float64)
+	for permutation in itertools.permutations(range(3))
+	for signs in itertools.product((-1, 1), repeat=3)
+]
+
+class OrientedBox(NamedTuple):
+	"""
+    An oriented bounding box.
+
+    Attributes:
+        center (numpy.ndarray): Center of the box.
+        axes (numpy.ndarray): 3x3 array whose rows are the full length box edges, longest first.
+    """
+	center: np.ndarray
+	axes: np.ndarray
+
+	def corners(self, symmetry=None) -> np.ndarray:
+		"""
+		Gets the 8 corners of the box, optionally with the corner order permuted by a box symmetry.
+
+		Args:
+			symmetry (numpy.ndarray): 3x3 signed permutation to apply to the box frame.
+
+		Returns:
+			numpy.ndarray: 8x3 array of corner points.
+		"""
+		localCorners = BOX_CORNERS if symmetry is None else BOX_CORNERS @ symmetry
+		return self.center + 0.5 * localCorners @ self.axes
+
+	def handedness(self) -> float:
+		"""
+		Gets the sign of the box frame's determinant.
+
+		Args:
+			None
+
+		Returns:
+			float: 1 for a right handed frame, -1 for a left handed one.
+		"""
+		return 1.0 if np.linalg.det(self.axes) >= 0 else -1.0
+
+def orientedBox(polyData) -> OrientedBox:
+	"""
+	Computes the oriented bounding box of a mesh. This is the same box as the level 0 representation of a vtkOBBTree.
+
+	Args:
+		polyData (vtkPolyData): Mesh to bound.
+
+	Returns:
+		OrientedBox: The oriented bounding box.
+	"""
+	corner, maxAxis, midAxis, minAxis, size = [0.0] * 3, [0.0] * 3, [0.0] * 3, [0.0] * 3, [0.0] * 3
+	vtkOBBTree().ComputeOBB(polyData, corner, maxAxis, midAxis, minAxis, size)
+	axes = np.array([maxAxis, midAxis, minAxis], dtype=np.float64)
+	return OrientedBox(np.array(corner) + 0.5 * axes.sum(axis=0), axes)
+
+def transformMatrix(transform) -> np.ndarray:
+	"""
+	Gets the matrix of a VTK transform as a NumPy array.
+
+	Args:
+		transform (vtkLinearTransform): The transform.
+
+	Returns:
+		numpy.ndarray: Homogeneous transformation matrix, shape (4, 4).
+	"""
+	vtkMatrix = transform.GetMatrix()
+	return np.array([[vtkMatrix.GetElement(row, column) for column in range(4)] for row in range(4)])
+
+def transformPoints(points, matrix, out=None) -> np.ndarray:
+	"""
+	Applies a homogeneous transform to an array of points. The points are transformed a chunk at a time in double
+	precision, so out may be the points themselves to transform them in place, and no temporary the size of the whole
+	array is made.
+
+	Args:
+		points (numpy.ndarray): Points to transform, shape (n, 3).
+		matrix (numpy.ndarray): Homogeneous transformation matrix, shape (4, 4).
+		out (numpy.ndarray): Array to write the transformed points to, shape (n, 3). A new array of the points' type if
+			not given.
+
+	Returns:
+		numpy.ndarray: The transformed points, out if it was given.
+	"""
+	if out is None:
+		out = np.empty_like(points)
+	rotation, translation = matrix[:3, :3].T, matrix[:3, 3]
+	for chunkStart in range(0, len(points), TRANSFORM_CHUNK):
+		chunk = slice(chunkStart, chunkStart + TRANSFORM_CHUNK)
+		out[chunk] = points[chunk] @ rotation + translation
+	return out
+
+def transformNormals(normals, matrix, out=None) -> np.ndarray:
+	"""
+	Applies a homogeneous transform to an array of unit normals, as vtkTransformPolyDataFilter does: through the
+	inverse transpose of the linear part, renormalized. Chunked like transformPoints, so out may be the normals
+	themselves.
+
+	Args:
+		normals (numpy.ndarray): Normals to transform, shape (n, 3).
+		matrix (numpy.ndarray): Homogeneous transformation matrix, shape (4, 4).
+		out (numpy.ndarray): Array to write the transformed normals to, shape (n, 3). A new array if not given.
+
+	Returns:
+		numpy.ndarray: The transformed normals, out if it was given.
+	"""
+	if out is None:
+		out = np.empty_like(normals)
+	linear = np.linalg.inv(matrix[:3, :3])										# Row vectors times the inverse are the inverse transpose applied to columns
+	for chunkStart in range(0, len(normals), TRANSFORM_CHUNK):
+		chunk = slice(chunkStart, chunkStart + TRANSFORM_CHUNK)
+		transformed = normals[chunk] @ linear
+		lengths = np.linalg.norm(transformed, axis=1, keepdims=True)
+		out[chunk] = transformed / np.where(lengths > 0, lengths, 1)
+	return out
+
+class OrientationCandidate(NamedTuple):
+	"""
+    One box symmetric orientation considered by an OrientationSearch.
+
+    Attributes:
+        symmetry (numpy.ndarray): 3x3 signed permutation of the source box frame.
+        transform (vtkTransform): Similarity transform taking the source onto the target for this orientation.
+        cornerScore (float): RMS residual of the corner fit, relative to the target box diagonal. Lower is better.
+        distance (float): Hausdorff distance after applying the transform, None if the candidate was not evaluated.
+            May be a lower bound if it was beaten by another candidate during evaluation.
+        seconds (float): Wall time spent evaluating the candidate's Hausdorff distance.
+    """
+	symmetry: np.ndarray
+	transform: vtkTransform
+	cornerScore: float
+	distance: float = None
+	seconds: float = 0.0
+
+class OrientationSearch:
+	"""
+    Search engine for the oriented bounding box alignment stage.
+
+    All 24 orientations that map the source's bounding box onto the target's are enumerated and ranked by how well
+    their 8 box corners fit. Only the top k are measured against the full meshes, in parallel threads, each one
+    bounded by the best distance found so far.
+
+    The corner fit can only tell apart orientations that assign the box axes differently, so candidates are
+    often tied (all 24 tie for a cube-like box). Candidates tied with the k-th are always evaluated as well,
+    since there is nothing to rank them by.
+
+    Attributes:
+        topK (int): Number of best ranked orientations to evaluate fully.
+        tieTolerance (float): Corner score difference (relative to the target box diagonal) under which candidates tie.
+        workers (int): Number of threads used for the full evaluations.
+        candidates (list[OrientationCandidate]): Every candidate from the last run, in ranked order.
+        best (OrientationCandidate): The winning candidate from the last run.
+    """
+
+	def __init__(self, topK=DEFAULT_TOP_K, workers=None, tieTolerance=DEFAULT_TIE_TOLERANCE):
+		"""
+        Initializes an OrientationSearch object.
+
+        Args:
+            topK (int): Number of best ranked orientations to evaluate fully.
+            tieTolerance (float): Corner score difference (relative to the target box diagonal) under which candidates tie.
+            workers (int): Number of threads used for the full evaluations. Defaults to one per candidate, capped
+                at the CPU count.
+        """
+		self.topK = topK
+		self.tieTolerance = tieTolerance
+		self.workers = workers if workers is not None else max(1, min(topK, os.cpu_count() or 1))
+		self.candidates = []
+		self.best = None
+
+	def rankCandidates(self, sourceBox, targetBox) -> list[OrientationCandidate]:
+		"""
+		Fits a similarity transform for each of the 24 box symmetric orientations and ranks them by corner residual.
+
+		Args:
+			sourceBox (OrientedBox): Bounding box of the source.
+			targetBox (OrientedBox): Bounding box of the target.
+
+		Returns:
+			list[OrientationCandidate]: Candidates ordered from best to worst corner fit.
+		"""
+		targetCorners = targetBox.corners()
+		targetLandmarks = vtkPoints()
+		targetLandmarks.SetData(numpy_to_vtk(targetCorners, deep=True))
+		targetDiagonal = max(np.linalg.norm(targetBox.axes.sum(axis=0)), np.finfo(np.float64).tiny)
+
+		# Landmark transforms are always proper rotations, so only keep the symmetries that match the handedness of the
+		# two box frames
+		handedness = sourceBox.handedness() * targetBox.handedness()
+
+		candidates = []
+		for symmetry in BOX_SYMMETRIES:
+			if np.linalg.det(symmetry) * handedness < 0:
+				continue
+
+			sourceLandmarks = vtkPoints()
+			sourceLandmarks.SetData(numpy_to_vtk(sourceBox.corners(symmetry), deep=True))
+			landmarkTransform = vtkLandmarkTransform()
+			landmarkTransform.SetModeToSimilarity()
+			landmarkTransform.SetSourceLandmarks(sourceLandmarks)
+			landmarkTransform.SetTargetLandmarks(targetLandmarks)
+			landmarkTransform.Update()
+
+			# Snapshot the fit into a plain transform, which is safe to share between evaluation threads
+			transform = vtkTransform()
+			transform.SetMatrix(landmarkTransform.GetMatrix())
+
+			fittedPoints = vtkPoints()
+			transform.TransformPoints(sourceLandmarks, fittedPoints)
+			residual = vtk_to_numpy(fittedPoints.GetData()) - targetCorners
+			cornerScore = float(np.sqrt(np.mean(np.sum(np.square(residual), axis=1)))) / targetDiagonal
+			candidates.append(OrientationCandidate(symmetry, transform, cornerScore))
+
+		candidates.sort(key=lambda candidate: candidate.cornerScore)
+		return candidates
+
+	def run(self, sourceIndex, targetIndex, sourceBox=None, targetBox=None) -> OrientationCandidate:
+		"""
+		Runs the search.
+
+		Args:
+			sourceIndex (PreparedTarget): Spatial index of the source.
+			targetIndex (PreparedTarget): Spatial index of the target.
+			sourceBox (OrientedBox): Bounding box of the source. Computed from the source index if not given, which is
+				worth avoiding when the index is a subsampled copy of the mesh.
+			targetBox (OrientedBox): Bounding box of the target. Computed from the target index if not given.
+
+		Returns:
+			OrientationCandidate: The candidate with the smallest Hausdorff distance.
+		"""
+		if sourceBox is None:
+			sourceBox = orientedBox(sourceIndex.polyData)
+		if targetBox is None:
+			targetBox = orientedBox(targetIndex.polyData)
+		candidates = self.rankCandidates(sourceBox, targetBox)
+		bestDistance = [None]
+		bestDistanceLock = threading.Lock()
+
+		def evaluate(candidate) -> OrientationCandidate:
+			startTime = time.perf_counter()
+			distance = targetIndex.hausdorffDistance(sourceIndex, candidate.transform, bestDistance[0])
+			with bestDistanceLock:
+				if bestDistance[0] is None or distance < bestDistance[0]:
+					bestDistance[0] = distance
+			return candidate._replace(distance=distance, seconds=time.perf_counter() - startTime)
+
+		topCount = min(max(1, self.topK), len(candidates))
+		cutoffScore = candidates[topCount - 1].cornerScore + self.tieTolerance
+		while topCount < len(candidates) and candidates[topCount].cornerScore <= cutoffScore:
+			topCount += 1
+		topCandidates = candidates[:topCount]
+		if self.workers == 1:
+			evaluated = [evaluate(candidate) for candidate in topCandidates]
+		else:
+			with ThreadPoolExecutor(max_workers=self.workers) as executor:
+				evaluated = list(executor.map(evaluate, topCandidates))
+
+		self.candidates = evaluated + candidates[len(evaluated):]
+		self.best = min(evaluated, key=lambda candidate: candidate.distance)
+		return self.best
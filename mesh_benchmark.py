@@ -0,0 +1,407 @@
+#region IMPORTS
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import itertools
+import tempfile
+import statistics
+import subprocess
+from typing import NamedTuple
+import numpy as np
+from vtkmodules.vtkCommonCore import vtkVersion
+from vtkmodules.vtkCommonDataModel import vtkPolyData
+from vtkmodules.vtkCommonTransforms import vtkTransform
+from vtkmodules.vtkFiltersSources import vtkConeSource, vtkSphereSource
+
+from batch_compare import collectMeshPaths
+from mesh_icp import ICP_METHODS, LANDMARK_SAMPLINGS, IcpSettings
+from mesh_model import MeshModel, COMPARISON_STAGES
+from mesh_profile import ComparisonProfile
+#endregion IMPORTS
+
+DEFAULT_ROUNDS = 5
+DEFAULT_TOLERANCE = 0.25														# Relative slowdown of the median reported as a regression
+MIN_REGRESSION_SECONDS = 0.001													# Slowdowns smaller than this are timer noise, never regressions
+SPHERE_RESOLUTIONS = (16, 64, 256)
+CONE_RESOLUTIONS = (64, 1024, 16384)
+SCALE_CHAIN = (2.0, 0.5, 1.5, 1 / 1.5)
+COMPARISON_THRESHOLD = 0.01
+SYNTHETIC_FAMILIES = ("sphere", "cone")
+IMPORT_MODULES = ("mesh_model", "mesh_cli")										# Modules every batch worker imports, timed in a fresh interpreter
+
+class BenchmarkCase(NamedTuple):
+	"""
+    A mesh to benchmark.
+
+    Attributes:
+        name (str): Unique name of the case, used to match results against a baseline.
+        family (str): Family of meshes the case belongs to ("sphere", "cone" or "resource"). Scaling curves are fitted
+            across the cases of a synthetic family.
+        polyData (vtkPolyData): The mesh.
+        filepath (str): File the mesh was read from, None for synthetic meshes.
+    """
+	name: str
+	family: str
+	polyData: vtkPolyData
+	filepath: str = None
+
+class BenchmarkResult(NamedTuple):
+	"""
+    Timings of one operation on one case.
+
+    Attributes:
+        case (str): Name of the case.
+        family (str): Family of the case.
+        operation (str): Name of the operation.
+        points (int): Number of points of the mesh.
+        cells (int): Number of cells of the mesh.
+        times (list[float]): Wall time of each round, in seconds.
+    """
+	case: str
+	family: str
+	operation: str
+	points: int
+	cells: int
+	times: list
+
+	def summary(self) -> dict:
+		"""
+		Summarizes the timings, pytest-benchmark style.
+
+		Args:
+			None
+
+		Returns:
+			dict: The result's fields with min, median, mean and standard deviation of the times, in seconds.
+		"""
+		summary = self._asdict()
+		summary["min"] = min(self.times)
+		summary["median"] = statistics.median(self.times)
+		summary["mean"] = statistics.fmean(self.times)
+		summary["stddev"] = statistics.stdev(self.times) if len(self.times) > 1 else 0.0
+		return summary
+
+def syntheticCases(sphereResolutions=SPHERE_RESOLUTIONS, coneResolutions=CONE_RESOLUTIONS) -> list[BenchmarkCase]:
+	"""
+	Builds spheres and cones of increasing resolution, for fitting how each operation scales with mesh size.
+
+	Args:
+		sphereResolutions (list[int]): Phi and theta resolutions of the spheres.
+		coneResolutions (list[int]): Resolutions of the cones.
+
+	Returns:
+		list[BenchmarkCase]: One case per mesh.
+	"""
+	cases = []
+	for resolution in sphereResolutions:
+		sphereSource = vtkSphereSource()
+		sphereSource.SetRadius(10)
+		sphereSource.SetPhiResolution(resolution)
+		sphereSource.SetThetaResolution(resolution)
+		sphereSource.Update()
+		cases.append(BenchmarkCase("sphere-{}".format(resolution), "sphere", sphereSource.GetOutput()))
+	for resolution in coneResolutions:
+		coneSource = vtkConeSource()
+		coneSource.SetRadius(10)
+		coneSource.SetHeight(20)
+		coneSource.SetResolution(resolution)
+		coneSource.Update()
+		cases.append(BenchmarkCase("cone-{}".format(resolution), "cone", coneSource.GetOutput()))
+	return cases
+
+def resourceCases(inputs) -> list[BenchmarkCase]:
+	"""
+	Loads mesh files as benchmark cases.
+
+	Args:
+		inputs (str | list[str]): Mesh filepaths and/or directories of meshes, see collectMeshPaths.
+
+	Returns:
+		list[BenchmarkCase]: One case per mesh that could be loaded.
+	"""
+	cases = []
+	for filepath in collectMeshPaths(inputs):
+		mesh = MeshModel()
+		if mesh.loadMesh(filepath):
+			cases.append(BenchmarkCase(os.path.basename(filepath), "resource", mesh.vtkSource.GetOutput(), filepath))
+	return cases
+
+def meshModel(polyData) -> MeshModel:
+	"""
+	Wraps a polydata in a fresh MeshModel, so no spatial index or cached result carries over from a previous round.
+
+	Args:
+		polyData (vtkPolyData): The mesh.
+
+	Returns:
+		MeshModel: A new model of the mesh.
+	"""
+	mesh = MeshModel()
+	mesh.setPolyData(polyData)
+	return mesh
+
+def movedCopy(polyData) -> vtkPolyData:
+	"""
+	Rotates and translates a copy of a mesh, to give the alignment stages something to undo.
+
+	Args:
+		polyData (vtkPolyData): The mesh.
+
+	Returns:
+		vtkPolyData: The moved copy.
+	"""
+	transform = vtkTransform()
+	transform.RotateWXYZ(30, 1, 1, 0)
+	transform.Translate(1, 2, 3)
+	return MeshModel.applyTransform(polyData, transform)
+
+def timeRounds(setup, function, rounds) -> list[float]:
+	"""
+	Times a function over several rounds. Only the function is timed, not its setup.
+
+	Args:
+		setup (callable): Called before each round, returns the arguments of the function as a tuple.
+		function (callable): Function to time.
+		rounds (int): Number of rounds.
+
+	Returns:
+		list[float]: Wall time of each round, in seconds.
+	"""
+	times = []
+	for _ in range(rounds):
+		args = setup()
+		startTime = time.perf_counter()
+		function(*args)
+		times.append(time.perf_counter() - startTime)
+	return times
+
+def benchmarkCase(case, rounds, workDir, icp=None) -> list[BenchmarkResult]:
+	"""
+	Times every MeshModel operation on a case: saving and loading, a chain of scalings, volume, oriented bounding box
+	alignment, and each stage of a comparison against a moved copy of the mesh.
+
+	Args:
+		case (BenchmarkCase): The mesh to benchmark.
+		rounds (int): Number of rounds of each operation.
+		workDir (str): Directory for the files written by saveMesh.
+		icp (IcpSettings): ICP settings of the comparisons, None for the defaults.
+
+	Returns:
+		list[BenchmarkResult]: One result per operation.
+	"""
+	points = case.polyData.GetNumberOfPoints()
+	cells = case.polyData.GetNumberOfCells()
+	timings = {}
+
+	def scaleChain(mesh):
+		for scalar in SCALE_CHAIN:
+			mesh.scaleMesh(scalar)
+
+	# Synthetic meshes are loaded back from the files saveMesh wrote, resources from their own file
+	for extension in (".stl", ".ply"):
+		savePath = os.path.join(workDir, case.name + extension)
+		timings["saveMesh" + extension] = timeRounds(lambda: (meshModel(case.polyData),), lambda mesh: mesh.saveMesh(savePath), rounds)
+		if case.filepath is None:
+			timings["loadMesh" + extension] = timeRounds(lambda: (MeshModel(),), lambda mesh: mesh.loadMesh(savePath), rounds)
+	if case.filepath is not None:
+		timings["loadMesh"] = timeRounds(lambda: (MeshModel(),), lambda mesh: mesh.loadMesh(case.filepath), rounds)
+
+	timings["scaleMesh"] = timeRounds(lambda: (meshModel(case.polyData),), scaleChain, rounds)
+	timings["getVolume"] = timeRounds(lambda: (meshModel(case.polyData),), lambda mesh: mesh.getVolume(), rounds)
+
+	targetPolyData = movedCopy(case.polyData)
+
+	def alignSetup():
+		source = vtkPolyData()
+		source.DeepCopy(case.polyData)										# alignBoundingBoxes modifies the source in place
+		return source, targetPolyData
+	timings["alignBoundingBoxes"] = timeRounds(alignSetup, MeshModel.alignBoundingBoxes, rounds)
+
+	# Stages are timed by a profile, which unlike a progress callback does not make the comparison build the aligned
+	# poses. Each stage also counts the profiled steps since the previous one (building the indices counts towards
+	# noAlignment) and the steps after the last stage (measuring the ICP pose counts towards icp).
+	for stage in COMPARISON_STAGES + ("total",):
+		timings["compareMeshes." + stage] = []
+	for _ in range(rounds):
+		sourceMesh = meshModel(case.polyData)
+		targetMesh = meshModel(targetPolyData)
+		profile = ComparisonProfile(traceMemory=False)
+		startTime = time.perf_counter()
+		MeshModel.compareMeshes(sourceMesh, targetMesh, COMPARISON_THRESHOLD, resultCache=None, profile=profile, icp=icp)
+		timings["compareMeshes.total"].append(time.perf_counter() - startTime)
+
+		stageSeconds = dict.fromkeys(COMPARISON_STAGES, 0.0)
+		pendingSeconds = 0.0
+		for record in profile.stages:
+			if record.depth > 0:
+				continue
+			pendingSeconds += record.seconds
+			if record.name in stageSeconds:
+				stageSeconds[record.name] += pendingSeconds
+				pendingSeconds = 0.0
+		stageSeconds[COMPARISON_STAGES[-1]] += pendingSeconds
+		for stage, seconds in stageSeconds.items():
+			timings["compareMeshes." + stage].append(seconds)
+
+	return [BenchmarkResult(case.name, case.family, operation, points, cells, times) for operation, times in timings.items()]
+
+def timeImport(moduleName, rounds) -> list[float]:
+	"""
+	Times importing a module in a fresh interpreter, the way a short-lived batch worker does. The interpreter's own
+	startup is not included.
+
+	Args:
+		moduleName (str): Module to import, from the directory of this file.
+		rounds (int): Number of interpreters to start.
+
+	Returns:
+		list[float]: Import time of each round, in seconds.
+	"""
+	script = "import time; startTime = time.perf_counter(); import {}; print(time.perf_counter() - startTime)".format(moduleName)
+	times = []
+	for _ in range(rounds):
+		completed = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True)
+		times.append(float(completed.stdout.split()[-1]))
+	return times
+
+def benchmarkImports(moduleNames, rounds) -> list[BenchmarkResult]:
+	"""
+	Times importing each module in a fresh interpreter, so a change that pulls heavy modules (such as all of VTK or
+	its rendering) back into the import path shows up as a regression against a baseline.
+
+	Args:
+		moduleNames (list[str]): Modules to import.
+		rounds (int): Number of rounds per module.
+
+	Returns:
+		list[BenchmarkResult]: One result per module, under the "import" case.
+	"""
+	return [BenchmarkResult("import", "import", "import " + moduleName, 0, 0, timeImport(moduleName, rounds)) for moduleName in moduleNames]
+
+def scalingCurves(results) -> list[dict]:
+	"""
+	Fits how each operation's time grows with mesh size, across the cases of each synthetic family. The exponent is
+	the slope of log(median time) against log(points): about 1 for linear operations, 0 for constant ones.
+
+	Args:
+		results (list[BenchmarkResult]): Benchmark results.
+
+	Returns:
+		list[dict]: Family, operation, exponent and the (points, median) points of each curve.
+	"""
+	curves = {}
+	for result in results:
+		if result.family in SYNTHETIC_FAMILIES:
+			curves.setdefault((result.family, result.operation), []).append((result.points, statistics.median(result.times)))
+
+	fitted = []
+	for (family, operation), samples in curves.items():
+		samples.sort()
+		exponent = None
+		if len(samples) > 1 and all(seconds > 0 for _, seconds in samples):
+			exponent = float(np.polyfit(np.log([points for points, _ in samples]), np.log([seconds for _, seconds in samples]), 1)[0])
+		fitted.append({"family": family, "operation": operation, "exponent": exponent, "samples": samples})
+	return fitted
+
+def saveBaseline(results, filepath, rounds):
+	"""
+	Writes benchmark results to a JSON baseline, together with the environment they were measured in.
+
+	Args:
+		results (list[BenchmarkResult]): Benchmark results.
+		filepath (str): File to write.
+		rounds (int): Number of rounds each operation was timed over.
+
+	Returns:
+		None
+	"""
+	baseline = {
+		"machine": {"python": platform.python_version(), "vtk": vtkVersion.GetVTKVersion(), "numpy": np.__version__, "platform": platform.platform(), "cpus": os.cpu_count()},
+		"rounds": rounds,
+		"results": [result.summary() for result in results],
+		"curves": scalingCurves(results),
+	}
+	with open(filepath, "w") as baselineFile:
+		json.dump(baseline, baselineFile, indent=1)
+
+def loadBaseline(filepath) -> dict:
+	"""
+	Reads the median times of a JSON baseline written by saveBaseline.
+
+	Args:
+		filepath (str): File to read.
+
+	Returns:
+		dict[tuple[str, str], float]: Median time in seconds, by case and operation.
+	"""
+	with open(filepath) as baselineFile:
+		baseline = json.load(baselineFile)
+	return {(result["case"], result["operation"]): result["median"] for result in baseline["results"]}
+
+def findRegressions(results, baseline, tolerance=DEFAULT_TOLERANCE) -> list[tuple[str, str, float, float]]:
+	"""
+	Compares benchmark results to a baseline. An operation regressed if its median time grew by more than the tolerance
+	and by more than MIN_REGRESSION_SECONDS. Operations missing from either side are ignored.
+
+	Args:
+		results (list[BenchmarkResult]): Benchmark results.
+		baseline (dict[tuple[str, str], float]): Baseline median times, see loadBaseline.
+		tolerance (float): Allowed relative slowdown.
+
+	Returns:
+		list[tuple[str, str, float, float]]: Case, operation, baseline median and current median of each regression.
+	"""
+	regressions = []
+	for result in results:
+		baselineMedian = baseline.get((result.case, result.operation))
+		if baselineMedian is None:
+			continue
+		median = statistics.median(result.times)
+		if median > baselineMedian * (1 + tolerance) and median - baselineMedian > MIN_REGRESSION_SECONDS:
+			regressions.append((result.case, result.operation, baselineMedian, median))
+	return regressions
+
+def main(argv=None) -> int:
+	parser = argparse.ArgumentParser(description="Time every MeshModel operation across mesh sizes.")
+	parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="rounds per operation (default: %(default)s)")
+	parser.add_argument("--sphere-resolutions", type=int, nargs="*", default=SPHERE_RESOLUTIONS, help="resolutions of the synthetic spheres")
+	parser.add_argument("--cone-resolutions", type=int, nargs="*", default=CONE_RESOLUTIONS, help="resolutions of the synthetic cones")
+	parser.add_argument("--meshes", nargs="*", default=["resources"], help="mesh files and/or directories to benchmark (default: resources)")
+	parser.add_argument("--imports", nargs="*", default=IMPORT_MODULES, help="modules whose import time is benchmarked (default: %(default)s)")
+	parser.add_argument("--save", default=None, help="write the results to this JSON baseline")
+	parser.add_argument("--compare", default=None, help="JSON baseline to check the results against")
+	parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="relative slowdown reported as a regression (default: %(default)s)")
+	parser.add_argument("--icp-method", choices=ICP_METHODS, default="vtk", help="ICP method of the comparisons (default: %(default)s)")
+	parser.add_argument("--icp-sampling", choices=LANDMARK_SAMPLINGS, default="uniform", help="ICP landmark sampling of the comparisons (default: %(default)s)")
+	parser.add_argument("--icp-hypotheses", type=int, default=1, help="ICP starting poses refined side by side in the comparisons (default: %(default)s)")
+	args = parser.parse_args(argv)
+
+	cases = syntheticCases(args.sphere_resolutions, args.cone_resolutions) + resourceCases(args.meshes)
+	icp = IcpSettings(method=args.icp_method, sampling=args.icp_sampling, hypotheses=args.icp_hypotheses)
+	results = []
+	with tempfile.TemporaryDirectory() as workDir:
+		for caseResults in itertools.chain([benchmarkImports(args.imports, args.rounds)], (benchmarkCase(case, args.rounds, workDir, icp) for case in cases)):
+			for result in caseResults:
+				results.append(result)
+				print("{}\t{}\t{} points\t{:0.3f}ms".format(result.case, result.operation, result.points, statistics.median(result.times) * 1000))
+
+	for curve in scalingCurves(results):
+		if curve["exponent"] is not None:
+			print("[CURVE] {} {}: time ~ points^{:0.2f}".format(curve["family"], curve["operation"], curve["exponent"]), file=sys.stderr)
+
+	if args.save is not None:
+		saveBaseline(results, args.save, args.rounds)
+
+	if args.compare is not None:
+		regressions = findRegressions(results, loadBaseline(args.compare), args.tolerance)
+		for case, operation, baselineMedian, median in regressions:
+			print("[REGRESSION] {} {}: {:0.3f}ms -> {:0.3f}ms".format(case, operation, baselineMedian * 1000, median * 1000), file=sys.stderr)
+		if regressions:
+			return 1
+	return 0
+
+if __name__ == '__main__':
+	sys.exit(main())
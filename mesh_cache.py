@@ -0,0 +1,273 @@
+#region IMPORTS
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+from vtkmodules.util.numpy_support import numpy_to_vtk, vtk_to_numpy
+from vtkmodules.vtkCommonCore import VTK_ID_TYPE, vtkPoints
+from vtkmodules.vtkCommonDataModel import vtkCellArray, vtkPolyData
+#endregion IMPORTS
+
+DEFAULT_CACHE_DIR = os.environ.get("MESH_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "fus-mesh"))
+DEFAULT_MAX_BYTES = 1 << 30
+CELL_TYPES = ("verts", "lines", "polys", "strips")
+HASH_CHUNK_SIZE = 1 << 20
+
+class MeshCache:
+	"""
+    A content addressed, on-disk cache of parsed meshes.
+
+    Each entry is stored under the SHA-256 of the mesh file's contents as raw NumPy arrays (points, cell offsets and
+    connectivity, point and cell data), which are memory mapped on load instead of reparsed. A small path index
+    remembers the hash of each file by its size and modification time, so unchanged files are not even rehashed.
+    Once the cache grows past its size limit, the least recently used entries are evicted.
+
+    Attributes:
+        cacheDir (str): Directory holding the cache.
+        entriesDir (str): Directory holding one subdirectory of arrays per cached mesh, named by content hash.
+        pathIndexFile (str): JSON file recording the content hash of each known filepath.
+        maxBytes (int): Size limit of the cache in bytes.
+        hits (int): Number of loads served from the cache.
+        misses (int): Number of loads that were not in the cache.
+    """
+
+	def __init__(self, cacheDir=DEFAULT_CACHE_DIR, maxBytes=DEFAULT_MAX_BYTES):
+		"""
+        Initializes a MeshCache object.
+
+        Args:
+            cacheDir (str): Directory holding the cache. Created if it does not exist.
+            maxBytes (int): Size limit of the cache in bytes.
+        """
+		self.cacheDir = cacheDir
+		self.entriesDir = os.path.join(cacheDir, "entries")
+		self.pathIndexFile = os.path.join(cacheDir, "paths.json")
+		self.maxBytes = maxBytes
+		self.hits = 0
+		self.misses = 0
+		os.makedirs(self.entriesDir, exist_ok=True)
+
+	def readPathIndex(self) -> dict:
+		"""
+		Reads the index of known file hashes.
+
+		Args:
+			None
+
+		Returns:
+			dict: Size, modification time and hash of each known file, by absolute filepath.
+		"""
+		try:
+			with open(self.pathIndexFile) as indexFile:
+				return json.load(indexFile)
+		except (OSError, ValueError):
+			return {}
+
+	def fileKey(self, filepath) -> str:
+		"""
+		Gets the content hash of a file, reusing the hash recorded for it if its size and modification time have not
+		changed since.
+
+		Args:
+			filepath (str): Filepath of the mesh.
+
+		Returns:
+			str: Hex SHA-256 digest of the file's contents.
+		"""
+		filepath = os.path.abspath(filepath)
+		stat = os.stat(filepath)
+		pathIndex = self.readPathIndex()
+		known = pathIndex.get(filepath)
+		if known is not None and known["size"] == stat.st_size and known["mtime"] == stat.st_mtime_ns:
+			return known["hash"]
+
+		digest = hashlib.sha256()
+		with open(filepath, "rb") as meshFile:
+			for chunk in iter(lambda: meshFile.read(HASH_CHUNK_SIZE), b""):
+				digest.update(chunk)
+		key = digest.hexdigest()
+
+		pathIndex[filepath] = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "hash": key}
+		self.writeAtomically(self.pathIndexFile, json.dumps(pathIndex))
+		return key
+
+	def load(self, filepath) -> vtkPolyData:
+		"""
+		Loads a mesh from the cache.
+
+		Args:
+			filepath (str): Filepath of the mesh.
+
+		Returns:
+			vtkPolyData: The cached mesh, backed by memory mapped arrays. None if the mesh is not cached.
+		"""
+		entryDir = os.path.join(self.entriesDir, self.fileKey(filepath))
+		try:
+			with open(os.path.join(entryDir, "manifest.json")) as manifestFile:
+				manifest = json.load(manifestFile)
+			polyData = self.readEntry(entryDir, manifest)
+		except (OSError, ValueError, KeyError):
+			self.misses += 1
+			return None
+
+		os.utime(entryDir)														# Mark as recently used for eviction
+		self.hits += 1
+		return polyData
+
+	def store(self, filepath, polyData):
+		"""
+		Stores a parsed mesh in the cache, then evicts old entries if the cache is over its size limit.
+
+		Args:
+			filepath (str): Filepath the mesh was parsed from.
+			polyData (vtkPolyData): The parsed mesh.
+
+		Returns:
+			None
+		"""
+		if polyData.GetPoints() is None:
+			return																# Empty or failed parse, nothing worth caching
+		entryDir = os.path.join(self.entriesDir, self.fileKey(filepath))
+		if os.path.isdir(entryDir):
+			return
+
+		# Write into a temporary directory and rename it into place, so concurrent readers never see a partial entry
+		stagingDir = tempfile.mkdtemp(dir=self.entriesDir, prefix=".staging-")
+		try:
+			manifest = self.writeEntry(stagingDir, polyData)
+			with open(os.path.join(stagingDir, "manifest.json"), "w") as manifestFile:
+				json.dump(manifest, manifestFile)
+			os.rename(stagingDir, entryDir)
+		except OSError:
+			shutil.rmtree(stagingDir, ignore_errors=True)						# Another process stored the same entry first
+			return
+		self.evict()
+
+	def evict(self):
+		"""
+		Removes least recently used entries until the cache fits within its size limit.
+
+		Args:
+			None
+
+		Returns:
+			None
+		"""
+		entries = []
+		totalBytes = 0
+		for name in os.listdir(self.entriesDir):
+			entryDir = os.path.join(self.entriesDir, name)
+			if name.startswith(".") or not os.path.isdir(entryDir):
+				continue
+			entryBytes = sum(entry.stat().st_size for entry in os.scandir(entryDir))
+			entries.append((os.stat(entryDir).st_mtime_ns, entryBytes, entryDir))
+			totalBytes += entryBytes
+
+		entries.sort()
+		for _, entryBytes, entryDir in entries:
+			if totalBytes <= self.maxBytes:
+				break
+			shutil.rmtree(entryDir, ignore_errors=True)
+			totalBytes -= entryBytes
+
+	def clear(self):
+		"""
+		Removes every entry from the cache and resets the hit/miss counters.
+
+		Args:
+			None
+
+		Returns:
+			None
+		"""
+		shutil.rmtree(self.cacheDir, ignore_errors=True)
+		os.makedirs(self.entriesDir, exist_ok=True)
+		self.hits = 0
+		self.misses = 0
+
+	def writeEntry(self, entryDir, polyData) -> dict:
+		"""
+		Writes the arrays of a mesh into an entry directory.
+
+		Args:
+			entryDir (str): Directory to write into.
+			polyData (vtkPolyData): Mesh to write.
+
+		Returns:
+			dict: Manifest describing the written arrays, and which of the point and cell data arrays are the active
+				attributes (normals, scalars, texture coordinates...) and of which type.
+		"""
+		manifest = {"cells": [], "pointData": [], "cellData": [], "pointAttributes": {}, "cellAttributes": {}}
+		np.save(os.path.join(entryDir, "points.npy"), vtk_to_numpy(polyData.GetPoints().GetData()))
+
+		for cellType in CELL_TYPES:
+			cells = getattr(polyData, "Get" + cellType.capitalize())()
+			if cells.GetNumberOfCells() == 0:
+				continue
+			np.save(os.path.join(entryDir, cellType + ".offsets.npy"), vtk_to_numpy(cells.GetOffsetsArray()).astype(np.int64, copy=False))
+			np.save(os.path.join(entryDir, cellType + ".connectivity.npy"), vtk_to_numpy(cells.GetConnectivityArray()).astype(np.int64, copy=False))
+			manifest["cells"].append(cellType)
+
+		for dataName, attributeName, attributes in (("pointData", "pointAttributes", polyData.GetPointData()), ("cellData", "cellAttributes", polyData.GetCellData())):
+			for i in range(attributes.GetNumberOfArrays()):
+				array = attributes.GetArray(i)
+				if array is None or array.GetName() is None:
+					continue													# Skip non-numeric and unnamed arrays
+				attributeType = attributes.IsArrayAnAttribute(i)
+				if attributeType >= 0:
+					manifest[attributeName][array.GetName()] = attributeType
+				np.save(os.path.join(entryDir, "{}.{}.npy".format(dataName, len(manifest[dataName]))), vtk_to_numpy(array))
+				manifest[dataName].append(array.GetName())
+		return manifest
+
+	def readEntry(self, entryDir, manifest) -> vtkPolyData:
+		"""
+		Builds a mesh from an entry directory. Arrays are memory mapped copy-on-write, so nothing is read from disk until
+		it is used and VTK may still modify the arrays without touching the cache.
+
+		Args:
+			entryDir (str): Directory to read from.
+			manifest (dict): Manifest describing the entry's arrays.
+
+		Returns:
+			vtkPolyData: The mesh.
+		"""
+		def mapArray(name):
+			return np.load(os.path.join(entryDir, name), mmap_mode="c")
+
+		polyData = vtkPolyData()
+		points = vtkPoints()
+		points.SetData(numpy_to_vtk(mapArray("points.npy")))
+		polyData.SetPoints(points)
+
+		for cellType in manifest["cells"]:
+			cells = vtkCellArray()
+			cells.SetData(numpy_to_vtk(mapArray(cellType + ".offsets.npy"), array_type=VTK_ID_TYPE), numpy_to_vtk(mapArray(cellType + ".connectivity.npy"), array_type=VTK_ID_TYPE))
+			getattr(polyData, "Set" + cellType.capitalize())(cells)
+
+		for dataName, attributeName, attributes in (("pointData", "pointAttributes", polyData.GetPointData()), ("cellData", "cellAttributes", polyData.GetCellData())):
+			for i, arrayName in enumerate(manifest[dataName]):
+				array = numpy_to_vtk(mapArray("{}.{}.npy".format(dataName, i)))
+				array.SetName(arrayName)
+				attributes.AddArray(array)
+			for arrayName, attributeType in manifest.get(attributeName, {}).items():
+				attributes.SetActiveAttribute(arrayName, attributeType)		# Normals, scalars... as the reader set them
+		return polyData
+
+	def writeAtomically(self, filepath, text):
+		"""
+		Writes a text file by writing a temporary file and renaming it over the original.
+
+		Args:
+			filepath (str): File to write.
+			text (str): Contents of the file.
+
+		Returns:
+			None
+		"""
+		fileDescriptor, tempPath = tempfile.mkstemp(dir=os.path.dirname(filepath), prefix=".tmp-")
+		with os.fdopen(fileDescriptor, "w") as tempFile:
+			tempFile.write(text)
+		os.replace(tempPath, filepath)
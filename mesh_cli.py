@@ -0,0 +1,307 @@
+#region IMPORTS
+import os
+import sys
+import glob
+import json
+import argparse
+
+from batch_compare import MESH_EXTENSIONS, collectMeshPaths, compareBatch
+from mesh_cache import MeshCache
+from mesh_library import DEFAULT_CANDIDATES, MeshLibrary
+from mesh_model import MeshModel
+#endregion IMPORTS
+
+OUTPUT_EXTENSIONS = (".stl", ".ply", ".vtp")
+
+def expandInputs(patterns) -> list[str]:
+	"""
+	Expands mesh filepaths, directories and glob patterns (including ** for recursive matches) into a sorted list of
+	unique mesh filepaths. Patterns are expanded here rather than by the shell, so they can be quoted to get past
+	argument length limits.
+
+	Args:
+		patterns (list[str]): Filepaths, directories and glob patterns.
+
+	Returns:
+		list[str]: Absolute filepaths of all meshes found.
+	"""
+	paths = []
+	for pattern in patterns:
+		if glob.has_magic(pattern):
+			matches = [match for match in glob.glob(pattern, recursive=True) if os.path.isdir(match) or os.path.splitext(match)[1].lower() in MESH_EXTENSIONS]
+			paths.extend(collectMeshPaths(matches))
+		else:
+			paths.extend(collectMeshPaths(pattern))
+	return sorted(set(paths))
+
+def parseShard(text) -> tuple[int, int]:
+	"""
+	Parses the --shard option, as an argparse type.
+
+	Args:
+		text (str): "K/N", the K-th (0 based) of N shards.
+
+	Returns:
+		tuple[int, int]: K and N.
+
+	Raises:
+		argparse.ArgumentTypeError: If the text is not of that form or K is not in [0, N).
+	"""
+	parts = text.split("/")
+	if len(parts) != 2 or not all(part.strip().isdigit() for part in parts):
+		raise argparse.ArgumentTypeError("expected K/N, e.g. 0/4, got {!r}".format(text))
+	index, count = (int(part) for part in parts)
+	if not 0 <= index < count:
+		raise argparse.ArgumentTypeError("shard {} does not exist, K must be in 0..N-1".format(text))
+	return index, count
+
+def selectShard(paths, shard) -> list[str]:
+	"""
+	Selects the share of the inputs handled by one task of a job array.
+
+	Args:
+		paths (list[str]): All inputs, in a stable order.
+		shard (tuple[int, int]): (K, N) to keep every N-th input starting from the K-th (0 based), see parseShard. None
+			to keep them all.
+
+	Returns:
+		list[str]: The inputs of this shard.
+	"""
+	if shard is None:
+		return paths
+	index, count = shard
+	return paths[index::count]
+
+def outputPath(inputPath, outputDir, suffix, extension) -> str:
+	"""
+	Builds the filepath a command writes its result for an input to.
+
+	Args:
+		inputPath (str): Filepath of the input mesh.
+		outputDir (str): Directory to write to, None for the input's own directory.
+		suffix (str): Text appended to the input's file name, before the extension.
+		extension (str): Extension of the output, None to keep the input's.
+
+	Returns:
+		str: The output filepath.
+	"""
+	stem, inputExtension = os.path.splitext(os.path.basename(inputPath))
+	directory = outputDir if outputDir is not None else os.path.dirname(inputPath)
+	return os.path.join(directory, stem + suffix + (extension if extension is not None else inputExtension.lower()))
+
+def emit(record, output):
+	"""
+	Writes one JSON line and flushes it, so results can be consumed while the command is still running.
+
+	Args:
+		record (dict): The record to write.
+		output (TextIO): Stream to write to.
+
+	Returns:
+		None
+	"""
+	output.write(json.dumps(record) + "\n")
+	output.flush()
+
+def loadInput(filepath, cache=None) -> MeshModel:
+	"""
+	Loads an input mesh.
+
+	Args:
+		filepath (str): Filepath of the mesh.
+		cache (MeshCache): Optional on-disk cache of parsed meshes.
+
+	Returns:
+		MeshModel: The loaded mesh, None if it could not be loaded.
+	"""
+	mesh = MeshModel()
+	if not mesh.loadMesh(filepath, cache):
+		return None
+	return mesh
+
+def meshStats(mesh) -> dict:
+	"""
+	Gathers the size and geometric properties of a mesh.
+
+	Args:
+		mesh (MeshModel): The mesh.
+
+	Returns:
+		dict: Point and cell counts, volume, surface area, bounds, centroid, oriented bounding box and fingerprint.
+	"""
+	polyData = mesh.vtkSource.GetOutput()
+	box = mesh.getOrientedBox()
+	centroid = mesh.getCentroid()
+	return {
+		"points": polyData.GetNumberOfPoints(),
+		"cells": polyData.GetNumberOfCells(),
+		"volume": mesh.getVolume(),
+		"area": mesh.getSurfaceArea(),
+		"bounds": list(mesh.getBounds()),
+		"centroid": None if centroid is None else centroid.tolist(),
+		"orientedBox": {"center": box.center.tolist(), "axes": box.axes.tolist()},
+		"fingerprint": mesh.getFingerprint(),
+	}
+
+def runCompare(args) -> int:
+	sources = selectShard(expandInputs(args.sources), args.shard)
+	targets = expandInputs(args.targets)
+	failed = 0
+	for pairResult in compareBatch(sources, targets, args.threshold, args.workers, cacheDir=args.cache_dir, outOfCore=args.out_of_core):
+		failed += pairResult.error is not None
+		emit(pairResult._asdict(), args.output)
+	return 0 if failed == 0 else 1
+
+def runScale(args) -> int:
+	cache = MeshCache(args.cache_dir) if args.cache_dir is not None else None
+	failed = 0
+	for inputPath in selectShard(expandInputs(args.inputs), args.shard):
+		record = {"input": inputPath, "factor": args.factor}
+		mesh = loadInput(inputPath, cache)
+		if mesh is None:
+			record["error"] = "Could not load {}".format(inputPath)
+		else:
+			mesh.scaleMesh(args.factor)
+			record["output"] = outputPath(inputPath, args.output_dir, args.suffix, args.format)
+			if mesh.saveMesh(record["output"]):
+				record["volume"] = mesh.getVolume()
+			else:
+				record["error"] = "Could not write {}".format(record["output"])
+		failed += "error" in record
+		emit(record, args.output)
+	return 0 if failed == 0 else 1
+
+def runConvert(args) -> int:
+	cache = MeshCache(args.cache_dir) if args.cache_dir is not None else None
+	failed = 0
+	for inputPath in selectShard(expandInputs(args.inputs), args.shard):
+		record = {"input": inputPath, "output": outputPath(inputPath, args.output_dir, "", args.format)}
+		mesh = loadInput(inputPath, cache)
+		if mesh is None:
+			record["error"] = "Could not load {}".format(inputPath)
+		elif os.path.abspath(record["output"]) == inputPath:
+			record["error"] = "Output would overwrite the input"
+		elif not mesh.saveMesh(record["output"]):
+			record["error"] = "Could not write {}".format(record["output"])
+		failed += "error" in record
+		emit(record, args.output)
+	return 0 if failed == 0 else 1
+
+def runStats(args) -> int:
+	cache = MeshCache(args.cache_dir) if args.cache_dir is not None else None
+	failed = 0
+	for inputPath in selectShard(expandInputs(args.inputs), args.shard):
+		mesh = loadInput(inputPath, cache)
+		if mesh is None:
+			record = {"input": inputPath, "error": "Could not load {}".format(inputPath)}
+		else:
+			record = {"input": inputPath, **meshStats(mesh)}
+		failed += "error" in record
+		emit(record, args.output)
+	return 0 if failed == 0 else 1
+
+def runIndex(args) -> int:
+	cache = MeshCache(args.cache_dir) if args.cache_dir is not None else None
+	library = MeshLibrary(args.library)
+	failed = 0
+	# Removed files may no longer exist, so their paths are taken as given rather than expanded
+	inputPaths = [os.path.abspath(path) for path in args.inputs] if args.remove else expandInputs(args.inputs)
+	for inputPath in selectShard(inputPaths, args.shard):
+		record = {"input": inputPath}
+		if args.remove:
+			record["removed"] = library.remove(inputPath)
+		elif not library.addFile(inputPath, cache):
+			record["error"] = "Could not load {}".format(inputPath)
+		failed += "error" in record
+		emit(record, args.output)
+	library.save()
+	return 0 if failed == 0 else 1
+
+def runIdentify(args) -> int:
+	cache = MeshCache(args.cache_dir) if args.cache_dir is not None else None
+	library = MeshLibrary(args.library)
+	failed = 0
+	for inputPath in selectShard(expandInputs(args.inputs), args.shard):
+		record = {"input": inputPath}
+		mesh = loadInput(inputPath, cache)
+		if mesh is None:
+			record["error"] = "Could not load {}".format(inputPath)
+		else:
+			matches = library.identify(mesh, args.threshold, args.candidates, cache)
+			record["candidates"] = [match._asdict() for match in matches]
+			record["match"] = next((match.name for match in matches if match.result), None)
+		failed += "error" in record
+		emit(record, args.output)
+	return 0 if failed == 0 else 1
+
+def main(argv=None) -> int:
+	parser = argparse.ArgumentParser(description="Headless mesh tools. Inputs may be files, directories or quoted glob patterns; every result is printed as one JSON line.")
+	subparsers = parser.add_subparsers(dest="command", required=True)
+
+	# Options shared by every subcommand
+	common = argparse.ArgumentParser(add_help=False)
+	common.add_argument("--shard", type=parseShard, default=None, help="K/N: only handle every N-th input starting from the K-th (0 based), e.g. from a job array index")
+	common.add_argument("--cache-dir", default=None, help="directory of an on-disk cache of parsed meshes (default: no cache)")
+
+	compareParser = subparsers.add_parser("compare", parents=[common], help="compare every source mesh against every target mesh")
+	compareParser.add_argument("--sources", nargs="+", required=True, help="source meshes; --shard splits these")
+	compareParser.add_argument("--targets", nargs="+", required=True, help="target meshes")
+	compareParser.add_argument("--threshold", type=float, default=0.01, help="Hausdorff distance threshold for sameness")
+	compareParser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: CPU count)")
+	compareParser.add_argument("--out-of-core", action="store_true", help="compare with bounded memory, for meshes larger than memory; pair with --cache-dir to memory map them")
+	compareParser.set_defaults(run=runCompare)
+
+	scaleParser = subparsers.add_parser("scale", parents=[common], help="scale meshes uniformly and write them out")
+	scaleParser.add_argument("inputs", nargs="+", help="meshes to scale")
+	scaleParser.add_argument("--factor", type=float, required=True, help="uniform scale factor")
+	scaleParser.add_argument("--output-dir", default=None, help="directory to write to (default: next to each input)")
+	scaleParser.add_argument("--suffix", default="-scaled", help="appended to each output's file name (default: %(default)s)")
+	scaleParser.add_argument("--format", choices=OUTPUT_EXTENSIONS, default=None, help="output format (default: the input's)")
+	scaleParser.set_defaults(run=runScale)
+
+	convertParser = subparsers.add_parser("convert", parents=[common], help="convert meshes to another format")
+	convertParser.add_argument("inputs", nargs="+", help="meshes to convert")
+	convertParser.add_argument("--format", choices=OUTPUT_EXTENSIONS, required=True, help="output format")
+	convertParser.add_argument("--output-dir", default=None, help="directory to write to (default: next to each input)")
+	convertParser.set_defaults(run=runConvert)
+
+	statsParser = subparsers.add_parser("stats", parents=[common], help="print the size and geometric properties of meshes")
+	statsParser.add_argument("inputs", nargs="+", help="meshes to describe")
+	statsParser.set_defaults(run=runStats)
+
+	indexParser = subparsers.add_parser("index", parents=[common], help="add meshes to (or remove them from) a library index")
+	indexParser.add_argument("library", help="JSON library index, created if it does not exist")
+	indexParser.add_argument("inputs", nargs="+", help="meshes to index")
+	indexParser.add_argument("--remove", action="store_true", help="remove the inputs from the index instead")
+	indexParser.set_defaults(run=runIndex)
+
+	identifyParser = subparsers.add_parser("identify", parents=[common], help="find each mesh in a library index, comparing only the closest candidates in full")
+	identifyParser.add_argument("library", help="JSON library index written by the index command")
+	identifyParser.add_argument("inputs", nargs="+", help="meshes to identify")
+	identifyParser.add_argument("--threshold", type=float, default=0.01, help="Hausdorff distance threshold for sameness")
+	identifyParser.add_argument("--candidates", type=int, default=DEFAULT_CANDIDATES, help="candidates compared in full per mesh (default: %(default)s)")
+	identifyParser.set_defaults(run=runIdentify)
+
+	args = parser.parse_args(argv)
+	if getattr(args, "factor", 1) <= 0:
+		parser.error("--factor must be positive")
+	if getattr(args, "output_dir", None) is not None:
+		os.makedirs(args.output_dir, exist_ok=True)
+
+	# Keep stdout for the JSON lines. Anything else printed to it, by MeshModel's error reporting, the worker processes
+	# (which inherit the file descriptor) or VTK, is sent to stderr instead.
+	sys.stdout.flush()
+	stdoutDescriptor = sys.stdout.fileno()
+	savedDescriptor = os.dup(stdoutDescriptor)
+	args.output = os.fdopen(os.dup(savedDescriptor), "w")
+	os.dup2(sys.stderr.fileno(), stdoutDescriptor)
+	try:
+		return args.run(args)
+	finally:
+		args.output.close()
+		sys.stdout.flush()
+		os.dup2(savedDescriptor, stdoutDescriptor)
+		os.close(savedDescriptor)
+
+if __name__ == '__main__':
+	sys.exit(main())
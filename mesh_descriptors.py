@@ -0,0 +1,147 @@
+#region IMPORTS
+import numpy as np
+from typing import NamedTuple
+from vtkmodules.util.numpy_support import vtk_to_numpy
+from vtkmodules.vtkFiltersCore import vtkTriangleFilter
+#endregion IMPORTS
+
+D2_BINS = 32
+D2_RANGE = 3.0																	# Histogram covers distances up to this multiple of the mean distance
+D2_SAMPLES = 8192																# Point pairs sampled per histogram
+D2_SEED = 0																		# Fixed, so a mesh always gets the same histogram
+D2_WEIGHT = 2.0																	# Weight of the histogram against the (log) size terms in a descriptor vector
+MIN_SIZE = 1e-12																# Floor for sizes before taking their log, e.g. the volume of an open mesh
+
+class ShapeDescriptor(NamedTuple):
+	"""
+    Cheap, rotation and translation invariant summary of a mesh's shape, for ranking candidate matches before running
+    a full comparison.
+
+    Attributes:
+        volume (float): Enclosed volume of the mesh (0 for open meshes that enclose nothing).
+        area (float): Surface area of the mesh.
+        radii (tuple[float]): Principal radii of gyration of the surface, largest first: the square roots of the
+            eigenvalues of its area weighted second moments about its centroid.
+        d2 (numpy.ndarray): D2 shape distribution, the histogram of distances between random surface points relative
+            to their mean distance. Normalized to sum to 1, and independent of the mesh's size.
+    """
+	volume: float
+	area: float
+	radii: tuple
+	d2: np.ndarray
+
+	def scaled(self, factor) -> "ShapeDescriptor":
+		"""
+		Gets the descriptor of the mesh scaled uniformly, without measuring it again.
+
+		Args:
+			factor (float): Uniform scale factor.
+
+		Returns:
+			ShapeDescriptor: Descriptor of the scaled mesh.
+		"""
+		return ShapeDescriptor(self.volume * factor**3, self.area * factor**2, tuple(radius * factor for radius in self.radii), self.d2)
+
+	def vector(self) -> np.ndarray:
+		"""
+		Flattens the descriptor into a vector, whose Euclidean distances rank how alike two shapes are. Sizes enter as
+		logs of lengths (cube root of the volume, square root of the area, the radii), so they compare by ratio whatever
+		the units, followed by the weighted D2 histogram.
+
+		Args:
+			None
+
+		Returns:
+			numpy.ndarray: The descriptor vector.
+		"""
+		lengths = np.array([np.cbrt(self.volume), np.sqrt(self.area), *self.radii])
+		return np.concatenate([np.log(np.maximum(lengths, MIN_SIZE)), D2_WEIGHT * np.asarray(self.d2)])
+
+	def toDict(self) -> dict:
+		"""
+		Converts the descriptor to plain JSON serializable values.
+
+		Args:
+			None
+
+		Returns:
+			dict: The descriptor's fields, with the histogram as a list.
+		"""
+		return {"volume": self.volume, "area": self.area, "radii": list(self.radii), "d2": np.asarray(self.d2).tolist()}
+
+	def fromDict(values) -> "ShapeDescriptor":
+		"""
+		Rebuilds a descriptor converted by toDict.
+
+		Args:
+			values (dict): The descriptor's fields.
+
+		Returns:
+			ShapeDescriptor: The descriptor.
+		"""
+		return ShapeDescriptor(values["volume"], values["area"], tuple(values["radii"]), np.array(values["d2"]))
+
+def meshTriangles(polyData) -> np.ndarray:
+	"""
+	Gets the corner coordinates of every triangle of a mesh, triangulating its polygons and strips first.
+
+	Args:
+		polyData (vtkPolyData): The mesh.
+
+	Returns:
+		numpy.ndarray: Triangle corners, shape (m, 3, 3), in double precision.
+	"""
+	triangleFilter = vtkTriangleFilter()
+	triangleFilter.SetInputData(polyData)
+	triangleFilter.PassVertsOff()
+	triangleFilter.PassLinesOff()
+	triangleFilter.Update()
+	triangulated = triangleFilter.GetOutput()
+	if triangulated.GetNumberOfPolys() == 0:
+		return np.zeros((0, 3, 3))
+	points = vtk_to_numpy(triangulated.GetPoints().GetData()).astype(np.float64)
+	corners = vtk_to_numpy(triangulated.GetPolys().GetConnectivityArray()).reshape(-1, 3)
+	return points[corners]
+
+def shapeDescriptor(polyData) -> ShapeDescriptor:
+	"""
+	Measures the shape descriptor of a mesh. Everything is computed from the triangles' areas, so differently
+	tessellated copies of the same surface get nearly the same descriptor.
+
+	Args:
+		polyData (vtkPolyData): The mesh.
+
+	Returns:
+		ShapeDescriptor: Descriptor of the mesh. All zero for a mesh without any surface.
+	"""
+	triangles = meshTriangles(polyData)
+	crossProducts = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+	areas = 0.5 * np.linalg.norm(crossProducts, axis=1)
+	area = float(areas.sum())
+	if area == 0:
+		return ShapeDescriptor(0.0, 0.0, (0.0, 0.0, 0.0), np.zeros(D2_BINS))
+
+	# Divergence theorem, the same signed volume vtkMassProperties measures for closed meshes
+	volume = abs(float(np.einsum("ij,ij->", triangles[:, 0], np.cross(triangles[:, 1], triangles[:, 2])))) / 6
+
+	# Second moments of a triangle about the origin: area / 12 * (sum of its corners' outer products + outer product of
+	# the corners' sum). Shifted to the surface centroid, their eigenvalues do not depend on the mesh's orientation.
+	cornerSums = triangles.sum(axis=1)
+	centroid = (areas[:, None] * cornerSums).sum(axis=0) / (3 * area)
+	moments = np.einsum("t,tai,taj->ij", areas, triangles, triangles) + np.einsum("t,ti,tj->ij", areas, cornerSums, cornerSums)
+	covariance = moments / (12 * area) - np.outer(centroid, centroid)
+	radii = tuple(float(radius) for radius in np.sqrt(np.maximum(np.linalg.eigvalsh(covariance), 0))[::-1])
+
+	# D2: distances between pairs of points drawn uniformly over the surface
+	rng = np.random.default_rng(D2_SEED)
+	samples = []
+	for _ in range(2):
+		chosen = triangles[rng.choice(len(triangles), D2_SAMPLES, p=areas / area)]
+		u, v = rng.random(D2_SAMPLES), rng.random(D2_SAMPLES)
+		outside = u + v > 1															# Fold the far half of the unit square back onto the triangle
+		u[outside], v[outside] = 1 - u[outside], 1 - v[outside]
+		samples.append(chosen[:, 0] + u[:, None] * (chosen[:, 1] - chosen[:, 0]) + v[:, None] * (chosen[:, 2] - chosen[:, 0]))
+	distances = np.linalg.norm(samples[0] - samples[1], axis=1)
+	meanDistance = distances.mean()
+	histogram, _ = np.histogram(np.minimum(distances / meanDistance, D2_RANGE), bins=D2_BINS, range=(0, D2_RANGE))
+	return ShapeDescriptor(volume, area, radii, histogram / D2_SAMPLES)
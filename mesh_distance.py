@@ -0,0 +1,477 @@
+#region IMPORTS
+import math
+import threading
+from typing import NamedTuple
+import numpy as np
+from vtkmodules.util.numpy_support import vtk_to_numpy
+from vtkmodules.vtkCommonCore import vtkPoints
+from vtkmodules.vtkCommonDataModel import vtkCellLocator, vtkPolyData, vtkStaticPointLocator
+from vtkmodules.vtkCommonMath import vtkMatrix4x4
+from vtkmodules.vtkCommonTransforms import vtkTransform
+from vtkmodules.vtkFiltersPoints import vtkPointInterpolator, vtkVoronoiKernel
+from mesh_alignment import transformMatrix, transformPoints
+#endregion IMPORTS
+
+CLOSEST_POINT_ARRAY = "ClosestPoint"
+DISTANCE_ARRAY = "Distance"														# Point scalars of a mesh's distances to the mesh it was compared with
+DISTANCE_PERCENTILES = (50, 90, 95, 99)
+QUERY_BATCH_SIZE = 2048
+
+class DistanceStats(NamedTuple):
+	"""
+    Statistics of the closest point distances from every point of one mesh to another.
+
+    Attributes:
+        maximum (float): Largest distance, the directed Hausdorff distance.
+        mean (float): Mean distance.
+        rms (float): Root mean square distance.
+        percentiles (tuple[float]): Distance percentiles, in the order of DISTANCE_PERCENTILES.
+        worstIndex (int): Index of the point with the largest distance.
+        worstPoint (tuple[float]): Coordinates of that point, in the frame the distances were measured in.
+    """
+	maximum: float
+	mean: float
+	rms: float
+	percentiles: tuple
+	worstIndex: int
+	worstPoint: tuple
+
+class DistanceField(NamedTuple):
+	"""
+    Per point closest distances between two meshes in both directions, with their statistics.
+
+    Attributes:
+        sourceDistances (numpy.ndarray): Distance from each source point to the target, shape (n,).
+        targetDistances (numpy.ndarray): Distance from each target point to the source, shape (m,).
+        sourceStats (DistanceStats): Statistics of sourceDistances. The worst point is in the target's frame.
+        targetStats (DistanceStats): Statistics of targetDistances.
+    """
+	sourceDistances: np.ndarray
+	targetDistances: np.ndarray
+	sourceStats: DistanceStats
+	targetStats: DistanceStats
+
+	def hausdorffDistance(self) -> float:
+		"""
+		Gets the symmetric Hausdorff distance, the largest distance in either direction.
+
+		Args:
+			None
+
+		Returns:
+			float: The Hausdorff distance.
+		"""
+		return max(self.sourceStats.maximum, self.targetStats.maximum)
+
+def distanceStats(distances, points) -> DistanceStats:
+	"""
+	Computes the statistics of a set of closest point distances in one vectorized pass over them.
+
+	Args:
+		distances (numpy.ndarray): Distance of each point, shape (n,).
+		points (numpy.ndarray): The points, shape (n, 3), to locate the worst one.
+
+	Returns:
+		DistanceStats: The statistics. All zero, with no worst point, if there are no distances.
+	"""
+	if len(distances) == 0:
+		return DistanceStats(0.0, 0.0, 0.0, tuple(0.0 for _ in DISTANCE_PERCENTILES), None, None)
+	worstIndex = int(np.argmax(distances))
+	return DistanceStats(
+		float(distances[worstIndex]),
+		float(np.mean(distances)),
+		float(np.sqrt(np.mean(np.square(distances)))),
+		tuple(float(percentile) for percentile in np.percentile(distances, DISTANCE_PERCENTILES)),
+		worstIndex,
+		tuple(float(coordinate) for coordinate in points[worstIndex]),
+	)
+
+def inverseSimilarity(transform) -> tuple[vtkTransform, float]:
+	"""
+	Inverts a similarity transform.
+
+	Args:
+		transform (vtkLinearTransform): Similarity transform (rotation, translation and uniform scale).
+
+	Returns:
+		tuple[vtkTransform, float]: The inverse transform, and the uniform scale of the transform itself.
+	"""
+	# Invert the current matrix rather than using GetLinearInverse(), which for landmark and ICP transforms
+	# re-solves the alignment with source and target swapped instead of giving the exact inverse.
+	inverseMatrix = vtkMatrix4x4()
+	inverseMatrix.DeepCopy(transform.GetMatrix())
+	scale = abs(inverseMatrix.Determinant()) ** (1 / 3)
+	inverseMatrix.Invert()
+	inverseTransform = vtkTransform()
+	inverseTransform.SetMatrix(inverseMatrix)
+	return inverseTransform, scale
+
+class PreparedTarget:
+	"""
+    A polydata with its spatial indices built once, so that repeated Hausdorff distance queries against it
+    do not rebuild a locator on every call the way vtkHausdorffDistancePointSetFilter does.
+
+    Distances are point to point, matching the default behaviour of vtkHausdorffDistancePointSetFilter.
+
+    All queries accept an optional bound. Once a distance is known to exceed the bound the query may stop
+    early, in which case the returned value is only a lower bound on the true distance (but still above the
+    bound). Values below the bound are always exact.
+
+    Attributes:
+        polyData (vtkPolyData): The indexed polydata. Must not be modified while the index is in use.
+        queryIndices (list[tuple[vtkPolyData, vtkStaticPointLocator]]): Idle probe sources with their point locators.
+            A probe source is the polydata's points carrying their own coordinates as point data, so that a nearest
+            point interpolation returns the closest point for every query point in one pass. A query checks one out
+            for its duration, so queries from several threads never share a pipeline input.
+        queryIndicesLock (threading.Lock): Guards queryIndices.
+        mTime (int): Modified time of the polydata when the index was built.
+    """
+
+	def __init__(self, polyData):
+		"""
+        Initializes a PreparedTarget object and builds its point locator.
+
+        Args:
+            polyData (vtkPolyData): The polydata to index.
+        """
+		self.polyData = polyData
+		self.cellLocator = None
+		self.mTime = polyData.GetMTime()
+		self.queryIndicesLock = threading.Lock()
+		self.buildIndex()
+
+	def buildIndex(self):
+		"""
+		Builds the first probe source and point locator used for closest point queries, more are built by concurrent
+		queries as needed.
+
+		Args:
+			None
+
+		Returns:
+			None
+		"""
+		self.queryIndices = [self.newQueryIndex()]
+
+	def newQueryIndex(self) -> tuple[vtkPolyData, vtkStaticPointLocator]:
+		"""
+		Builds a probe source over the polydata's points, sharing their buffer, and a point locator over it.
+
+		Args:
+			None
+
+		Returns:
+			tuple[vtkPolyData, vtkStaticPointLocator]: The probe source and its built locator.
+		"""
+		coordinates = self.polyData.GetPoints().GetData()
+		probeCoordinates = coordinates.NewInstance()
+		probeCoordinates.ShallowCopy(coordinates)							# Shares the coordinate buffer, no copy
+		probePoints = vtkPoints()
+		probePoints.SetData(probeCoordinates)
+		closestPoints = coordinates.NewInstance()
+		closestPoints.ShallowCopy(coordinates)
+		closestPoints.SetName(CLOSEST_POINT_ARRAY)
+		probeSource = vtkPolyData()
+		probeSource.SetPoints(probePoints)
+		probeSource.GetPointData().AddArray(closestPoints)
+
+		# Built on the probe source, which is the dataset the interpolator hands to the locator. Built on anything else
+		# the interpolator would swap the dataset and rebuild it on first use.
+		pointLocator = vtkStaticPointLocator()
+		pointLocator.SetDataSet(probeSource)
+		pointLocator.BuildLocator()
+		return probeSource, pointLocator
+
+	def isValidFor(self, polyData) -> bool:
+		"""
+		Checks whether this index still describes the given polydata.
+
+		Args:
+			polyData (vtkPolyData): Polydata to check against.
+
+		Returns:
+			bool: True if the index was built on this polydata and it has not been modified since.
+		"""
+		return polyData is self.polyData and polyData.GetMTime() <= self.mTime
+
+	def getCellLocator(self) -> vtkCellLocator:
+		"""
+		Gets a cell locator over the polydata, building it on first use. This is the locator type used by
+		vtkIterativeClosestPointTransform, which will reuse it rather than building its own.
+
+		Args:
+			None
+
+		Returns:
+			vtkCellLocator: The built cell locator.
+		"""
+		if self.cellLocator is None:
+			self.cellLocator = vtkCellLocator()
+			self.cellLocator.SetDataSet(self.polyData)
+			self.cellLocator.SetNumberOfCellsPerBucket(1)
+			self.cellLocator.BuildLocator()
+		return self.cellLocator
+
+	def maxClosestDistance(self, points, bound=None) -> float:
+		"""
+		Finds the largest distance from any of the given points to its closest point in the indexed polydata.
+		All points are queried in a single pass, so the bound is not used to stop early.
+
+		Args:
+			points (vtkPoints): Query points.
+			bound (float): Distance beyond which the exact value is not needed.
+
+		Returns:
+			float: The maximum closest point distance, 0 if there are no query points.
+		"""
+		if points.GetNumberOfPoints() == 0:
+			return 0.0
+		return math.sqrt(np.max(self.closestSquaredDistances(points)))
+
+	def closestSquaredDistances(self, points) -> np.ndarray:
+		"""
+		Finds the squared distance from each of the given points to its closest point in the indexed polydata.
+
+		Args:
+			points (vtkPoints): Query points.
+
+		Returns:
+			numpy.ndarray: Squared closest point distance of each query point, shape (n,).
+		"""
+		# Nearest point (Voronoi) interpolation against a prebuilt locator. The interpolator reuses the locator
+		# without rebuilding it, and runs the closest point queries in parallel in C++. Concurrent queries each
+		# check out their own probe source and locator, the first query of each extra thread builds a new pair.
+		with self.queryIndicesLock:
+			queryIndex = self.queryIndices.pop() if self.queryIndices else None
+		if queryIndex is None:
+			queryIndex = self.newQueryIndex()
+		probeSource, pointLocator = queryIndex
+		try:
+			queryPolyData = vtkPolyData()
+			queryPolyData.SetPoints(points)
+			interpolator = vtkPointInterpolator()
+			interpolator.SetInputData(queryPolyData)
+			interpolator.SetSourceData(probeSource)
+			interpolator.SetKernel(vtkVoronoiKernel())
+			interpolator.SetLocator(pointLocator)
+			interpolator.Update()
+		finally:
+			with self.queryIndicesLock:
+				self.queryIndices.append(queryIndex)
+
+		closestPoints = vtk_to_numpy(interpolator.GetOutput().GetPointData().GetArray(CLOSEST_POINT_ARRAY))
+		queryPoints = vtk_to_numpy(points.GetData())
+		return np.sum(np.square(queryPoints - closestPoints, dtype=np.float64), axis=1)
+
+	def directedDistance(self, source, transform=None, bound=None) -> float:
+		"""
+		Gets the directed Hausdorff distance from a source to this target, i.e. how far the worst source point
+		is from the target.
+
+		Args:
+			source (PreparedTarget): Source to measure from.
+			transform (vtkLinearTransform): Optional transform to apply to the source points before measuring.
+			bound (float): Distance beyond which the exact value is not needed.
+
+		Returns:
+			float: Directed Hausdorff distance from source to target.
+		"""
+		return self.maxClosestDistance(self.movedPoints(source, transform), bound)
+
+	def directedDistances(self, source, transform=None) -> tuple[np.ndarray, np.ndarray]:
+		"""
+		Gets the distance from every point of a source to this target, the per point field behind directedDistance.
+
+		Args:
+			source (PreparedTarget): Source to measure from.
+			transform (vtkLinearTransform): Optional transform to apply to the source points before measuring.
+
+		Returns:
+			tuple[numpy.ndarray, numpy.ndarray]: Closest point distance of each source point, shape (n,), and the
+				(transformed) source points they were measured from, shape (n, 3).
+		"""
+		sourcePoints = self.movedPoints(source, transform)
+		if sourcePoints.GetNumberOfPoints() == 0:
+			return np.zeros(0), vtk_to_numpy(sourcePoints.GetData())
+		return np.sqrt(self.closestSquaredDistances(sourcePoints)), vtk_to_numpy(sourcePoints.GetData())
+
+	def movedPoints(self, source, transform=None) -> vtkPoints:
+		"""
+		Gets the points of a source, through a transform if given.
+
+		Args:
+			source (PreparedTarget): The source.
+			transform (vtkLinearTransform): Optional transform to apply to the source points.
+
+		Returns:
+			vtkPoints: The source's own points, or a transformed copy.
+		"""
+		sourcePoints = source.polyData.GetPoints()
+		if transform is not None:
+			transformedPoints = vtkPoints()
+			transform.TransformPoints(sourcePoints, transformedPoints)
+			sourcePoints = transformedPoints
+		return sourcePoints
+
+	def hausdorffDistance(self, source, transform=None, bound=None) -> float:
+		"""
+		Gets the symmetric Hausdorff distance between a source and this target.
+
+		When a transform is given, the target to source direction is evaluated by moving the target points
+		through the inverse transform into the source's frame, so the source's own index is reused instead
+		of indexing a transformed copy. This requires the transform to be a similarity (rotation, translation
+		and uniform scale), which holds for every alignment transform used by MeshModel.compareMeshes.
+
+		Args:
+			source (PreparedTarget): Source to compare against.
+			transform (vtkLinearTransform): Optional similarity transform to apply to the source.
+			bound (float): Distance beyond which the exact value is not needed.
+
+		Returns:
+			float: Symmetric Hausdorff distance between the (transformed) source and the target.
+		"""
+		sourceToTarget = self.directedDistance(source, transform, bound)
+		if bound is not None and sourceToTarget > bound:
+			return sourceToTarget					# No need to measure the other direction
+		if transform is None:
+			return max(sourceToTarget, source.directedDistance(self, None, bound))
+
+		inverseTransform, scale = inverseSimilarity(transform)
+		sourceBound = None if bound is None else bound / scale
+		targetToSource = source.directedDistance(self, inverseTransform, sourceBound) * scale
+		return max(sourceToTarget, targetToSource)
+
+	def distanceField(self, source, transform=None) -> DistanceField:
+		"""
+		Measures the distance from every source point to this target and from every target point to the source, and
+		their statistics, in one pass over each direction. The same queries as an exact hausdorffDistance, so the
+		field's Hausdorff distance matches it, the per point arrays just are not reduced to their maximum.
+
+		Args:
+			source (PreparedTarget): Source to compare against.
+			transform (vtkLinearTransform): Optional similarity transform to apply to the source.
+
+		Returns:
+			DistanceField: The distances in both directions and their statistics.
+		"""
+		sourceDistances, sourcePoints = self.directedDistances(source, transform)
+		if transform is None:
+			targetDistances, targetPoints = source.directedDistances(self)
+		else:
+			inverseTransform, scale = inverseSimilarity(transform)
+			targetDistances, _ = source.directedDistances(self, inverseTransform)
+			targetDistances *= scale
+			targetPoints = vtk_to_numpy(self.polyData.GetPoints().GetData())
+		return DistanceField(sourceDistances, targetDistances, distanceStats(sourceDistances, sourcePoints), distanceStats(targetDistances, targetPoints))
+
+class KDTreeTarget(PreparedTarget):
+	"""
+    A NumPy backed alternative to PreparedTarget. Point coordinates are viewed directly from the VTK arrays
+    without copying, transformed with NumPy and queried against a KD-tree in batches. When a bound is given
+    the query stops at the first batch containing a point farther than the bound, which for clearly different
+    meshes means only a small fraction of the points are ever looked at.
+
+    Attributes:
+        pointArray (numpy.ndarray): Zero copy view of the polydata's point coordinates.
+        tree (scipy.spatial.cKDTree): KD-tree over the point coordinates.
+    """
+
+	def buildIndex(self):
+		"""
+		Builds the KD-tree used for closest point queries.
+
+		Args:
+			None
+
+		Returns:
+			None
+		"""
+		from scipy.spatial import cKDTree										# Imported on first use, SciPy doubles the import time of the module
+		self.pointArray = vtk_to_numpy(self.polyData.GetPoints().GetData())
+		self.tree = cKDTree(self.pointArray)
+
+	def maxClosestDistance(self, points, bound=None) -> float:
+		"""
+		Finds the largest distance from any of the given points to its closest point in the indexed polydata.
+
+		Args:
+			points (vtkPoints): Query points.
+			bound (float): Distance beyond which the exact value is not needed.
+
+		Returns:
+			float: The maximum closest point distance, 0 if there are no query points.
+		"""
+		return self.queryMaxDistance(vtk_to_numpy(points.GetData()), None, bound)
+
+	def directedDistance(self, source, transform=None, bound=None) -> float:
+		"""
+		Gets the directed Hausdorff distance from a source to this target, i.e. how far the worst source point
+		is from the target.
+
+		Args:
+			source (PreparedTarget): Source to measure from.
+			transform (vtkLinearTransform): Optional transform to apply to the source points before measuring.
+			bound (float): Distance beyond which the exact value is not needed.
+
+		Returns:
+			float: Directed Hausdorff distance from source to target.
+		"""
+		matrix = None
+		if transform is not None:
+			matrix = transformMatrix(transform)
+		return self.queryMaxDistance(vtk_to_numpy(source.polyData.GetPoints().GetData()), matrix, bound)
+
+	def directedDistances(self, source, transform=None) -> tuple[np.ndarray, np.ndarray]:
+		"""
+		Gets the distance from every point of a source to this target, queried against the KD-tree in one call.
+
+		Args:
+			source (PreparedTarget): Source to measure from.
+			transform (vtkLinearTransform): Optional transform to apply to the source points before measuring.
+
+		Returns:
+			tuple[numpy.ndarray, numpy.ndarray]: Closest point distance of each source point, shape (n,), and the
+				(transformed) source points they were measured from, shape (n, 3).
+		"""
+		points = vtk_to_numpy(source.polyData.GetPoints().GetData())
+		if transform is not None:
+			points = transformPoints(points, transformMatrix(transform), np.empty(points.shape))
+		if len(points) == 0:
+			return np.zeros(0), points
+		distances, _ = self.tree.query(points, workers=-1)
+		return distances, points
+
+	def queryMaxDistance(self, points, matrix=None, bound=None) -> float:
+		"""
+		Queries the KD-tree in batches for the largest closest point distance. Batches are strided samples of the
+		whole point array rather than contiguous runs, so the first batch already covers the entire mesh and an
+		early exit is found as soon as possible.
+
+		Args:
+			points (numpy.ndarray): Query points, shape (n, 3).
+			matrix (numpy.ndarray): Optional 4x4 transform to apply to each batch before querying.
+			bound (float): Distance beyond which the exact value is not needed.
+
+		Returns:
+			float: The maximum closest point distance, 0 if there are no query points.
+		"""
+		if len(points) == 0:
+			return 0.0
+
+		upperBound = np.inf if bound is None else bound
+		batchCount = -(-len(points) // QUERY_BATCH_SIZE)
+		maxDistance = 0.0
+		for batchStart in range(batchCount):
+			batch = points[batchStart::batchCount]
+			if matrix is not None:
+				batch = batch @ matrix[:3, :3].T + matrix[:3, 3]
+
+			distances, _ = self.tree.query(batch, distance_upper_bound=upperBound, workers=-1)
+			farPoints = np.isinf(distances)
+			if np.any(farPoints):
+				# A point lies beyond the bound. Measure just that one exactly so the returned lower bound is a real
+				# distance, then stop.
+				farDistance, _ = self.tree.query(batch[np.argmax(farPoints)])
+				return max(maxDistance, float(farDistance))
+			maxDistance = max(maxDistance, float(np.max(distances)))
+		return maxDistance
@@ -0,0 +1,353 @@
+#region IMPORTS
+import time
+from typing import NamedTuple
+import numpy as np
+from vtkmodules.util.numpy_support import vtk_to_numpy
+from vtkmodules.vtkCommonTransforms import vtkTransform
+from vtkmodules.vtkFiltersCore import vtkPolyDataNormals
+#endregion IMPORTS
+
+# Iterative closest point budget, and how many iterations run between cancellation checks of the VTK method
+ICP_MAX_ITERATIONS = 500
+ICP_ITERATION_STEP = 25
+ICP_LANDMARKS = 100
+ICP_TOLERANCE = 1e-5
+
+ICP_METHODS = ("vtk", "pointToPoint", "pointToPlane")
+LANDMARK_SAMPLINGS = ("uniform", "normalSpace", "curvature")
+FEATURE_NEIGHBOURS = 8															# Neighbours fitted to estimate a point's normal and curvature
+NORMAL_BINS = 3																	# Bins per normal component for normal space sampling
+STALL_ITERATIONS = 10															# Iterations without a better RMS after which an alignment gives up
+PLANE_DAMPING = 1e-3															# Damping of the point to plane step, relative to the system's mean diagonal
+HYPOTHESIS_PRUNE_RATIO = 1.5													# RMS, relative to the leader's, past which an ICP hypothesis is dropped
+
+class IcpSettings(NamedTuple):
+	"""
+    Configuration of the iterative closest point stage of a comparison.
+
+    Attributes:
+        method (str): "vtk" runs vtkIterativeClosestPointTransform against the closest points of the target's surface.
+            "pointToPoint" and "pointToPlane" run in NumPy against a KD-tree of the target's points, which is built once
+            and reused by every iteration and comparison. Point to plane minimizes the distances along the target's
+            normals, which lets the source slide along flat regions and usually converges in far fewer iterations.
+        sampling (str): How landmarks are chosen from the source points (NumPy methods only). "uniform" takes evenly
+            strided points like VTK does, "normalSpace" spreads them evenly over the directions of the normals so
+            small features that constrain the pose are not drowned out by large flat faces, and "curvature" favours
+            points where the surface bends.
+        landmarks (int): Number of source points matched per iteration.
+        maxIterations (int): Iteration budget.
+        tolerance (float): The alignment has converged once the landmarks move less than this on average in one
+            iteration.
+        seed (int): Seed of the random landmark sampling, so repeated comparisons give identical results.
+        hypotheses (int): Number of starting poses refined side by side, the best scoring of the unaligned source and
+            the bounding box orientations. More than one helps symmetric parts, whose true pose may lie in another basin
+            than the best starting guess. See MeshModel.alignHypotheses.
+    """
+	method: str = "vtk"
+	sampling: str = "uniform"
+	landmarks: int = ICP_LANDMARKS
+	maxIterations: int = ICP_MAX_ITERATIONS
+	tolerance: float = ICP_TOLERANCE
+	seed: int = 0
+	hypotheses: int = 1
+
+class IcpResult(NamedTuple):
+	"""
+    Outcome and convergence diagnostics of an iterative closest point alignment.
+
+    Attributes:
+        transform (vtkTransform): Transform taking the source onto its alignment with the target.
+        method (str): Method that ran, see IcpSettings.
+        iterations (int): Number of iterations run.
+        converged (bool): Whether the alignment converged before running out of iterations, i.e. whether the returned
+            pose moved the landmarks less than the tolerance.
+        rms (float): Root mean square distance from the aligned landmarks to the target: to its surface for the VTK
+            method, its closest points for point to point and its tangent planes for point to plane.
+        meanMotion (float): Mean distance the landmarks moved in the iteration that reached the returned pose.
+        seconds (float): Wall time of the alignment.
+    """
+	transform: vtkTransform
+	method: str
+	iterations: int
+	converged: bool
+	rms: float
+	meanMotion: float
+	seconds: float
+
+def matrixTransform(matrix) -> vtkTransform:
+	"""
+	Wraps a 4x4 NumPy matrix in a vtkTransform.
+
+	Args:
+		matrix (numpy.ndarray): Homogeneous transformation matrix, shape (4, 4).
+
+	Returns:
+		vtkTransform: The transform.
+	"""
+	transform = vtkTransform()
+	transform.PostMultiply()
+	transform.SetMatrix(matrix.ravel().tolist())
+	return transform
+
+def pointFeatures(points, tree) -> tuple[np.ndarray, np.ndarray]:
+	"""
+	Estimates each point's normal and curvature from the plane fitted to its nearest neighbours.
+
+	Args:
+		points (numpy.ndarray): Point coordinates, shape (n, 3).
+		tree (scipy.spatial.cKDTree): KD-tree over the points.
+
+	Returns:
+		tuple[numpy.ndarray, numpy.ndarray]: Unit normals, shape (n, 3), and surface variation (the smallest eigenvalue
+			of the neighbourhood's covariance over their sum, 0 where flat and at most 1/3), shape (n,).
+	"""
+	_, neighbours = tree.query(points, min(FEATURE_NEIGHBOURS, len(points)))
+	neighbourhoods = points[neighbours.reshape(len(points), -1)]
+	offsets = neighbourhoods - neighbourhoods.mean(axis=1, keepdims=True)
+	eigenvalues, eigenvectors = np.linalg.eigh(np.einsum("nki,nkj->nij", offsets, offsets))
+	variation = eigenvalues[:, 0] / np.maximum(eigenvalues.sum(axis=1), np.finfo(float).tiny)
+	return eigenvectors[:, :, 0], variation
+
+def meshNormals(polyData) -> np.ndarray:
+	"""
+	Computes the point normals of a mesh from its polygons.
+
+	Args:
+		polyData (vtkPolyData): The mesh. Must have polygons.
+
+	Returns:
+		numpy.ndarray: Unit normal of each point, shape (n, 3).
+	"""
+	normalsFilter = vtkPolyDataNormals()
+	normalsFilter.SetInputData(polyData)
+	normalsFilter.SplittingOff()													# Keep exactly one normal per input point
+	normalsFilter.ComputePointNormalsOn()
+	normalsFilter.ComputeCellNormalsOff()
+	normalsFilter.Update()
+	return vtk_to_numpy(normalsFilter.GetOutput().GetPointData().GetNormals()).astype(np.float64)
+
+def sampleLandmarks(polyData, settings) -> np.ndarray:
+	"""
+	Chooses the source points matched by each ICP iteration.
+
+	Args:
+		polyData (vtkPolyData): The source.
+		settings (IcpSettings): Number of landmarks, sampling strategy and seed.
+
+	Returns:
+		numpy.ndarray: Indices of the landmark points.
+	"""
+	points = vtk_to_numpy(polyData.GetPoints().GetData()).astype(np.float64)
+	count = min(settings.landmarks, len(points))
+	if settings.sampling == "uniform" or count == len(points):
+		return np.linspace(0, len(points) - 1, count).astype(np.int64)
+
+	from scipy.spatial import cKDTree
+	rng = np.random.default_rng(settings.seed)
+	if settings.sampling == "curvature":
+		_, variation = pointFeatures(points, cKDTree(points))
+		weights = variation + variation.mean() + np.finfo(float).tiny			# Flat regions keep some weight, they still pin the pose down
+		return rng.choice(len(points), count, replace=False, p=weights / weights.sum())
+
+	# Normal space: bucket the points by normal direction, then take one point from each bucket in turn
+	normals = meshNormals(polyData) if polyData.GetNumberOfPolys() > 0 else pointFeatures(points, cKDTree(points))[0]
+	bins = np.round(normals * NORMAL_BINS).astype(np.int64) + NORMAL_BINS
+	keys = (bins[:, 0] * (2 * NORMAL_BINS + 1) + bins[:, 1]) * (2 * NORMAL_BINS + 1) + bins[:, 2]
+	shuffled = rng.permutation(len(points))
+	grouped = shuffled[np.argsort(keys[shuffled], kind="stable")]
+	groupedKeys = keys[grouped]
+	groupStarts = np.flatnonzero(np.r_[True, groupedKeys[1:] != groupedKeys[:-1]])
+	ranks = np.arange(len(grouped)) - np.repeat(groupStarts, np.diff(np.r_[groupStarts, len(grouped)]))
+	return grouped[np.argsort(ranks, kind="stable")[:count]]
+
+def pointToPointStep(moved, matched) -> tuple[np.ndarray, np.ndarray]:
+	"""
+	Solves for the rigid motion best mapping points onto their matches in the least squares sense (Kabsch).
+
+	Args:
+		moved (numpy.ndarray): Landmarks in their current pose, shape (m, 3).
+		matched (numpy.ndarray): Closest target point of each landmark, shape (m, 3).
+
+	Returns:
+		tuple[numpy.ndarray, numpy.ndarray]: Rotation (3, 3) and translation (3,) of the step.
+	"""
+	movedCentroid = moved.mean(axis=0)
+	matchedCentroid = matched.mean(axis=0)
+	u, _, vt = np.linalg.svd((moved - movedCentroid).T @ (matched - matchedCentroid))
+	reflection = np.diag([1.0, 1.0, np.sign(np.linalg.det(vt.T @ u.T))])
+	rotation = vt.T @ reflection @ u.T
+	return rotation, matchedCentroid - rotation @ movedCentroid
+
+def pointToPlaneStep(moved, matched, normals) -> tuple[np.ndarray, np.ndarray]:
+	"""
+	Solves for the small rigid motion minimizing the landmarks' distances to the tangent planes at their matches,
+	linearized in the rotation angles.
+
+	Args:
+		moved (numpy.ndarray): Landmarks in their current pose, shape (m, 3).
+		matched (numpy.ndarray): Closest target point of each landmark, shape (m, 3).
+		normals (numpy.ndarray): Target normal at each match, shape (m, 3).
+
+	Returns:
+		tuple[numpy.ndarray, numpy.ndarray]: Rotation (3, 3) and translation (3,) of the step.
+	"""
+	# Rotate about the landmarks' centroid, which keeps the rotation and translation unknowns on comparable scales
+	centroid = moved.mean(axis=0)
+	system = np.hstack([np.cross(moved - centroid, normals), normals])
+	residuals = np.einsum("ij,ij->i", matched - moved, normals)
+
+	# Damped normal equations: directions the planes do not constrain (sliding along a cylinder's axis, spinning a
+	# surface of revolution) get a small step instead of an arbitrarily large one
+	normalMatrix = system.T @ system
+	damping = PLANE_DAMPING * np.trace(normalMatrix) / 6
+	solution = np.linalg.solve(normalMatrix + damping * np.eye(6), system.T @ residuals)
+	rotationVector, translation = solution[:3], solution[3:]
+
+	# Rodrigues' formula, so the step is an exact rotation rather than its linearization
+	angle = np.linalg.norm(rotationVector)
+	if angle == 0:
+		return np.eye(3), translation
+	axis = rotationVector / angle
+	crossMatrix = np.array([[0, -axis[2], axis[1]], [axis[2], 0, -axis[0]], [-axis[1], axis[0], 0]])
+	rotation = np.eye(3) + np.sin(angle) * crossMatrix + (1 - np.cos(angle)) * crossMatrix @ crossMatrix
+	return rotation, centroid + translation - rotation @ centroid
+
+class IcpTarget:
+	"""
+    The target side of the NumPy ICP methods: a KD-tree over the target's points, and their normals for point to
+    plane. Both are built on first use and then reused by every iteration, and by every later alignment for as long as
+    the target is cached (see MeshModel.getIcpTarget and MeshPyramid.getIndex).
+
+    Attributes:
+        polyData (vtkPolyData): The target.
+        mTime (int): Modified time of the target when the index was created.
+        points (numpy.ndarray): Target point coordinates, None until built.
+        tree (scipy.spatial.cKDTree): KD-tree over the target points, None until built.
+        normals (numpy.ndarray): Unit normal of each target point, None until needed. Taken from the polygons when the
+            target has any, otherwise fitted to each point's neighbours.
+    """
+
+	def __init__(self, polyData):
+		"""
+        Initializes an IcpTarget object.
+
+        Args:
+            polyData (vtkPolyData): The target.
+        """
+		self.polyData = polyData
+		self.mTime = polyData.GetMTime()
+		self.points = None
+		self.tree = None
+		self.normals = None
+
+	def isValidFor(self, polyData) -> bool:
+		"""
+		Checks whether this index still describes the given polydata.
+
+		Args:
+			polyData (vtkPolyData): Polydata to check against.
+
+		Returns:
+			bool: True if the index was built on this polydata and it has not been modified since.
+		"""
+		return polyData is self.polyData and polyData.GetMTime() <= self.mTime
+
+	def getTree(self):
+		"""
+		Gets the KD-tree over the target points, building it on first use.
+
+		Args:
+			None
+
+		Returns:
+			scipy.spatial.cKDTree: The KD-tree.
+		"""
+		if self.tree is None:
+			from scipy.spatial import cKDTree
+			self.points = vtk_to_numpy(self.polyData.GetPoints().GetData()).astype(np.float64)
+			self.tree = cKDTree(self.points)
+		return self.tree
+
+	def getNormals(self) -> np.ndarray:
+		"""
+		Gets the normals of the target points, computing them on first use.
+
+		Args:
+			None
+
+		Returns:
+			numpy.ndarray: Unit normal of each target point, shape (n, 3).
+		"""
+		if self.normals is None:
+			tree = self.getTree()
+			self.normals = meshNormals(self.polyData) if self.polyData.GetNumberOfPolys() > 0 else pointFeatures(self.points, tree)[0]
+		return self.normals
+
+	def align(self, source, settings, matchCentroids=True, cancelled=None) -> IcpResult:
+		"""
+		Rigidly aligns a source to the target with the point to point or point to plane method. The alignment stops once
+		the landmarks move less than the tolerance in an iteration, once the iterations run out, or once the RMS has not
+		improved for STALL_ITERATIONS iterations; the best pose seen is returned. Its convergence flag and mean motion are
+		those of the iteration that reached that pose, not of the last iteration run.
+
+		Args:
+			source (vtkPolyData): Source mesh to align. Not modified.
+			settings (IcpSettings): Method, landmark sampling and stopping criteria.
+			matchCentroids (bool): Whether to translate the source's centroid onto the target's before the first iteration.
+			cancelled (callable): Polled every iteration, the alignment stops once it returns True. None to run
+				uninterrupted.
+
+		Returns:
+			IcpResult: The alignment and its diagnostics. None if cancelled.
+		"""
+		startTime = time.perf_counter()
+		tree = self.getTree()
+		normals = self.getNormals() if settings.method == "pointToPlane" else None
+		sourcePoints = vtk_to_numpy(source.GetPoints().GetData()).astype(np.float64)
+		landmarks = sourcePoints[sampleLandmarks(source, settings)]
+
+		rotation = np.eye(3)
+		translation = np.zeros(3)
+		if matchCentroids:
+			translation = self.points.mean(axis=0) - sourcePoints.mean(axis=0)
+
+		# Each pass measures the current pose, remembering the best one seen, then steps. On shapes that do not match the
+		# correspondences can keep flipping between poses without ever settling, so the run also ends once the best RMS
+		# has not improved for STALL_ITERATIONS, and the best pose is returned rather than wherever it stopped.
+		iterations = 0
+		meanMotion = np.inf
+		best = (np.inf, rotation, translation, meanMotion)
+		stalled = 0
+		moved = landmarks + translation
+		while True:
+			distances, matches = tree.query(moved)
+			if normals is not None:
+				distances = np.einsum("ij,ij->i", moved - self.points[matches], normals[matches])
+			rms = float(np.sqrt(np.mean(distances**2)))
+			if rms < best[0] - settings.tolerance:
+				stalled = 0
+			else:
+				stalled += 1
+			if rms < best[0]:
+				best = (rms, rotation, translation, meanMotion)
+			if iterations >= settings.maxIterations or meanMotion < settings.tolerance or stalled > STALL_ITERATIONS:
+				break
+			if cancelled is not None and cancelled():
+				return None
+
+			if normals is None:
+				stepRotation, stepTranslation = pointToPointStep(moved, self.points[matches])
+			else:
+				stepRotation, stepTranslation = pointToPlaneStep(moved, self.points[matches], normals[matches])
+			rotation = stepRotation @ rotation
+			translation = stepRotation @ translation + stepTranslation
+			previous = moved
+			moved = landmarks @ rotation.T + translation
+			meanMotion = float(np.linalg.norm(moved - previous, axis=1).mean())
+			iterations += 1
+
+		rms, rotation, translation, bestMotion = best
+		matrix = np.eye(4)
+		matrix[:3, :3] = rotation
+		matrix[:3, 3] = translation
+		return IcpResult(matrixTransform(matrix), settings.method, iterations, bestMotion < settings.tolerance, rms, bestMotion, time.perf_counter() - startTime)
@@ -0,0 +1,494 @@
+#region IMPORTS
+import os
+import importlib
+import numpy as np
+from vtkmodules.util.numpy_support import numpy_to_vtk, vtk_to_numpy
+from vtkmodules.vtkCommonCore import VTK_ID_TYPE, vtkPoints
+from vtkmodules.vtkCommonDataModel import vtkCellArray, vtkPolyData
+#endregion IMPORTS
+
+DEFAULT_CHUNK_SIZE = 1 << 18												# Triangles (or vertices) handled per chunk
+
+STL_HEADER_SIZE = 80
+STL_HEADER = b"Binary STL generated by fus-mesh".ljust(STL_HEADER_SIZE, b" ")
+STL_RECORD = np.dtype([("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attribute", "<u2")])
+
+# PLY scalar type names (both the original and the sized spellings) and their NumPy equivalents, without byte order
+PLY_TYPES = {
+	"char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+	"short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+	"int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+	"float": "f4", "float32": "f4", "double": "f8", "float64": "f8",
+}
+PLY_BYTE_ORDERS = {"binary_little_endian": "<", "binary_big_endian": ">"}
+PLY_FACE_LISTS = ("vertex_indices", "vertex_index")
+
+# VTK readers and writers by extension, as (module, class). They are only imported the first time a file of that type
+# needs them, so loading a binary STL through the fast path never loads VTK's IO modules at all
+VTK_READERS = {
+	".ply": ("vtkmodules.vtkIOPLY", "vtkPLYReader"),
+	".vtp": ("vtkmodules.vtkIOXML", "vtkXMLPolyDataReader"),
+	".obj": ("vtkmodules.vtkIOGeometry", "vtkOBJReader"),
+	".stl": ("vtkmodules.vtkIOGeometry", "vtkSTLReader"),
+	".vtk": ("vtkmodules.vtkIOLegacy", "vtkPolyDataReader"),
+}
+VTK_WRITERS = {
+	".ply": ("vtkmodules.vtkIOPLY", "vtkPLYWriter"),
+	".vtp": ("vtkmodules.vtkIOXML", "vtkXMLPolyDataWriter"),
+	".stl": ("vtkmodules.vtkIOGeometry", "vtkSTLWriter"),
+}
+
+def createVtkAlgorithm(classes, extension):
+	"""
+	Creates the VTK reader or writer for a file type, importing its module on first use.
+
+	Args:
+		classes (dict[str, tuple[str, str]]): Module and class name by extension, VTK_READERS or VTK_WRITERS.
+		extension (str): Lower case extension of the file, including the dot.
+
+	Returns:
+		vtkAlgorithm: A new reader or writer. None if the file type is not supported.
+	"""
+	if extension not in classes:
+		return None
+	moduleName, className = classes[extension]
+	return getattr(importlib.import_module(moduleName), className)()
+
+def readMesh(filepath) -> vtkPolyData:
+	"""
+	Reads a binary STL or binary PLY file through the native fast path.
+
+	Args:
+		filepath (str): Filepath of the mesh.
+
+	Returns:
+		vtkPolyData: The mesh. None if the file is not a binary STL/PLY the fast path supports, in which case it should be
+			read with the VTK reader instead.
+	"""
+	extension = os.path.splitext(filepath)[1].lower()
+	if extension == ".stl":
+		return readBinaryStl(filepath)
+	if extension == ".ply":
+		return readBinaryPly(filepath)
+	return None
+
+def writeMesh(filepath, polyData) -> bool:
+	"""
+	Writes a binary STL or binary PLY file through the native fast path.
+
+	Args:
+		filepath (str): Filepath to write to.
+		polyData (vtkPolyData): Mesh to write.
+
+	Returns:
+		bool: Whether the mesh was written. False if the format or the mesh's cells are not supported by the fast path,
+			in which case it should be written with the VTK writer instead.
+	"""
+	extension = os.path.splitext(filepath)[1].lower()
+	if extension == ".stl":
+		return writeBinaryStl(filepath, polyData)
+	if extension == ".ply":
+		return writeBinaryPly(filepath, polyData)
+	return False
+
+def readBinaryStl(filepath, chunkSize=DEFAULT_CHUNK_SIZE) -> vtkPolyData:
+	"""
+	Reads a binary STL file. The triangle records are memory mapped one chunk at a time and viewed in place as a
+	structured array, and coincident vertices are merged chunk by chunk, so neither the file nor the raw triangle soup is
+	ever held in memory as a whole. The result matches vtkSTLReader with merging on: points in order of first use, and
+	triangles that collapse after merging are dropped.
+
+	Args:
+		filepath (str): Filepath of the STL file.
+		chunkSize (int): Number of triangles merged at a time, bounds the temporary memory used.
+
+	Returns:
+		vtkPolyData: The mesh. None if the file is not a binary STL.
+	"""
+	fileSize = os.path.getsize(filepath)
+	if fileSize < STL_HEADER_SIZE + 4:
+		return None
+	triangleCount = int(np.fromfile(filepath, dtype="<u4", count=1, offset=STL_HEADER_SIZE)[0])
+	if fileSize != STL_HEADER_SIZE + 4 + triangleCount * STL_RECORD.itemsize:
+		return None															# ASCII STL, or a truncated file the VTK reader can report on
+	if triangleCount == 0:
+		return buildPolyData(np.zeros((0, 3), dtype=np.float32), np.zeros((0, 3), dtype=np.int64))
+
+	def vertexChunks():
+		for start in range(0, triangleCount, chunkSize):
+			records = np.memmap(filepath, dtype=STL_RECORD, mode="r", offset=STL_HEADER_SIZE + 4 + start * STL_RECORD.itemsize, shape=(min(chunkSize, triangleCount - start),))
+			yield np.ascontiguousarray(records["vertices"])				# The chunk's pages are unmapped once records goes
+
+	points, triangles = mergeVertices(vertexChunks(), triangleCount)
+
+	keep = (triangles[:, 0] != triangles[:, 1]) & (triangles[:, 0] != triangles[:, 2]) & (triangles[:, 1] != triangles[:, 2])
+	if not keep.all():
+		triangles = triangles[keep]
+	return buildPolyData(points, triangles)
+
+def mergeVertices(vertexChunks, triangleCount) -> tuple[np.ndarray, np.ndarray]:
+	"""
+	Merges bitwise identical vertices of a triangle soup. Each chunk is merged on its own first, then the (much smaller)
+	per chunk unique vertices are merged with each other, so the sort never sees more than one chunk of raw vertices.
+
+	Args:
+		vertexChunks (Iterable[numpy.ndarray]): Consecutive chunks of triangle corners, each of shape (k, 3, 3).
+		triangleCount (int): Total number of triangles in all chunks.
+
+	Returns:
+		tuple[numpy.ndarray, numpy.ndarray]: Unique points in order of first use, shape (m, 3), and the triangles as
+			indices into them, shape (n, 3).
+	"""
+	chunkPoints = []
+	chunkIndices = []
+	for chunk in vertexChunks:
+		chunk = np.ascontiguousarray(chunk, dtype=np.float32).reshape(-1, 3)
+		chunk += np.float32(0)												# Folds -0.0 into 0.0, which vtkMergePoints treats as the same point
+		points, indices = uniqueRows(chunk)
+		chunkPoints.append(points)
+		chunkIndices.append(indices.astype(np.int32))
+
+	points, globalIndices = uniqueRows(np.concatenate(chunkPoints))
+	triangles = np.empty(triangleCount * 3, dtype=np.int64)
+	start = 0
+	offset = 0
+	for uniquePoints, indices in zip(chunkPoints, chunkIndices):
+		triangles[start:start + len(indices)] = globalIndices[indices.astype(np.int64) + offset]
+		start += len(indices)
+		offset += len(uniquePoints)
+	return points, triangles.reshape(-1, 3)
+
+def uniqueRows(rows) -> tuple[np.ndarray, np.ndarray]:
+	"""
+	Finds the unique rows of a float32 array, ordered by first occurrence. Rows are grouped by a 64 bit hash of their
+	bits, which sorts much faster than the raw 12 byte rows; the grouping is then checked, and in the (practically
+	never seen) case of a hash collision the raw rows are grouped instead.
+
+	Args:
+		rows (numpy.ndarray): Contiguous float32 rows, shape (n, 3).
+
+	Returns:
+		tuple[numpy.ndarray, numpy.ndarray]: Unique rows, and the index into them of every input row.
+	"""
+	bits = rows.view(np.uint32).astype(np.uint64)
+	keys = ((bits[:, 0] << np.uint64(32)) | bits[:, 1]) * np.uint64(0x9E3779B97F4A7C15) ^ bits[:, 2] * np.uint64(0xC2B2AE3D27D4EB4F)
+	firstIndices, inverse = groupKeys(keys)
+	if not np.array_equal(rows[firstIndices][inverse], rows):
+		_, firstIndices, inverse = np.unique(rows.view(np.dtype((np.void, rows.dtype.itemsize * 3))).reshape(-1), return_index=True, return_inverse=True)
+		inverse = inverse.reshape(-1)
+
+	# Renumber the groups by first occurrence
+	order = np.argsort(firstIndices)
+	rank = np.empty_like(order)
+	rank[order] = np.arange(len(order))
+	return rows[firstIndices[order]], rank[inverse]
+
+def groupKeys(keys) -> tuple[np.ndarray, np.ndarray]:
+	"""
+	Groups equal keys. Equivalent to numpy.unique with return_index and return_inverse, but with an unstable sort and
+	without sorting the unique keys themselves, which is several times faster.
+
+	Args:
+		keys (numpy.ndarray): Integer keys to group, shape (n,).
+
+	Returns:
+		tuple[numpy.ndarray, numpy.ndarray]: Index of the first occurrence of each group, and the group of every key.
+	"""
+	order = np.argsort(keys)
+	sortedKeys = keys[order]
+	groupStarts = np.empty(len(keys), dtype=bool)
+	groupStarts[:1] = True
+	np.not_equal(sortedKeys[1:], sortedKeys[:-1], out=groupStarts[1:])
+
+	firstIndices = np.minimum.reduceat(order, np.flatnonzero(groupStarts))
+	inverse = np.empty(len(keys), dtype=np.int64)
+	inverse[order] = np.cumsum(groupStarts) - 1
+	return firstIndices, inverse
+
+def readBinaryPly(filepath) -> vtkPolyData:
+	"""
+	Reads a binary PLY file whose faces all have the same number of vertices. Vertex and face elements are memory
+	mapped and viewed as structured arrays. Like vtkPLYReader, points are single precision and vertex normals, colours
+	and texture coordinates are kept as the "Normals", "RGB"/"RGBA" and "TCoords" point arrays.
+
+	Args:
+		filepath (str): Filepath of the PLY file.
+
+	Returns:
+		vtkPolyData: The mesh. None if the file is ASCII, has variable length faces or any other element with a list
+			property, in which case it should be read with the VTK reader.
+	"""
+	header = readPlyHeader(filepath)
+	if header is None:
+		return None
+	byteOrder, elements, dataOffset = header
+
+	vertexRecords = None
+	faceRecords = None
+	faceSize = None
+	offset = dataOffset
+	for name, count, properties in elements:
+		lists = [prop for prop in properties if prop[1] == "list"]
+		if name == "face" and len(lists) == 1 and lists[0][0] in PLY_FACE_LISTS and count > 0:
+			# Peek at the first face's vertex count, then view every face assuming the same count and check the assumption
+			listName, _, countType, indexType = lists[0]
+			countOffset = sum(np.dtype(prop[1]).itemsize for prop in properties[:properties.index(lists[0])])
+			faceSize = int(np.fromfile(filepath, dtype=byteOrder + countType, count=1, offset=offset + countOffset)[0])
+
+			fields = []
+			for prop in properties:
+				if prop[1] == "list":
+					fields.append((listName + "_count", byteOrder + countType))
+					fields.append((listName, byteOrder + indexType, (faceSize,)))
+				else:
+					fields.append((prop[0], byteOrder + prop[1]))
+			dtype = np.dtype(fields)
+			if offset + count * dtype.itemsize > os.path.getsize(filepath):
+				return None
+			faceRecords = np.memmap(filepath, dtype=dtype, mode="r", offset=offset, shape=(count,))
+			if not np.all(faceRecords[listName + "_count"] == faceSize):
+				return None
+			faceRecords = faceRecords[listName]
+		elif lists:
+			return None
+		else:
+			dtype = np.dtype([(prop[0], byteOrder + prop[1]) for prop in properties])
+			if offset + count * dtype.itemsize > os.path.getsize(filepath):
+				return None
+			if name == "vertex":
+				vertexRecords = np.memmap(filepath, dtype=dtype, mode="r", offset=offset, shape=(count,)) if count > 0 else np.zeros(0, dtype=dtype)
+		offset += count * dtype.itemsize
+
+	if vertexRecords is None or any(axis not in vertexRecords.dtype.names for axis in ("x", "y", "z")):
+		return None
+
+	points = np.column_stack([vertexRecords[axis] for axis in ("x", "y", "z")]).astype(np.float32)
+	if faceRecords is None:
+		faces = np.zeros((0, 3), dtype=np.int64)
+	else:
+		faces = np.asarray(faceRecords, dtype=np.int64)
+	polyData = buildPolyData(points, faces)
+
+	names = vertexRecords.dtype.names
+	if all(axis in names for axis in ("nx", "ny", "nz")):
+		normals = numpy_to_vtk(np.column_stack([vertexRecords[axis] for axis in ("nx", "ny", "nz")]).astype(np.float32), deep=True)
+		normals.SetName("Normals")
+		polyData.GetPointData().SetNormals(normals)
+	colourNames = [channel for channel in ("red", "green", "blue", "alpha") if channel in names]
+	if len(colourNames) >= 3 and colourNames[:3] == ["red", "green", "blue"] and all(vertexRecords.dtype[channel] == np.uint8 for channel in colourNames):
+		colours = numpy_to_vtk(np.column_stack([vertexRecords[channel] for channel in colourNames]), deep=True)
+		colours.SetName("RGB" if len(colourNames) == 3 else "RGBA")
+		polyData.GetPointData().AddArray(colours)
+	if "u" in names and "v" in names:
+		tcoords = numpy_to_vtk(np.column_stack([vertexRecords[axis] for axis in ("u", "v")]).astype(np.float32), deep=True)
+		tcoords.SetName("TCoords")
+		polyData.GetPointData().SetTCoords(tcoords)
+	return polyData
+
+def readPlyHeader(filepath):
+	"""
+	Parses the header of a PLY file.
+
+	Args:
+		filepath (str): Filepath of the PLY file.
+
+	Returns:
+		tuple[str, list, int]: NumPy byte order character, the elements as (name, count, properties) and the offset of the
+			first data byte. Scalar properties are (name, type), list properties are (name, "list", count type, index
+			type), with types as NumPy type codes. None if the file is not a binary PLY.
+	"""
+	byteOrder = None
+	elements = []
+	with open(filepath, "rb") as plyFile:
+		if plyFile.readline().strip() != b"ply":
+			return None
+		for rawLine in plyFile:
+			words = rawLine.decode("ascii", errors="replace").split()
+			if not words or words[0] in ("comment", "obj_info"):
+				continue
+			if words[0] == "end_header":
+				return (byteOrder, elements, plyFile.tell()) if byteOrder is not None else None
+			if words[0] == "format":
+				byteOrder = PLY_BYTE_ORDERS.get(words[1]) if len(words) > 1 else None
+				if byteOrder is None:
+					return None												# ASCII
+			elif words[0] == "element":
+				if len(words) < 3 or not words[2].isdigit():
+					return None
+				elements.append((words[1], int(words[2]), []))
+			elif words[0] == "property" and elements:
+				if len(words) < 3 or (words[1] == "list" and len(words) < 5):
+					return None
+				if words[1] == "list":
+					if words[2] not in PLY_TYPES or words[3] not in PLY_TYPES:
+						return None
+					elements[-1][2].append((words[4], "list", PLY_TYPES[words[2]], PLY_TYPES[words[3]]))
+				elif words[1] in PLY_TYPES:
+					elements[-1][2].append((words[2], PLY_TYPES[words[1]]))
+				else:
+					return None
+	return None
+
+def buildPolyData(points, cells) -> vtkPolyData:
+	"""
+	Builds a polydata from a point array and a fixed size polygon array.
+
+	Args:
+		points (numpy.ndarray): Point coordinates, shape (n, 3).
+		cells (numpy.ndarray): Point indices of each polygon, shape (m, k).
+
+	Returns:
+		vtkPolyData: The mesh.
+	"""
+	# The VTK arrays take over the NumPy buffers (keeping them alive) rather than copying them
+	vtkPointArray = vtkPoints()
+	vtkPointArray.SetData(numpy_to_vtk(np.ascontiguousarray(points)))
+	cellSize = cells.shape[1] if cells.ndim == 2 else 3
+	polys = vtkCellArray()
+	polys.SetData(numpy_to_vtk(np.arange(0, len(cells) * cellSize + 1, cellSize, dtype=np.int64), array_type=VTK_ID_TYPE),
+		numpy_to_vtk(np.ascontiguousarray(cells, dtype=np.int64).reshape(-1), array_type=VTK_ID_TYPE))
+
+	polyData = vtkPolyData()
+	polyData.SetPoints(vtkPointArray)
+	polyData.SetPolys(polys)
+	return polyData
+
+def uniformPolygons(polyData) -> np.ndarray:
+	"""
+	Gets the polygons of a mesh as a fixed size index array, if the mesh only has polygons and they all have the same
+	number of points.
+
+	Args:
+		polyData (vtkPolyData): Mesh to get the polygons of.
+
+	Returns:
+		numpy.ndarray: Point indices of each polygon, shape (m, k). None if the mesh has other cells or mixed sizes.
+	"""
+	if polyData.GetPoints() is None or polyData.GetNumberOfVerts() or polyData.GetNumberOfLines() or polyData.GetNumberOfStrips():
+		return None
+	polys = polyData.GetPolys()
+	offsets = vtk_to_numpy(polys.GetOffsetsArray())
+	connectivity = vtk_to_numpy(polys.GetConnectivityArray())
+	if len(offsets) < 2:
+		return connectivity.reshape(0, 3)
+	sizes = np.diff(offsets)
+	if not np.all(sizes == sizes[0]):
+		return None
+	return connectivity.reshape(-1, int(sizes[0]))
+
+def writeBinaryStl(filepath, polyData, chunkSize=DEFAULT_CHUNK_SIZE) -> bool:
+	"""
+	Writes a binary STL file, streaming the triangle records in chunks so only one chunk is ever held in memory.
+
+	Args:
+		filepath (str): Filepath to write to.
+		polyData (vtkPolyData): Mesh to write. Must only have triangles.
+		chunkSize (int): Number of triangles written at a time.
+
+	Returns:
+		bool: Whether the mesh was written. False if it has cells other than triangles.
+	"""
+	triangles = uniformPolygons(polyData)
+	if triangles is None or triangles.shape[1] != 3:
+		return False
+	points = vtk_to_numpy(polyData.GetPoints().GetData())
+
+	with open(filepath, "wb") as stlFile:
+		stlFile.write(STL_HEADER)
+		stlFile.write(np.array([len(triangles)], dtype="<u4").tobytes())
+		for start in range(0, len(triangles), chunkSize):
+			corners = points[triangles[start:start + chunkSize]].astype(np.float32)
+			normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+			lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+			np.divide(normals, lengths, out=normals, where=lengths > 0)
+
+			records = np.zeros(len(corners), dtype=STL_RECORD)
+			records["normal"] = normals
+			records["vertices"] = corners
+			records.tofile(stlFile)
+	return True
+
+def writeBinaryPly(filepath, polyData, chunkSize=DEFAULT_CHUNK_SIZE) -> bool:
+	"""
+	Writes a little endian binary PLY file with single precision points, streaming vertices and faces in chunks so
+	only one chunk is ever held in memory. Like vtkPLYWriter, the active point normals and texture coordinates are
+	written, and so are "RGB"/"RGBA" colour arrays (or unsigned char scalars), as readBinaryPly reads them back.
+
+	Args:
+		filepath (str): Filepath to write to.
+		polyData (vtkPolyData): Mesh to write. Must only have polygons, all with the same number of points.
+		chunkSize (int): Number of vertices or faces written at a time.
+
+	Returns:
+		bool: Whether the mesh was written. False if the mesh's cells are not supported.
+
+	Raises:
+		ValueError: If the mesh has too many points to index with the 32 bit integers PLY readers expect.
+	"""
+	faces = uniformPolygons(polyData)
+	if faces is None or faces.shape[1] > np.iinfo(np.uint8).max:
+		return False
+	points = vtk_to_numpy(polyData.GetPoints().GetData())
+	if len(points) > np.iinfo(np.int32).max + 1:
+		indexType = "uint"
+		if len(points) > np.iinfo(np.uint32).max + 1:
+			raise ValueError("{} points cannot be indexed in a PLY file, the limit is 2^32".format(len(points)))
+	else:
+		indexType = "int"
+	vertexProperties = plyVertexProperties(polyData)
+	vertexDtype = np.dtype([(name, "<" + PLY_TYPES[plyType]) for name, plyType, _, _ in vertexProperties])
+	faceDtype = np.dtype([("count", "u1"), ("vertex_indices", "<" + PLY_TYPES[indexType], (faces.shape[1],))])
+
+	header = "\n".join([
+		"ply",
+		"format binary_little_endian 1.0",
+		"comment fus-mesh generated PLY File",
+		"element vertex {}".format(len(points)),
+	] + ["property {} {}".format(plyType, name) for name, plyType, _, _ in vertexProperties] + [
+		"element face {}".format(len(faces)),
+		"property list uchar {} vertex_indices".format(indexType),
+		"end_header",
+	]) + "\n"
+
+	with open(filepath, "wb") as plyFile:
+		plyFile.write(header.encode("ascii"))
+		for start in range(0, len(points), chunkSize):
+			records = np.empty(len(points[start:start + chunkSize]), dtype=vertexDtype)
+			for name, _, values, component in vertexProperties:
+				records[name] = values[start:start + chunkSize, component]
+			records.tofile(plyFile)
+		for start in range(0, len(faces), chunkSize):
+			records = np.empty(len(faces[start:start + chunkSize]), dtype=faceDtype)
+			records["count"] = faces.shape[1]
+			records["vertex_indices"] = faces[start:start + chunkSize]
+			records.tofile(plyFile)
+	return True
+
+def plyVertexProperties(polyData) -> list[tuple[str, str, np.ndarray, int]]:
+	"""
+	Lists the vertex properties of a mesh written to PLY: the point coordinates, then the active normals and texture
+	coordinates and a colour array if the mesh has them.
+
+	Args:
+		polyData (vtkPolyData): Mesh to write.
+
+	Returns:
+		list[tuple[str, str, numpy.ndarray, int]]: Name and PLY type of each property, with the array holding its
+			values, shape (n, k), and the component of that array it is.
+	"""
+	pointData = polyData.GetPointData()
+	properties = [(axis, "float", vtk_to_numpy(polyData.GetPoints().GetData()), i) for i, axis in enumerate(("x", "y", "z"))]
+	normals = pointData.GetNormals()
+	if normals is not None and normals.GetNumberOfComponents() == 3:
+		properties += [(axis, "float", vtk_to_numpy(normals), i) for i, axis in enumerate(("nx", "ny", "nz"))]
+	tcoords = pointData.GetTCoords()
+	if tcoords is not None and tcoords.GetNumberOfComponents() == 2:
+		properties += [(axis, "float", vtk_to_numpy(tcoords), i) for i, axis in enumerate(("u", "v"))]
+
+	colourArrays = [pointData.GetArray("RGBA"), pointData.GetArray("RGB"), pointData.GetScalars()]
+	for colours in colourArrays:
+		if colours is not None and colours.GetDataTypeAsString() == "unsigned char" and colours.GetNumberOfComponents() in (3, 4):
+			channels = ("red", "green", "blue", "alpha")[:colours.GetNumberOfComponents()]
+			properties += [(channel, "uchar", vtk_to_numpy(colours), i) for i, channel in enumerate(channels)]
+			break
+	return properties
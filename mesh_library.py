@@ -0,0 +1,247 @@
+#region IMPORTS
+import os
+import json
+import tempfile
+from typing import NamedTuple
+import numpy as np
+
+from mesh_descriptors import ShapeDescriptor
+from mesh_model import MeshModel
+#endregion IMPORTS
+
+LIBRARY_VERSION = 1
+DEFAULT_CANDIDATES = 5
+
+class LibraryEntry(NamedTuple):
+	"""
+    A reference mesh in a MeshLibrary.
+
+    Attributes:
+        filepath (str): File the mesh is loaded from for a full comparison. None if it was added from memory only.
+        size (int): Size of the file in bytes when it was indexed, None without a file.
+        mtime (int): Modification time of the file in nanoseconds when it was indexed, None without a file.
+        descriptor (ShapeDescriptor): Shape descriptor of the mesh.
+    """
+	filepath: str
+	size: int
+	mtime: int
+	descriptor: ShapeDescriptor
+
+class LibraryMatch(NamedTuple):
+	"""
+    A candidate from a MeshLibrary after its full comparison against a query mesh.
+
+    Attributes:
+        name (str): Name of the reference mesh.
+        descriptorDistance (float): Distance between the descriptors of the query and the reference.
+        result (bool): Whether the full comparison found the meshes to be the same.
+        icpHausDist (float): Hausdorff distance after iterative closest point refinement, None if the reference could
+            not be loaded.
+        alignedMatrix (tuple[float]): The 16 elements, row major, of the transform taking the query onto its best
+            alignment with the reference. None if the unaligned query was best, or the reference could not be loaded.
+    """
+	name: str
+	descriptorDistance: float
+	result: bool
+	icpHausDist: float
+	alignedMatrix: tuple = None
+
+class MeshLibrary:
+	"""
+    An index of reference meshes by shape descriptor, for identifying an unknown mesh without comparing it against the
+    whole library. A query ranks every reference by the distance between descriptor vectors, a single vectorized
+    pass, and only the closest few go through the full MeshModel.compareMeshes pipeline.
+
+    References are added and removed one at a time. The index persists as a JSON file, written atomically so readers
+    never see a partial index.
+
+    Attributes:
+        filepath (str): JSON file the index is saved to, None for an in-memory index.
+        entries (dict[str, LibraryEntry]): Indexed references by name.
+    """
+
+	def __init__(self, filepath=None):
+		"""
+        Initializes a MeshLibrary object.
+
+        Args:
+            filepath (str): JSON file to load the index from and save it to. Loaded if it exists.
+        """
+		self.filepath = filepath
+		self.entries = {}
+		self.names = None
+		self.vectors = None
+		self.squaredNorms = None
+		if filepath is not None and os.path.isfile(filepath):
+			self.load(filepath)
+
+	def __len__(self) -> int:
+		return len(self.entries)
+
+	def __contains__(self, name) -> bool:
+		return name in self.entries
+
+	def add(self, name, mesh, filepath=None):
+		"""
+		Adds a reference mesh, replacing any reference of the same name.
+
+		Args:
+			name (str): Name of the reference.
+			mesh (MeshModel): The reference mesh.
+			filepath (str): File the mesh can be reloaded from for full comparisons.
+
+		Returns:
+			None
+
+		Raises:
+			ValueError: If the mesh is empty, it has no descriptor to rank it by.
+		"""
+		descriptor = mesh.getShapeDescriptor()
+		if descriptor is None or mesh.vtkSource.GetOutput().GetNumberOfPoints() == 0:
+			raise ValueError("Cannot add {} to the library, the mesh is empty".format(name))
+		size, mtime = None, None
+		if filepath is not None:
+			filepath = os.path.abspath(filepath)
+			stat = os.stat(filepath)
+			size, mtime = stat.st_size, stat.st_mtime_ns
+		self.entries[name] = LibraryEntry(filepath, size, mtime, descriptor)
+		self.names = None
+
+	def addFile(self, filepath, cache=None) -> bool:
+		"""
+		Adds a mesh file as a reference named by its absolute filepath. Files already indexed are only measured again if
+		their size or modification time changed.
+
+		Args:
+			filepath (str): Filepath of the mesh.
+			cache (MeshCache): Optional on-disk cache of parsed meshes.
+
+		Returns:
+			bool: Whether the file is indexed. False if it could not be loaded or holds no points.
+		"""
+		filepath = os.path.abspath(filepath)
+		entry = self.entries.get(filepath)
+		if entry is not None and os.path.isfile(filepath):
+			stat = os.stat(filepath)
+			if entry.size == stat.st_size and entry.mtime == stat.st_mtime_ns:
+				return True
+
+		mesh = MeshModel()
+		if not mesh.loadMesh(filepath, cache) or mesh.vtkSource.GetOutput().GetNumberOfPoints() == 0:
+			return False
+		self.add(filepath, mesh, filepath)
+		return True
+
+	def remove(self, name) -> bool:
+		"""
+		Removes a reference.
+
+		Args:
+			name (str): Name of the reference.
+
+		Returns:
+			bool: Whether the reference was in the library.
+		"""
+		if self.entries.pop(name, None) is None:
+			return False
+		self.names = None
+		return True
+
+	def query(self, mesh, k=DEFAULT_CANDIDATES) -> list[tuple[str, float]]:
+		"""
+		Ranks the references by how alike their descriptors are to a mesh's.
+
+		Args:
+			mesh (MeshModel | ShapeDescriptor): The query mesh, or its descriptor.
+			k (int): Number of candidates to return.
+
+		Returns:
+			list[tuple[str, float]]: Name and descriptor distance of the k closest references, closest first.
+		"""
+		descriptor = mesh if isinstance(mesh, ShapeDescriptor) else mesh.getShapeDescriptor()
+		if descriptor is None or not self.entries:
+			return []
+
+		# The stacked vectors and their squared norms are rebuilt only after the library changed. The squared distances
+		# then take a single matrix-vector product, without any temporary the size of the library's vectors.
+		if self.names is None:
+			self.names = list(self.entries)
+			self.vectors = np.array([self.entries[name].descriptor.vector() for name in self.names])
+			self.squaredNorms = np.einsum("ij,ij->i", self.vectors, self.vectors)
+		vector = descriptor.vector()
+		distances = np.sqrt(np.maximum(self.squaredNorms - 2 * (self.vectors @ vector) + vector @ vector, 0))
+		k = min(k, len(distances))
+		closest = np.argpartition(distances, k - 1)[:k]
+		closest = closest[np.argsort(distances[closest])]
+		return [(self.names[index], float(distances[index])) for index in closest]
+
+	def identify(self, mesh, threshold, k=DEFAULT_CANDIDATES, cache=None, **compareOptions) -> list[LibraryMatch]:
+		"""
+		Identifies a mesh: shortlists the k references with the closest descriptors, then runs the full comparison
+		against each of them.
+
+		Args:
+			mesh (MeshModel): The mesh to identify.
+			threshold (float): Hausdorff distance threshold to determine if two meshes can be considered the same.
+			k (int): Number of candidates to compare in full.
+			cache (MeshCache): Optional on-disk cache of parsed meshes, for loading the references.
+			**compareOptions: Further keyword arguments of MeshModel.compareMeshes.
+
+		Returns:
+			list[LibraryMatch]: The compared candidates, closest descriptor first. References added without a file, or
+				that fail to load or compare, come back as not matching.
+		"""
+		matches = []
+		for name, descriptorDistance in self.query(mesh, k):
+			reference = MeshModel()
+			filepath = self.entries[name].filepath
+			if filepath is None or not reference.loadMesh(filepath, cache):
+				matches.append(LibraryMatch(name, descriptorDistance, False, None))
+				continue
+			try:
+				comparison = MeshModel.compareMeshesLazy(mesh, reference, threshold, **compareOptions)
+			except Exception:
+				comparison = None												# A reference that fails to compare is just not a match
+			if comparison is None:
+				matches.append(LibraryMatch(name, descriptorDistance, False, None))
+				continue
+			matches.append(LibraryMatch(name, descriptorDistance, comparison.result, comparison.icpHausDist, comparison.alignedMatrix))
+		return matches
+
+	def save(self, filepath=None):
+		"""
+		Writes the index to a JSON file, by writing a temporary file and renaming it over the original.
+
+		Args:
+			filepath (str): File to write, defaults to the library's own filepath.
+
+		Returns:
+			None
+		"""
+		filepath = filepath if filepath is not None else self.filepath
+		index = {
+			"version": LIBRARY_VERSION,
+			"entries": {name: {"filepath": entry.filepath, "size": entry.size, "mtime": entry.mtime, "descriptor": entry.descriptor.toDict()} for name, entry in self.entries.items()},
+		}
+		fileDescriptor, tempPath = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filepath)), prefix=".tmp-")
+		with os.fdopen(fileDescriptor, "w") as tempFile:
+			json.dump(index, tempFile)
+		os.replace(tempPath, filepath)
+
+	def load(self, filepath):
+		"""
+		Replaces the library's references with those of a JSON index written by save.
+
+		Args:
+			filepath (str): File to read.
+
+		Returns:
+			None
+		"""
+		with open(filepath) as indexFile:
+			index = json.load(indexFile)
+		self.entries = {
+			name: LibraryEntry(entry["filepath"], entry["size"], entry["mtime"], ShapeDescriptor.fromDict(entry["descriptor"]))
+			for name, entry in index["entries"].items()
+		}
+		self.names = None
@@ -0,0 +1,92 @@
+#region IMPORTS
+import math
+import numpy as np
+from vtkmodules.util.numpy_support import numpy_to_vtk, vtk_to_numpy
+from vtkmodules.vtkFiltersCore import vtkQuadricClustering
+#endregion IMPORTS
+
+INTERACTIVE_CELLS = 200000													# Most cells drawn per mesh while the camera is moving
+MAX_CLUSTERING_PASSES = 4														# Clustering passes tried before settling for the coarsest
+
+def decimateMesh(polyData, maxCells=INTERACTIVE_CELLS):
+	"""
+	Builds a coarse copy of a mesh for drawing while the camera is moving. The mesh is simplified by quadric clustering
+	on a grid of cubic voxels, whose size is grown until the copy fits the cell budget. Clustering takes a fraction of a
+	second even for meshes with millions of triangles, where quadric decimation takes tens of seconds. Point arrays,
+	such as distance scalars, are carried over from the nearest full resolution point.
+
+	Args:
+		polyData (vtkPolyData): The full resolution mesh.
+		maxCells (int): Most cells the coarse copy may have.
+
+	Returns:
+		vtkPolyData: The coarse copy, None if the mesh has no polygons or already fits the budget.
+	"""
+	if polyData.GetNumberOfPolys() == 0 or polyData.GetNumberOfCells() <= maxCells:
+		return None
+
+	bounds = polyData.GetBounds()
+	extent = [bounds[2 * axis + 1] - bounds[2 * axis] for axis in range(3)]
+	diagonal = math.sqrt(sum(length * length for length in extent))
+	if diagonal == 0:
+		return None
+
+	# A closed surface clustered into n voxels along the diagonal keeps two to three times n^2 cells, so start from half
+	# the square root of the budget and shrink the grid by any overshoot until the copy fits
+	divisions = 0.5 * math.sqrt(maxCells)
+	for _ in range(MAX_CLUSTERING_PASSES):
+		coarse = clusterMesh(polyData, bounds, diagonal / divisions)
+		if coarse.GetNumberOfCells() <= maxCells:
+			break
+		divisions *= 0.9 * math.sqrt(maxCells / coarse.GetNumberOfCells())
+
+	transferPointData(polyData, coarse)
+	return coarse
+
+def clusterMesh(polyData, bounds, voxelSize):
+	"""
+	Runs one pass of quadric clustering on a grid of cubic voxels.
+
+	Args:
+		polyData (vtkPolyData): The full resolution mesh.
+		bounds (tuple[float]): Bounds of the mesh, the grid starts at their lower corner.
+		voxelSize (float): Edge length of the voxels.
+
+	Returns:
+		vtkPolyData: The clustered mesh.
+	"""
+	clustering = vtkQuadricClustering()
+	clustering.SetInputData(polyData)
+	clustering.AutoAdjustNumberOfDivisionsOff()
+	clustering.SetNumberOfDivisions(*[max(1, math.ceil((bounds[2 * axis + 1] - bounds[2 * axis]) / voxelSize)) for axis in range(3)])
+	clustering.Update()
+	return clustering.GetOutput()
+
+def transferPointData(polyData, coarse):
+	"""
+	Copies the point arrays of a mesh onto a coarse copy of it, taking each coarse point's values from the nearest full
+	resolution point.
+
+	Args:
+		polyData (vtkPolyData): The full resolution mesh.
+		coarse (vtkPolyData): The coarse copy, modified in place.
+
+	Returns:
+		None
+	"""
+	pointData = polyData.GetPointData()
+	if pointData.GetNumberOfArrays() == 0 or coarse.GetNumberOfPoints() == 0:
+		return
+
+	from scipy.spatial import cKDTree											# Imported on first use, SciPy doubles the import time of the model
+	_, nearest = cKDTree(vtk_to_numpy(polyData.GetPoints().GetData())).query(vtk_to_numpy(coarse.GetPoints().GetData()))
+	for arrayIndex in range(pointData.GetNumberOfArrays()):
+		vtkArray = pointData.GetArray(arrayIndex)
+		if vtkArray is None:
+			continue																# Not a data array, e.g. a string array
+		coarseArray = numpy_to_vtk(np.ascontiguousarray(vtk_to_numpy(vtkArray)[nearest]), deep=True)
+		coarseArray.SetName(vtkArray.GetName())
+		coarse.GetPointData().AddArray(coarseArray)
+	scalars = pointData.GetScalars()
+	if scalars is not None:
+		coarse.GetPointData().SetActiveScalars(scalars.GetName())
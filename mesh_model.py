@@ -1,25 +1,159 @@
 #region IMPORTS
 import os
 import math
+import time
+import hashlib
+import threading
+import contextlib
+import numpy as np
+from typing import NamedTuple
 from inspect import currentframe, getframeinfo
-import vtk
-from vtkmodules.vtkIOGeometry import vtkSTLReader, vtkSTLWriter, vtkBYUReader, vtkOBJReader
-from vtkmodules.vtkIOPLY import vtkPLYReader, vtkPLYWriter
-from vtkmodules.vtkCommonCore import VTK_DOUBLE_MAX, vtkPoints
+from concurrent.futures import ThreadPoolExecutor
+from vtkmodules.util.numpy_support import numpy_to_vtk, vtk_to_numpy
+from vtkmodules.vtkCommonCore import reference, vtkPoints
 from vtkmodules.vtkCommonDataModel import vtkIterativeClosestPointTransform, vtkPolyData
-from vtkmodules.vtkCommonTransforms import vtkLandmarkTransform, vtkTransform
-from vtkmodules.vtkFiltersGeneral import vtkOBBTree, vtkTransformPolyDataFilter
-from vtkmodules.vtkFiltersModeling import vtkHausdorffDistancePointSetFilter
-from vtkmodules.vtkIOLegacy import vtkPolyDataReader
-from vtkmodules.vtkIOXML import vtkXMLPolyDataReader, vtkXMLPolyDataWriter
+from vtkmodules.vtkCommonExecutionModel import vtkTrivialProducer
+from vtkmodules.vtkCommonTransforms import vtkTransform
+from vtkmodules.vtkFiltersCore import vtkMassProperties, vtkPassThrough
+from vtkmodules.vtkFiltersGeneral import vtkTransformPolyDataFilter
+from mesh_distance import DISTANCE_ARRAY, DistanceField, PreparedTarget, KDTreeTarget
+from mesh_io import VTK_READERS, VTK_WRITERS, createVtkAlgorithm, readMesh, uniformPolygons, writeMesh
+from mesh_alignment import DEFAULT_TOP_K, OrientationSearch, OrientedBox, orientedBox, transformMatrix, transformNormals, transformPoints
+from mesh_descriptors import ShapeDescriptor, shapeDescriptor
+from mesh_icp import HYPOTHESIS_PRUNE_RATIO, ICP_ITERATION_STEP, IcpResult, IcpSettings, IcpTarget, meshNormals
+from mesh_lod import decimateMesh
+from mesh_primitives import CONE_RESOLUTION, SPHERE_RESOLUTION, chordResolution, unitPrimitive
+from mesh_pyramid import MeshPyramid
+from mesh_results import ComparisonCache, ComparisonRecord, flattenMatrix
+from mesh_tiles import TiledTarget
+from mesh_profile import meshCounts, profileStage
 #endregion IMPORTS
 
+# Spatial index implementations available for distance queries, see MeshModel.getPreparedTarget
+DISTANCE_BACKENDS = {"vtk": PreparedTarget, "numpy": KDTreeTarget, "tiled": TiledTarget}
+
+# Stages of MeshModel.compareMeshes, in the order they are reported to its progress callback
+COMPARISON_STAGES = ("noAlignment", "obb", "icp")
+
+# Results of previous comparisons, shared by every caller of MeshModel.compareMeshes that does not pass its own cache
+DEFAULT_RESULT_CACHE = ComparisonCache()
+
+class EmptySource(vtkTrivialProducer):
+	"""
+    Placeholder source of a model that holds no mesh. A plain trivial producer, so creating one does not load any of
+    VTK's view or rendering modules.
+    """
+
+class ComparisonResult(NamedTuple):
+	"""
+    Outcome of MeshModel.compareMeshesLazy: the distances and the transform of the best alignment, without the
+    aligned mesh itself. The aligned mesh is only built when alignedSource is called, so keeping or sending results
+    costs a 4x4 matrix each rather than a copy of the source.
+
+    Attributes:
+        result (bool): Whether the minimum Hausdorff distance between source and target mesh is below threshold.
+        noAlignmentHausDist (float): Hausdorff distance after no alignment.
+        obbAlignmentHausDist (float): Hausdorff distance after oriented bounding box alignment.
+        icpHausDist (float): Hausdorff distance after iterative closest point refinement.
+        alignedMatrix (tuple[float]): The 16 elements, row major, of the transform taking the source onto its best
+            alignment with the target. None if the unaligned source was best.
+        sourcePolyData (vtkPolyData): Output of the source mesh the matrix applies to. Referenced, not copied.
+        distanceField (DistanceField): Per point distances of the best alignment in both directions and their
+            statistics, None unless requested with compareMeshes(distances=True).
+    """
+	result: bool
+	noAlignmentHausDist: float
+	obbAlignmentHausDist: float
+	icpHausDist: float
+	alignedMatrix: tuple
+	sourcePolyData: vtkPolyData
+	distanceField: DistanceField = None
+
+	def alignedTransform(self) -> vtkTransform:
+		"""
+		Gets the transform of the best alignment.
+
+		Args:
+			None
+
+		Returns:
+			vtkTransform: Transform taking the source onto its best alignment, the identity if the unaligned source was best.
+		"""
+		transform = vtkTransform()
+		transform.PostMultiply()
+		if self.alignedMatrix is not None:
+			transform.SetMatrix(self.alignedMatrix)
+		return transform
+
+	def alignedSource(self) -> vtkPolyData:
+		"""
+		Builds the source in its best alignment with the target. Each call builds a new copy, see MeshModel.applyTransform.
+		With a distance field, each point's distance to the target is attached as the copy's active point scalars
+		(DISTANCE_ARRAY), ready to render as a heat map.
+
+		Args:
+			None
+
+		Returns:
+			vtkPolyData: The aligned source. The source's own output if the unaligned source was best and there is no
+				distance field to attach.
+		"""
+		if self.alignedMatrix is None and self.distanceField is None:
+			return self.sourcePolyData
+		if self.alignedMatrix is None:
+			alignedSource = vtkPolyData()
+			alignedSource.ShallowCopy(self.sourcePolyData)							# Never add arrays to the source's own output
+		else:
+			alignedSource = MeshModel.applyTransform(self.sourcePolyData, self.alignedTransform())
+		if self.distanceField is not None:
+			distances = numpy_to_vtk(self.distanceField.sourceDistances)
+			distances.SetName(DISTANCE_ARRAY)
+			alignedSource.GetPointData().SetScalars(distances)
+		return alignedSource
+
+	def unpack(self) -> tuple[bool, vtkPolyData, float, float, float]:
+		"""
+		Gets the result as the tuple compareMeshes returns by default, building the aligned source.
+
+		Args:
+			None
+
+		Returns:
+			tuple[bool, vtkPolyData, float, float, float]: See MeshModel.compareMeshes.
+		"""
+		return self.result, self.alignedSource(), self.noAlignmentHausDist, self.obbAlignmentHausDist, self.icpHausDist
+
+	def fromRecord(record, sourcePolyData, threshold, distanceField=None) -> "ComparisonResult":
+		"""
+		Builds a result from a comparison record.
+
+		Args:
+			record (ComparisonRecord): The record.
+			sourcePolyData (vtkPolyData): Current output of the source mesh, which the record's matrix applies to.
+			threshold (float): Hausdorff distance threshold to determine if the two meshes can be considered the same.
+			distanceField (DistanceField): Per point distances of the record's alignment, if measured.
+
+		Returns:
+			ComparisonResult: The result.
+		"""
+		minHausDist = min([record.noAlignmentHausDist, record.obbAlignmentHausDist, record.icpHausDist])
+		return ComparisonResult(minHausDist < threshold, record.noAlignmentHausDist, record.obbAlignmentHausDist, record.icpHausDist, record.alignedMatrix, sourcePolyData, distanceField)
+
 class MeshModel:
 	"""
     A class representing a VTK mesh.
 
     Attributes:
-        vtkSource (vtkAlgorithm): The VTK data source.
+        vtkSource (vtkAlgorithm): The VTK data source. This is the base source, or the scale filter on top of it when scaled.
+        baseSource (vtkAlgorithm): The unscaled VTK data source (primitive or file reader). Never modified by scaling.
+        scaleFactor (float): Cumulative scale applied to the base source.
+        preparedTargets (dict[str, PreparedTarget]): Cached spatial indices of the source's output by backend, see getPreparedTarget.
+        baseFingerprint (tuple[int, str]): Modified time and digest of the base source's output, see getFingerprint.
+        pyramid (MeshPyramid): Cached multiresolution pyramid of the source's output, see getPyramid.
+        icpTarget (IcpTarget): Cached KD-tree and normals of the source's output for ICP, see getIcpTarget.
+        baseProperties (tuple[int, dict]): Modified time of the base source's output and the geometric properties
+            computed from it so far, see getBaseProperty.
+        basePropertiesLock (threading.Lock): Guards baseProperties, which worker threads fill as well as the main one.
     """
 
 	def __init__(self, vtkSource=None):
@@ -29,91 +163,160 @@ class MeshModel:
         Args:
             vtkSource (vtkAlgorithm): The VTK data source.
         """
+		# A single transform and filter are kept for the lifetime of the model, all scaling accumulates into them
+		self.scaleTransform = vtkTransform()
+		self.scaleFilter = vtkTransformPolyDataFilter()
+		self.scaleFilter.SetTransform(self.scaleTransform)
+		self.preparedTargets = {}
+		self.pyramid = None
+		self.icpTarget = None
+		self.basePropertiesLock = threading.Lock()
+
 		if vtkSource == None:
-			self.vtkSource = vtk.vtkEmptyRepresentation()
+			self.setSource(EmptySource())
 		else:
-			self.vtkSource = vtkSource
-		self.scaleReversion = 1
+			self.setSource(vtkSource)
+
+	def setSource(self, vtkSource):
+		"""
+		Set's the model's base source and clears any scaling.
+
+		Args:
+			vtkSource (vtkAlgorithm): The VTK data source.
+
+		Returns:
+			None
+		"""
+		self.baseSource = vtkSource
+		self.vtkSource = vtkSource
+		self.scaleFactor = 1
+		self.baseFingerprint = None
+		with self.basePropertiesLock:
+			self.baseProperties = None
+		if type(vtkSource) != EmptySource:
+			self.scaleFilter.SetInputConnection(vtkSource.GetOutputPort())
+		self.vtkSource.Update()
+
+	def setPolyData(self, polyData):
+		"""
+		Set's the model's base source to an existing polydata and clears any scaling.
+
+		Args:
+			polyData (vtkPolyData): The mesh. Used as is, not copied.
 
-	def setSphereSource(self, radius):
+		Returns:
+			None
 		"""
-		Set's the model's source to a sphere of given radius.
+		polyDataSource = vtkPassThrough()										# Wrap the polydata so it can be used as the model's source
+		polyDataSource.SetInputData(polyData)
+		self.setSource(polyDataSource)
+
+	def setSphereSource(self, radius, resolution=None, chordError=None):
+		"""
+		Set's the model's source to a sphere of given radius. The sphere is a scaled copy of a cached unit sphere, see
+		mesh_primitives.unitPrimitive.
 
 		Args:
 			radius (double): Radius of the sphere.
+			resolution (int): Theta and phi resolution of the sphere. Chosen from the chord error if not given.
+			chordError (double): Largest allowed distance between the tessellation and the true sphere. Used when no
+				resolution is given; SPHERE_RESOLUTION is used if neither is.
 
 		Returns:
 			None
 		"""
 		if radius > 0:
-			sphereSource = vtk.vtkSphereSource()
-			sphereSource.SetRadius(radius)
-			sphereSource.SetPhiResolution(100)
-			sphereSource.SetThetaResolution(100)
-			self.vtkSource = sphereSource
-			self.vtkSource.Update()		
-			self.scaleReversion = 1
+			if resolution is None:
+				resolution = chordResolution(radius, chordError) if chordError is not None else SPHERE_RESOLUTION
+			scale = vtkTransform()
+			scale.Scale(radius, radius, radius)
+			self.setPrimitive("sphere", resolution, scale)
 
-	def setConeSource(self, radius, height):
+	def setConeSource(self, radius, height, resolution=None, chordError=None):
 		"""
-		Set's the model's source to a cone of given radius and height.
+		Set's the model's source to a cone of given radius and height. The cone is a scaled copy of a cached unit cone,
+		see mesh_primitives.unitPrimitive.
 
 		Args:
 			radius (double): Radius of the sphere.
 			height (double): Height of the sphere.
+			resolution (int): Number of sides of the cone. Chosen from the chord error of its base if not given.
+			chordError (double): Largest allowed distance between the tessellation and the true base circle. Used when
+				no resolution is given; CONE_RESOLUTION is used if neither is.
 
 		Returns:
 			None
 		"""
 		if radius > 0 and height > 0:
-			coneSource = vtk.vtkConeSource()
-			coneSource.SetRadius(radius)
-			coneSource.SetHeight(height)
-			coneSource.SetResolution(500)
-			self.vtkSource = coneSource
-			self.vtkSource.Update()
-			self.scaleReversion = 1
+			if resolution is None:
+				resolution = chordResolution(radius, chordError) if chordError is not None else CONE_RESOLUTION
+			scale = vtkTransform()
+			scale.Scale(height, radius, radius)										# The unit cone's axis is along x
+			self.setPrimitive("cone", resolution, scale)
+
+	def setPrimitive(self, shape, resolution, scale):
+		"""
+		Set's the model's source to a scaled copy of a cached unit primitive. Only the points are copied, the cells are
+		shared with the cache.
+
+		Args:
+			shape (str): One of PRIMITIVE_SHAPES.
+			resolution (int): Resolution of the primitive, see mesh_primitives.unitPrimitive.
+			scale (vtkTransform): Scale taking the unit primitive to the requested size.
+
+		Returns:
+			None
+		"""
+		unitPolyData = unitPrimitive(shape, resolution)
+		points = np.empty((unitPolyData.GetNumberOfPoints(), 3), dtype=np.float32)	# Single precision, like the primitive sources' own output
+		self.setPolyData(MeshModel.applyTransform(unitPolyData, scale, points))
 
-	def loadMesh(self, filepath) -> bool:
+	def loadMesh(self, filepath, cache=None) -> bool:
 		"""
 		Loads a mesh as source.
 
 		Args:
 			filepath (str): Filepath of the mesh to load. Use an absolute path.
+			cache (MeshCache): Optional on-disk cache of parsed meshes. Used instead of parsing the file when it holds the
+				file's contents, and filled after parsing when it doesn't.
 
 		Returns:
 			bool: Whether the load completed sucessfully.
 		"""
 		_, extension = os.path.splitext(filepath)
 		extension = extension.lower()
-		if extension == ".ply":
-			reader = vtkPLYReader()
-		elif extension == ".vtp":
-			reader = vtkXMLPolyDataReader()
-		elif extension == ".obj":
-			reader = vtkOBJReader()
-		elif extension == ".stl":
-			reader = vtkSTLReader()
-		elif extension == ".vtk":
-			reader = vtkPolyDataReader()
-		else:
+		if extension not in VTK_READERS:
 			frameinfo = getframeinfo(currentframe())
 			print("[ERROR][{}][{}]: Unsupported file type {}. Valid file types are .ply .vtp .obj .stl .vtk".format(frameinfo.filename, frameinfo.lineno, extension))
-			self.vtkSource = vtk.vtkEmptyRepresentation()
+			self.setSource(EmptySource())
 			return False
 
 		if not os.path.isfile(filepath):
-			self.vtkSource = vtk.vtkEmptyRepresentation()
-			self.vtkSource.Update()
+			self.setSource(EmptySource())
 			frameinfo = getframeinfo(currentframe())
 			print("[ERROR][{}][{}]: Could not load {}. No such file.".format(frameinfo.filename, frameinfo.lineno, filepath))
 			return False
 
+		if cache is not None:
+			cachedPolyData = cache.load(filepath)
+			if cachedPolyData is not None:
+				self.setPolyData(cachedPolyData)
+				return True
+
+		# Binary STL and PLY files are read natively, anything the fast path does not handle falls back to the VTK reader
+		polyData = readMesh(filepath)
+		if polyData is not None:
+			if cache is not None:
+				cache.store(filepath, polyData)
+			self.setPolyData(polyData)
+			return True
+
+		reader = createVtkAlgorithm(VTK_READERS, extension)
 		reader.SetFileName(filepath)
 		reader.Update()
-		self.vtkSource = reader
-		self.scaleReversion = 1
-		self.vtkSource.Update()
+		if cache is not None:
+			cache.store(filepath, reader.GetOutput())
+		self.setSource(reader)
 		return True
 
 	def saveMesh(self, filepath) -> bool:
@@ -126,32 +329,32 @@ class MeshModel:
 		Returns:
 			bool: Whether the save completed sucessfully.
 		"""
-		if type(self.vtkSource) == vtk.vtkEmptyRepresentation:
+		if type(self.vtkSource) == EmptySource:
 			frameinfo = getframeinfo(currentframe())
 			print("[ERROR][{}][{}]: Cannot write an empty mesh to file".format(frameinfo.filename, frameinfo.lineno))
 			return False
 		
 		_, extension = os.path.splitext(filepath)
 		extension = extension.lower()
-		if extension == ".ply":
-			plyWriter = vtkPLYWriter()
-			plyWriter.SetFileName(filepath)
-			plyWriter.SetInputConnection(self.vtkSource.GetOutputPort())
-			plyWriter.Write()
-		elif extension == ".vtp":
-			writer = vtkXMLPolyDataWriter()
-			writer.SetFileName(filepath)
-			writer.SetInputData(self.vtkSource.GetOutput())
-			writer.Write()
-		elif extension == ".stl":
-			stlWriter = vtkSTLWriter()
-			stlWriter.SetFileName(filepath)
-			stlWriter.SetInputConnection(self.vtkSource.GetOutputPort())
-			stlWriter.Write()
-		else:
+		try:
+			if writeMesh(filepath, self.vtkSource.GetOutput()):					# Native streaming writer for binary STL and PLY
+				return True
+		except OSError as error:
+			frameinfo = getframeinfo(currentframe())
+			print("[ERROR][{}][{}]: Could not write {}. {}".format(frameinfo.filename, frameinfo.lineno, filepath, error.strerror))
+			return False
+		except ValueError as error:
+			frameinfo = getframeinfo(currentframe())
+			print("[ERROR][{}][{}]: Could not write {}. {}".format(frameinfo.filename, frameinfo.lineno, filepath, error))
+			return False
+		writer = createVtkAlgorithm(VTK_WRITERS, extension)
+		if writer is None:
 			frameinfo = getframeinfo(currentframe())
 			print("[ERROR][{}][{}]: Unsupported file type {}. Valid file types are .ply .vtp .stl".format(frameinfo.filename, frameinfo.lineno, extension))
 			return False
+		writer.SetFileName(filepath)
+		writer.SetInputData(self.vtkSource.GetOutput())
+		writer.Write()
 		return True
 
 	def scaleMesh(self, scalar):
@@ -165,27 +368,16 @@ class MeshModel:
 			None
 		"""
 		# Do not try and scale an empty representation
-		if type(self.vtkSource) == vtk.vtkEmptyRepresentation:
+		if type(self.vtkSource) == EmptySource:
 			return
 		
 		# Only values above zero are valid scalars
 		if scalar <= 0:
 			return
 		
-		# Create transform object
-		scaleTransform = vtkTransform()
-		scaleTransform.Scale(scalar, scalar, scalar)
-
-		# Connect transform to a filter, apply the filter and assign to the model's source
-		transformFilter = vtkTransformPolyDataFilter()
-		transformFilter.SetInputConnection(self.vtkSource.GetOutputPort())
-		transformFilter.SetTransform(scaleTransform)
-		transformFilter.Update()
-		self.vtkSource = transformFilter
-		self.vtkSource.Update()
-
-		# Keep track of scaling operations performed so that we can revert if desired.
-		self.scaleReversion = self.scaleReversion / scalar
+		# Keep track of the cumulative scale so the base source is only ever transformed once
+		self.scaleFactor = self.scaleFactor * scalar
+		self.applyScale()
 
 	def resetScale(self):
 		"""
@@ -197,7 +389,31 @@ class MeshModel:
 		Returns:
 			None
 		"""
-		self.scaleMesh(self.scaleReversion)
+		if type(self.vtkSource) == EmptySource:
+			return
+
+		self.scaleFactor = 1
+		self.applyScale()
+
+	def applyScale(self):
+		"""
+		Points the model's source at the base source, through the scale filter if the cumulative scale is not 1. The
+		transform is rebuilt from the cumulative scale rather than multiplied onto, and an unscaled mesh uses the base
+		source directly, so returning to scale 1 gives back the original points exactly.
+
+		Args:
+			None
+
+		Returns:
+			None
+		"""
+		if self.scaleFactor == 1:
+			self.vtkSource = self.baseSource
+		else:
+			self.scaleTransform.Identity()
+			self.scaleTransform.Scale(self.scaleFactor, self.scaleFactor, self.scaleFactor)
+			self.vtkSource = self.scaleFilter
+		self.vtkSource.Update()
 
 	def getVolume(self) -> float:
 		"""
@@ -210,16 +426,319 @@ class MeshModel:
 			float: Volume of the mesh.
 		"""
 		# Return a zero volume if the mesh is empty
-		if type(self.vtkSource) == vtk.vtkEmptyRepresentation:
+		if type(self.vtkSource) == EmptySource:
 			return 0.0
-		
-		# Create mass properties object to extract volume of the mesh
-		mass = vtk.vtkMassProperties()
-		mass.SetInputData(self.vtkSource.GetOutput())
+
+		# Volume scales with the cube of the uniform scale, so only the unscaled mesh is ever measured
+		volume, _ = self.getBaseProperty("massProperties", MeshModel.computeMassProperties)
+		return volume * self.scaleFactor**3
+
+	def getSurfaceArea(self) -> float:
+		"""
+		Gets the surface area of the mesh. If no source is currently specified it will return 0.
+
+		Args:
+			None
+
+		Returns:
+			float: Surface area of the mesh.
+		"""
+		if type(self.vtkSource) == EmptySource:
+			return 0.0
+
+		_, area = self.getBaseProperty("massProperties", MeshModel.computeMassProperties)
+		return area * self.scaleFactor**2
+
+	def getBounds(self) -> tuple:
+		"""
+		Gets the axis aligned bounds of the mesh.
+
+		Args:
+			None
+
+		Returns:
+			tuple[float]: (xmin, xmax, ymin, ymax, zmin, zmax), None if the mesh is empty.
+		"""
+		if type(self.vtkSource) == EmptySource:
+			return None
+
+		bounds = self.getBaseProperty("bounds", lambda polyData: polyData.GetBounds())
+		return tuple(bound * self.scaleFactor for bound in bounds)				# Scaling is about the origin and positive, so bounds keep their order
+
+	def getCentroid(self) -> np.ndarray:
+		"""
+		Gets the centroid of the mesh, the mean of its points.
+
+		Args:
+			None
+
+		Returns:
+			numpy.ndarray: Centroid of the mesh, None if the mesh is empty.
+		"""
+		if type(self.vtkSource) == EmptySource:
+			return None
+
+		centroid = self.getBaseProperty("centroid", MeshModel.computeCentroid)
+		return None if centroid is None else centroid * self.scaleFactor
+
+	def getOrientedBox(self) -> OrientedBox:
+		"""
+		Gets the oriented bounding box of the mesh.
+
+		Args:
+			None
+
+		Returns:
+			OrientedBox: Oriented bounding box of the mesh, None if the mesh is empty.
+		"""
+		if type(self.vtkSource) == EmptySource:
+			return None
+
+		box = self.getBaseProperty("orientedBox", orientedBox)
+		return OrientedBox(box.center * self.scaleFactor, box.axes * self.scaleFactor)
+
+	def getShapeDescriptor(self) -> ShapeDescriptor:
+		"""
+		Gets the rotation invariant shape descriptor of the mesh, used to rank candidate matches in a MeshLibrary.
+
+		Args:
+			None
+
+		Returns:
+			ShapeDescriptor: Descriptor of the mesh, None if the mesh is empty.
+		"""
+		if type(self.vtkSource) == EmptySource:
+			return None
+
+		return self.getBaseProperty("shapeDescriptor", shapeDescriptor).scaled(self.scaleFactor)
+
+	def getPoints(self) -> np.ndarray:
+		"""
+		Gets the points of the mesh as a NumPy view of the VTK array, without copying. The view is read only: writing
+		to the mesh's points behind VTK's back would leave the cached properties and spatial indices stale.
+
+		Args:
+			None
+
+		Returns:
+			numpy.ndarray: Points of the mesh, shape (n, 3). None if the mesh is empty.
+		"""
+		if type(self.vtkSource) == EmptySource or self.vtkSource.GetOutput().GetPoints() is None:
+			return None
+		return MeshModel.readOnlyView(self.vtkSource.GetOutput().GetPoints().GetData())
+
+	def getFaces(self) -> np.ndarray:
+		"""
+		Gets the polygons of the mesh as a NumPy view of the VTK connectivity array, without copying.
+
+		Args:
+			None
+
+		Returns:
+			numpy.ndarray: Point indices of each polygon, shape (m, k), read only. None if the mesh is empty, or has
+				other cells than polygons or polygons of mixed sizes.
+		"""
+		if type(self.vtkSource) == EmptySource:
+			return None
+
+		faces = uniformPolygons(self.vtkSource.GetOutput())
+		if faces is not None:
+			faces.flags.writeable = False
+		return faces
+
+	def getNormals(self) -> np.ndarray:
+		"""
+		Gets the point normals of the mesh. Normals the source already provides (e.g. the primitives) are a NumPy view
+		of the VTK array, others are computed from the polygons on first use and kept like the other base properties,
+		since uniform scaling does not change them.
+
+		Args:
+			None
+
+		Returns:
+			numpy.ndarray: Unit normal of each point, shape (n, 3), read only. None if the mesh is empty or has no
+				polygons to compute them from.
+		"""
+		if type(self.vtkSource) == EmptySource:
+			return None
+
+		normals = self.vtkSource.GetOutput().GetPointData().GetNormals()
+		if normals is not None:
+			return MeshModel.readOnlyView(normals)
+		normals = self.getBaseProperty("normals", lambda polyData: meshNormals(polyData) if polyData.GetNumberOfPolys() > 0 else None)
+		if normals is not None:
+			normals.flags.writeable = False
+		return normals
+
+	def readOnlyView(vtkArray) -> np.ndarray:
+		"""
+		Wraps a VTK data array in a read only NumPy view that shares its memory.
+
+		Args:
+			vtkArray (vtkDataArray): The array.
+
+		Returns:
+			numpy.ndarray: The view.
+		"""
+		view = vtk_to_numpy(vtkArray)
+		view.flags.writeable = False
+		return view
+
+	def getBaseProperty(self, name, compute):
+		"""
+		Gets a geometric property of the unscaled mesh, computing it on first use. Computed properties are kept until the
+		base source's output changes; scaling does not invalidate them, the getters scale them analytically instead. Safe
+		to call from several threads, e.g. a comparison worker and the interactive level's builder.
+
+		Args:
+			name (str): Name the property is cached under.
+			compute (callable): Computes the property from the base source's output.
+
+		Returns:
+			object: The property of the unscaled mesh.
+		"""
+		polyData = self.baseSource.GetOutput()
+		with self.basePropertiesLock:
+			if self.baseProperties is None or self.baseProperties[0] != polyData.GetMTime():
+				self.baseProperties = (polyData.GetMTime(), {})
+			properties = self.baseProperties[1]
+			if name in properties:
+				return properties[name]
+
+		# Computed outside the lock, so a slow property (the interactive level, built on a worker thread) does not hold up
+		# a comparison reading the others. If two threads race, the first result stored is the one everyone gets.
+		value = compute(polyData)
+		with self.basePropertiesLock:
+			return properties.setdefault(name, value)
+
+	def computeMassProperties(polyData) -> tuple[float, float]:
+		"""
+		Measures the volume and surface area of a mesh, which vtkMassProperties computes in the same pass.
+
+		Args:
+			polyData (vtkPolyData): Mesh to measure.
+
+		Returns:
+			tuple[float, float]: Volume and surface area of the mesh.
+		"""
+		mass = vtkMassProperties()
+		mass.SetInputData(polyData)
 		mass.Update()
-		return mass.GetVolume()
+		return mass.GetVolume(), mass.GetSurfaceArea()
+
+	def computeCentroid(polyData) -> np.ndarray:
+		"""
+		Computes the mean of a mesh's points.
+
+		Args:
+			polyData (vtkPolyData): Mesh to measure.
+
+		Returns:
+			numpy.ndarray: Mean of the points, None if the mesh has none.
+		"""
+		if polyData.GetNumberOfPoints() == 0:
+			return None
+		return vtk_to_numpy(polyData.GetPoints().GetData()).mean(axis=0, dtype=np.float64)
+
+	def getPreparedTarget(self, backend="vtk") -> PreparedTarget:
+		"""
+		Gets the spatial index of the mesh used for distance queries. The index is built on first use and reused until
+		the mesh changes.
+
+		Args:
+			backend (str): Index implementation, "vtk" (VTK point locator), "numpy" (NumPy arrays and a KD-tree) or
+				"tiled" (KD-trees over spatial tiles written to disk, for meshes larger than memory).
+
+		Returns:
+			PreparedTarget: Spatial index of the current mesh.
+		"""
+		polyData = self.vtkSource.GetOutput()
+		preparedTarget = self.preparedTargets.get(backend)
+		if preparedTarget is None or not preparedTarget.isValidFor(polyData):
+			preparedTarget = DISTANCE_BACKENDS[backend](polyData)
+			self.preparedTargets[backend] = preparedTarget
+		return preparedTarget
+
+	def getPyramid(self) -> MeshPyramid:
+		"""
+		Gets the multiresolution pyramid of the mesh used by coarse to fine comparisons. The pyramid is built on first use
+		and reused until the mesh changes.
+
+		Args:
+			None
+
+		Returns:
+			MeshPyramid: Pyramid of the current mesh.
+		"""
+		polyData = self.vtkSource.GetOutput()
+		if self.pyramid is None or not self.pyramid.isValidFor(polyData):
+			self.pyramid = MeshPyramid(polyData)
+		return self.pyramid
+
+	def getIcpTarget(self) -> IcpTarget:
+		"""
+		Gets the target side of the NumPy ICP methods for the mesh. It is created on first use and reused until the mesh
+		changes, so its KD-tree and normals are only built once.
+
+		Args:
+			None
+
+		Returns:
+			IcpTarget: ICP target of the current mesh.
+		"""
+		polyData = self.vtkSource.GetOutput()
+		if self.icpTarget is None or not self.icpTarget.isValidFor(polyData):
+			self.icpTarget = IcpTarget(polyData)
+		return self.icpTarget
+
+	def getInteractiveLevel(self) -> vtkPolyData:
+		"""
+		Gets the coarse copy of the mesh drawn while the camera is moving, see mesh_lod.decimateMesh. It is built from the
+		unscaled mesh on first use and kept until the base source's output changes, so scaling only transforms the cached
+		copy. May be called off the main thread.
+
+		Args:
+			None
+
+		Returns:
+			vtkPolyData: The coarse copy of the current mesh, None if the mesh is small enough to draw as is.
+		"""
+		if type(self.baseSource) == EmptySource:
+			return None
+		level = self.getBaseProperty("interactiveLevel", decimateMesh)
+		if level is None or self.scaleFactor == 1:
+			return level
+		return MeshModel.applyTransform(level, self.scaleTransform)
+
+	def getFingerprint(self) -> str:
+		"""
+		Gets a fingerprint of the mesh geometry: a digest of the base source's point and cell buffers, plus the
+		cumulative scale. The digest is only recomputed when the base source's output changes, so scaling the mesh or
+		asking again is free.
+
+		Args:
+			None
 
-	def compareMeshes(sourceMesh, targetMesh, threshold) -> tuple[bool, vtkPolyData, float, float, float]:
+		Returns:
+			str: Fingerprint of the mesh, None if the mesh is empty.
+		"""
+		if type(self.baseSource) == EmptySource:
+			return None
+
+		polyData = self.baseSource.GetOutput()
+		if self.baseFingerprint is None or self.baseFingerprint[0] != polyData.GetMTime():
+			digest = hashlib.blake2b(digest_size=16)
+			if polyData.GetPoints() is not None:
+				points = vtk_to_numpy(polyData.GetPoints().GetData())
+				digest.update(str(points.dtype).encode())
+				digest.update(np.ascontiguousarray(points))								# Hashed in place, no copy of (memory mapped) buffers
+			for cells in (polyData.GetVerts(), polyData.GetLines(), polyData.GetPolys(), polyData.GetStrips()):
+				digest.update(np.ascontiguousarray(vtk_to_numpy(cells.GetOffsetsArray())))			# Also separates the cell types
+				digest.update(np.ascontiguousarray(vtk_to_numpy(cells.GetConnectivityArray())))
+			self.baseFingerprint = (polyData.GetMTime(), digest.hexdigest())
+		return "{}x{!r}".format(self.baseFingerprint[1], float(self.scaleFactor))
+
+	def compareMeshes(sourceMesh, targetMesh, threshold, backend="vtk", exact=True, resultCache=DEFAULT_RESULT_CACHE, multiresolution=False, progress=None, cancelled=None, profile=None, icp=None, distances=False, outOfCore=False) -> tuple[bool, vtkPolyData, float, float, float]:
 		"""
 		Performs an Hausdorff distance comparison between aligned source and targets meshes. Oriented bounding box alignment and iterative closest point alignment are attempted,
 		only the minimum calculated distance is returned. For alignment, the source mesh is transformed with the goal of matching the target mesh, target mesh is not transformed.
@@ -230,18 +749,94 @@ class MeshModel:
 			sourceMesh (MeshModel): Source mesh to use in comparison.
 			targetMesh (MeshModel): Target mesh to use in comparison.
 			threshold (float): Hausdorff distance threshold to determine if the two meshes can be considered the same.
+			backend (str): Distance backend, "vtk" or "numpy". See getPreparedTarget.
+			exact (bool): Whether to compute every distance exactly. If False, each distance measurement stops as soon as
+				it is known to be at or above the threshold, and that distance is reported as a lower bound only.
+			resultCache (ComparisonCache): Cache of previous results, keyed by the meshes' fingerprints and the comparison
+				parameters. A repeated comparison is answered from it without running any stage. None to disable.
+			multiresolution (bool): Whether to align coarse to fine, see compareMeshesMultiresolution. Meant for large
+				meshes, small ones are compared at full resolution either way.
+			progress (callable): Called as progress(stage, distance, alignedSource) as soon as each stage's distance is
+				known, in the order of COMPARISON_STAGES. alignedSource is the source in that stage's pose, or None for
+				aligned stages answered without building it (from the result cache, or coarse to fine).
+			cancelled (callable): Polled between stages and every ICP_ITERATION_STEP ICP iterations. Once it returns True
+				the comparison stops and returns False and None for everything else. Nothing is cached for a cancelled
+				comparison.
+			profile (ComparisonProfile): Opt-in profile to record each stage's wall time, memory, mesh sizes and ICP
+				convergence diagnostics (iterations, final RMS, whether it converged) into. Filled in place, the return
+				values are unchanged.
+			icp (IcpSettings): Method, landmark sampling and stopping criteria of the ICP stage. None for the defaults,
+				VTK's point to point ICP on 100 evenly strided landmarks.
+			distances (bool): Whether to also measure the per point distances of the best alignment in both directions
+				and their statistics (RMS, mean, percentiles, worst point), see PreparedTarget.distanceField. The stages
+				that measure a distance themselves measure the whole field in the same pass, exactly. The field is in the
+				ComparisonResult of compareMeshesLazy, and attached to alignedSource as point scalars either way.
+			outOfCore (bool): Whether to compare with bounded memory, for meshes larger than memory (e.g. memory mapped
+				from a MeshCache). Implies the "tiled" backend and multiresolution, with ICP stopping at the finest
+				subsampled level so the full meshes are only ever streamed through.
 
 		Returns:
+			tuple[bool, vtkPolyData, float, float, float]: Always these five values, (False, None, None, None, None) if
+				either mesh is empty or the comparison was cancelled. Use compareMeshesLazy to get the same outcome without
+				building the aligned source.
 			result (bool): Whether the minimum Hausdorff distance between source and target mesh is below threshold
 			alignedSource (vtkPolyData): Source after alignment with target
 			noAlignmentHausDist (float): Hausdorff distance after no alignment 
 			obbAlignmentHausDist (float): Hausdorff distance after oriented bounding box alignment
 			icpHausDist (float): Hausdorff distance after iterative closest point refinement
 		"""
-		if type(sourceMesh.vtkSource) == vtk.vtkEmptyRepresentation or type(targetMesh.vtkSource) == vtk.vtkEmptyRepresentation:
+		comparison, alignedSource = MeshModel.runComparison(sourceMesh, targetMesh, threshold, backend, exact, resultCache, multiresolution, progress, cancelled, profile, icp, distances, outOfCore)
+		if comparison is None:
+			return False, None, None, None, None
+		if alignedSource is None:
+			return comparison.unpack()											# Built now, with the distances attached if measured
+		return comparison.result, alignedSource, comparison.noAlignmentHausDist, comparison.obbAlignmentHausDist, comparison.icpHausDist
+
+	def compareMeshesLazy(sourceMesh, targetMesh, threshold, backend="vtk", exact=True, resultCache=DEFAULT_RESULT_CACHE, multiresolution=False, progress=None, cancelled=None, profile=None, icp=None, distances=False, outOfCore=False) -> ComparisonResult:
+		"""
+		Runs the same comparison as compareMeshes, but returns a ComparisonResult, which holds the transform of the best
+		alignment and only builds the aligned source on request. Meant for batch runs that only need the distances and
+		the transform.
+
+		Args:
+			sourceMesh (MeshModel): Source mesh to use in comparison.
+			targetMesh (MeshModel): Target mesh to use in comparison.
+			threshold (float): Hausdorff distance threshold to determine if the two meshes can be considered the same.
+			backend (str): Distance backend, see compareMeshes.
+			exact (bool): Whether to compute every distance exactly, see compareMeshes.
+			resultCache (ComparisonCache): Cache of previous results, see compareMeshes. None to disable.
+			multiresolution (bool): Whether to align coarse to fine, see compareMeshes.
+			progress (callable): Called with each stage's distance, see compareMeshes.
+			cancelled (callable): Polled between stages, see compareMeshes.
+			profile (ComparisonProfile): Opt-in profile, see compareMeshes.
+			icp (IcpSettings): Settings of the ICP stage, see compareMeshes.
+			distances (bool): Whether to also measure the per point distances of the best alignment into the result's
+				distanceField, see compareMeshes.
+			outOfCore (bool): Whether to compare with bounded memory, see compareMeshes.
+
+		Returns:
+			ComparisonResult: The distances and the best alignment. None if either mesh is empty or the comparison was
+				cancelled.
+		"""
+		return MeshModel.runComparison(sourceMesh, targetMesh, threshold, backend, exact, resultCache, multiresolution, progress, cancelled, profile, icp, distances, outOfCore)[0]
+
+	def runComparison(sourceMesh, targetMesh, threshold, backend, exact, resultCache, multiresolution, progress, cancelled, profile, icp, distances, outOfCore) -> tuple[ComparisonResult, vtkPolyData]:
+		"""
+		Runs the comparison behind compareMeshes and compareMeshesLazy.
+
+		Args:
+			See compareMeshesLazy.
+
+		Returns:
+			tuple[ComparisonResult, vtkPolyData]: The result, and the aligned source if a progress report already built
+				it without a distance field to attach, None otherwise. (None, None) if either mesh is empty or the
+				comparison was cancelled.
+		"""
+		failed = None, None
+		if any(type(mesh.vtkSource) == EmptySource or mesh.vtkSource.GetOutput().GetNumberOfPoints() == 0 for mesh in (sourceMesh, targetMesh)):
 			frameinfo = getframeinfo(currentframe())
 			print("[ERROR][{}][{}]: Source and target meshes must have non empty representations".format(frameinfo.filename, frameinfo.lineno))
-			return False, None, None, None, None, None
+			return failed
 
 		# We will be calculating the Hausdorff distance for 3 cases:
 		# 	1. No transformation applied to the meshes
@@ -252,198 +847,640 @@ class MeshModel:
 		sourcePolyData = sourceMesh.vtkSource.GetOutput()
 		targetPolyData = targetMesh.vtkSource.GetOutput()
 
-		hausDistFilter = vtkHausdorffDistancePointSetFilter()
-		hausDistFilter.SetInputData(0, targetPolyData)
-		hausDistFilter.SetInputData(1, sourcePolyData)
-		hausDistFilter.Update()
-
-		noAlignmentHausDist = hausDistFilter.GetOutput(0).GetFieldData().GetArray('HausdorffDistance').GetComponent(0, 0)
+		# Exact distances do not depend on the threshold, so exact results are shared across thresholds
+		icp = IcpSettings() if icp is None else icp
+		if outOfCore:
+			backend, multiresolution = "tiled", True
+		with profileStage(profile, "resultLookup", **meshCounts(sourcePolyData, targetPolyData)):
+			cacheKey = (sourceMesh.getFingerprint(), targetMesh.getFingerprint(), backend, None if exact else threshold, multiresolution, icp, outOfCore)
+			record = None
+			if resultCache is not None:
+				record = resultCache.get(cacheKey)
+			if profile is not None:
+				profile.addCounts(hit=record is not None)
+		if record is not None:
+			if progress is not None:
+				MeshModel.reportComparison(record, sourcePolyData, progress)
+			distanceField = MeshModel.measureDistances(sourceMesh, targetMesh, record.alignedMatrix, backend) if distances else None
+			return ComparisonResult.fromRecord(record, sourcePolyData, threshold, distanceField), None
+
+		if multiresolution:
+			record = MeshModel.compareMeshesMultiresolution(sourceMesh, targetMesh, threshold, backend, exact, progress, cancelled, profile, icp, not outOfCore)
+			if record is None:
+				return failed
+			if resultCache is not None:
+				resultCache.put(cacheKey, record)
+			distanceField = MeshModel.measureDistances(sourceMesh, targetMesh, record.alignedMatrix, backend) if distances else None
+			return ComparisonResult.fromRecord(record, sourcePolyData, threshold, distanceField), None
+
+		# Spatial indices are built once per mesh (and cached on the models) and reused by every stage below
+		with profileStage(profile, "buildIndex", **meshCounts(sourcePolyData, targetPolyData)):
+			sourceIndex = sourceMesh.getPreparedTarget(backend)
+			targetIndex = targetMesh.getPreparedTarget(backend)
+		bound = None if exact else threshold
+
+		distanceFields = {}														# Per point distances of each stage by stage name, only when requested
+		with profileStage(profile, "noAlignment", **meshCounts(sourcePolyData, targetPolyData)):
+			if distances:
+				distanceFields["noAlignment"] = targetIndex.distanceField(sourceIndex)
+				noAlignmentHausDist = distanceFields["noAlignment"].hausdorffDistance()
+			else:
+				noAlignmentHausDist = targetIndex.hausdorffDistance(sourceIndex, bound=bound)
+		if progress is not None:
+			progress("noAlignment", noAlignmentHausDist, sourcePolyData)
+		if cancelled is not None and cancelled():
+			return failed
 
 		# Case 2: Oriented bounding box alignment
-		obbSourcePolyData = vtkPolyData()										# Create a copy of the source so that the original objects are never modified. Target is not modified so no need to copy.
-		obbSourcePolyData.DeepCopy(sourceMesh.vtkSource.GetOutput())	
-		
-		MeshModel.alignBoundingBoxes(obbSourcePolyData, targetPolyData)			# Perform oriented bounding box alignment
-
-		hausDistFilter.SetInputData(0, targetPolyData)							# Replace the input data of the filter with our now aligned source and targets meshes
-		hausDistFilter.SetInputData(1, obbSourcePolyData)
-		hausDistFilter.Modified()												
-		hausDistFilter.Update()
-
-		obbAlignmentHausDist = hausDistFilter.GetOutput(0).GetFieldData().GetArray('HausdorffDistance').GetComponent(0, 0)
+		with profileStage(profile, "obb", **meshCounts(sourcePolyData, targetPolyData)):
+			obbSearch = OrientationSearch(topK=max(DEFAULT_TOP_K, icp.hypotheses))
+			obbTransform = obbSearch.run(sourceIndex, targetIndex).transform
+			if profile is not None:
+				profile.addCounts(**MeshModel.searchCounts(obbSearch))
+
+		# Aligned poses are only built when someone looks at them. Only the points are copied into a new pose, the cells
+		# are shared with the source. The source and target are never modified.
+		obbSourcePolyData = None
+		obbAlignmentHausDist = obbSearch.best.distance							# Already measured exactly by the search, as the winning candidate
+		if progress is not None:
+			obbSourcePolyData = MeshModel.applyTransform(sourcePolyData, obbTransform)
+			progress("obb", obbAlignmentHausDist, obbSourcePolyData)
+		if cancelled is not None and cancelled():
+			return failed
 
 		# Case 3: ICP alignment to try and refine the result, use the better of the first two cases as a basis
-		icpSourcePolyData = vtkPolyData()
-		if obbAlignmentHausDist < noAlignmentHausDist:							# Copy the better of the first two cases to apply the ICP 
-			icpSourcePolyData.DeepCopy(obbSourcePolyData)
+		icpBaseTransform = vtkTransform()
+		icpBaseTransform.PostMultiply()
+		useObbForIcp = obbAlignmentHausDist < noAlignmentHausDist
+		if bound is not None and min(obbAlignmentHausDist, noAlignmentHausDist) >= bound:
+			useObbForIcp = True													# Both are only lower bounds so they can't be ranked, the OBB pose is the better guess in general
+		if icp.hypotheses > 1:
+			icpStartPolyData = sourcePolyData										# Each hypothesis carries its own starting pose
+		elif useObbForIcp:														# ICP does not modify its source, so the better pose is used as is
+			if obbSourcePolyData is None:
+				obbSourcePolyData = MeshModel.applyTransform(sourcePolyData, obbTransform)
+			icpStartPolyData = obbSourcePolyData
+			icpBaseTransform.Concatenate(obbTransform.GetMatrix())
 		else:
-			icpSourcePolyData.DeepCopy(sourcePolyData)
-
-		icpTransform = vtkIterativeClosestPointTransform()
-		icpTransform.SetSource(icpSourcePolyData)
-		icpTransform.SetTarget(targetPolyData)
-		icpTransform.GetLandmarkTransform().SetModeToRigidBody()
-		icpTransform.SetMaximumNumberOfLandmarks(100)
-		icpTransform.SetMaximumMeanDistance(.00001)
-		icpTransform.SetMaximumNumberOfIterations(500)
-		icpTransform.CheckMeanDistanceOn()
-		icpTransform.StartByMatchingCentroidsOn()
-		icpTransform.Update()
-
-		landmarkTransform = icpTransform.GetLandmarkTransform()					# Use a landmark transform as the specific implementation of ICP transform
-		landmarkFilter = vtkTransformPolyDataFilter()
-		landmarkFilter.SetInputData(icpSourcePolyData)
-		landmarkFilter.SetTransform(landmarkTransform)
-		landmarkFilter.SetTransform(icpTransform)
-		landmarkFilter.Update()
-
-		hausDistFilter.SetInputData(0, targetPolyData)
-		hausDistFilter.SetInputData(1, landmarkFilter.GetOutput())
-		hausDistFilter.Update()
-
-		icpHausDist = hausDistFilter.GetOutput(0).GetFieldData().GetArray('HausdorffDistance').GetComponent(0, 0)
-
-		# Find the smallest calculated distance with its corresponding transformed source mesh
+			icpStartPolyData = sourcePolyData
+
+		hypothesisDistance = None
+		with profileStage(profile, "icp", **meshCounts(icpStartPolyData, targetPolyData)):
+			# Reuse the target's cell locator (or KD-tree) rather than letting ICP build its own
+			if icp.hypotheses > 1:
+				seeds = MeshModel.hypothesisSeeds(noAlignmentHausDist, obbSearch, icp.hypotheses)
+				icpResults = MeshModel.alignHypotheses(sourcePolyData, seeds, targetPolyData, targetIndex.getCellLocator(), cancelled, profile, icp, targetMesh.getIcpTarget())
+				icpResult = None
+				if icpResults is not None:
+					icpResult, hypothesisDistance = MeshModel.selectHypothesis(icpResults, sourceIndex, targetIndex, bound)
+			else:
+				icpResult = MeshModel.alignClosestPoints(icpStartPolyData, targetPolyData, targetIndex.getCellLocator(), cancelled=cancelled, profile=profile, settings=icp, icpTarget=targetMesh.getIcpTarget())
+			if icpResult is None:
+				return failed
+
+		icpBaseTransform.Concatenate(icpResult.transform.GetMatrix())				# Full transform from the original source to the ICP result
+		with profileStage(profile, "icpDistance", **meshCounts(sourcePolyData, targetPolyData)):
+			if distances:
+				distanceFields["icp"] = targetIndex.distanceField(sourceIndex, icpBaseTransform)
+				icpHausDist = distanceFields["icp"].hausdorffDistance()
+			elif hypothesisDistance is not None:
+				icpHausDist = hypothesisDistance									# Already measured when choosing the hypothesis
+			else:
+				icpHausDist = targetIndex.hausdorffDistance(sourceIndex, icpBaseTransform, bound)
+
+		# Straight from the source in a single transform
+		icpSourcePolyData = None
+		if progress is not None:
+			icpSourcePolyData = MeshModel.applyTransform(sourcePolyData, icpBaseTransform)
+			progress("icp", icpHausDist, icpSourcePolyData)
+
+		# Find the smallest calculated distance with its corresponding transform
 		minHausDist = min([noAlignmentHausDist, obbAlignmentHausDist, icpHausDist])
 		if minHausDist == noAlignmentHausDist:
 			alignedSource = sourcePolyData
+			alignedMatrix = None
+			alignedStage = "noAlignment"
 		elif minHausDist == obbAlignmentHausDist:
 			alignedSource = obbSourcePolyData
+			alignedMatrix = flattenMatrix(obbTransform.GetMatrix())
+			alignedStage = "obb"
 		else:
-			alignedSource = landmarkFilter.GetOutput()
+			alignedSource = icpSourcePolyData
+			alignedMatrix = flattenMatrix(icpBaseTransform.GetMatrix())
+			alignedStage = "icp"
+
+		record = ComparisonRecord(noAlignmentHausDist, obbAlignmentHausDist, icpHausDist, alignedMatrix)
+		if resultCache is not None:
+			resultCache.put(cacheKey, record)
 
-		result = minHausDist < threshold
+		distanceField = None
+		if distances:
+			distanceField = distanceFields.get(alignedStage)
+			if distanceField is None:											# The search only measured the OBB pose's maximum
+				with profileStage(profile, "distanceField", **meshCounts(sourcePolyData, targetPolyData)):
+					distanceField = targetIndex.distanceField(sourceIndex, obbTransform)
 
-		return result, alignedSource, noAlignmentHausDist, obbAlignmentHausDist, icpHausDist
+		return ComparisonResult.fromRecord(record, sourcePolyData, threshold, distanceField), alignedSource if distanceField is None else None
 
-	def alignBoundingBoxes(source, target):
+	def compareMeshesMultiresolution(sourceMesh, targetMesh, threshold, backend="vtk", exact=True, progress=None, cancelled=None, profile=None, icp=None, fullResolutionIcp=True) -> ComparisonRecord:
 		"""
-		Finds the oriented bounding boxes of the source and target, and then attempts to align the source
-		to the target by applying a rotation about the x, y, or z axis.
+		Runs the same three stages as compareMeshes, coarse to fine. The bounding box search and the choice of ICP
+		starting pose are made on the coarsest level of each mesh's pyramid, ICP is then refined from the coarsest level
+		down to full resolution, and full resolution Hausdorff distances are only measured at the end.
 
-		Note: This algorithm comes from the VTK API example AlignTwoPolyDatas --> https://examples.vtk.org/site/Python/PolyData/AlignTwoPolyDatas/
+		Distances measured on a level are within the two levels' covering radii of the full resolution distance. When not
+		exact, a stage whose coarse distance is already beyond the threshold by more than that margin is not measured at
+		full resolution, and the coarse lower bound is reported instead.
 
 		Args:
-			source (vtkPolyData): Source mesh to use in bounding box alignment.
-			target (vtkPolyData): Target mesh to use in bounding box alignment.
+			sourceMesh (MeshModel): Source mesh to use in comparison. Must not be empty.
+			targetMesh (MeshModel): Target mesh to use in comparison. Must not be empty.
+			threshold (float): Hausdorff distance threshold to determine if the two meshes can be considered the same.
+			backend (str): Distance backend, "vtk" or "numpy". See getPreparedTarget.
+			exact (bool): Whether to compute every distance exactly, see compareMeshes.
+			progress (callable): Called with each stage's full resolution distance, see compareMeshes.
+			cancelled (callable): Polled between levels and stages, see compareMeshes.
+			profile (ComparisonProfile): Opt-in profile to record each stage and ICP level into, see compareMeshes.
+			icp (IcpSettings): Settings of the ICP run on each level, see compareMeshes.
+			fullResolutionIcp (bool): Whether to refine ICP down to full resolution. Without it ICP stops at the finest
+				subsampled level, and the full meshes are only used to measure the distances.
+
+		Returns:
+			ComparisonRecord: Distances of the three stages and the matrix of the best alignment. None if cancelled.
+		"""
+		with profileStage(profile, "buildPyramid", **meshCounts(sourceMesh.vtkSource.GetOutput(), targetMesh.vtkSource.GetOutput())):
+			sourcePyramid = sourceMesh.getPyramid()
+			targetPyramid = targetMesh.getPyramid()
+			if profile is not None:
+				profile.addCounts(sourceLevels=len(sourcePyramid.levels), targetLevels=len(targetPyramid.levels))
+		coarsestLevel = max(len(sourcePyramid.levels), len(targetPyramid.levels)) - 1
+		bound = None if exact else threshold
+
+		def levelIndices(level):
+			if level == 0:
+				return sourceMesh.getPreparedTarget(backend), targetMesh.getPreparedTarget(backend)
+			return sourcePyramid.getIndex(level, DISTANCE_BACKENDS[backend]), targetPyramid.getIndex(level, DISTANCE_BACKENDS[backend])
+
+		def levelMargin(level, transform):
+			# Covering radii of both meshes' levels, with the source's scaled by the (similarity) transform
+			scale = 1.0 if transform is None else abs(transform.GetMatrix().Determinant()) ** (1 / 3)
+			return sourcePyramid.getLevel(level).coveringRadius * scale + targetPyramid.getLevel(level).coveringRadius
+
+		# Case 1 and 2 on the coarsest level. The bounding boxes come from the full meshes, they are cached on the models and
+		# the subsampled boxes are slightly smaller.
+		coarseCounts = meshCounts(sourcePyramid.getLevel(coarsestLevel).polyData, targetPyramid.getLevel(coarsestLevel).polyData)
+		with profileStage(profile, "buildIndex", level=coarsestLevel, **coarseCounts):
+			sourceIndex, targetIndex = levelIndices(coarsestLevel)
+		with profileStage(profile, "noAlignment", level=coarsestLevel, **coarseCounts):
+			noAlignmentCoarseDist = targetIndex.hausdorffDistance(sourceIndex)
+		with profileStage(profile, "obb", level=coarsestLevel, **coarseCounts):
+			obbSearch = OrientationSearch(topK=max(DEFAULT_TOP_K, icp.hypotheses))
+			obbCandidate = obbSearch.run(sourceIndex, targetIndex, sourceMesh.getOrientedBox(), targetMesh.getOrientedBox())
+			if profile is not None:
+				profile.addCounts(**MeshModel.searchCounts(obbSearch))
+		if cancelled is not None and cancelled():
+			return None
+
+		# Case 3: ICP from the better coarse pose, refined level by level down to full resolution. A coarse level can only
+		# place the source to within its margin, so it is skipped once the pose is already that close; running it anyway
+		# would just move an accurate pose around within the level's sampling noise.
+		icpBaseTransform = vtkTransform()
+		icpBaseTransform.PostMultiply()
+		matchCentroids = True
+		firstIcpLevel = coarsestLevel
+		if icp.hypotheses > 1:
+			# Every hypothesis is refined on the coarsest level, only the winner goes on to the finer levels
+			with profileStage(profile, "icp", level=coarsestLevel, **coarseCounts):
+				seeds = MeshModel.hypothesisSeeds(noAlignmentCoarseDist, obbSearch, icp.hypotheses)
+				coarseIcpTarget = targetMesh.getIcpTarget() if coarsestLevel == 0 else targetPyramid.getIndex(coarsestLevel, IcpTarget)
+				icpResults = MeshModel.alignHypotheses(sourcePyramid.getLevel(coarsestLevel).polyData, seeds, targetPyramid.getLevel(coarsestLevel).polyData, targetIndex.getCellLocator(), cancelled, profile, icp, coarseIcpTarget)
+				if icpResults is None:
+					return None
+				icpResult, _ = MeshModel.selectHypothesis(icpResults, sourceIndex, targetIndex)
+			icpBaseTransform.Concatenate(icpResult.transform.GetMatrix())
+			matchCentroids = False
+			firstIcpLevel = coarsestLevel - 1
+		elif obbCandidate.distance < noAlignmentCoarseDist:
+			icpBaseTransform.Concatenate(obbCandidate.transform.GetMatrix())
+
+		finestIcpLevel = 0 if fullResolutionIcp else min(1, coarsestLevel)
+		for level in range(firstIcpLevel, finestIcpLevel - 1, -1):
+			with profileStage(profile, "icp", level=level, **meshCounts(sourcePyramid.getLevel(level).polyData, targetPyramid.getLevel(level).polyData)):
+				if level > 0:
+					margin = levelMargin(level, icpBaseTransform)
+					levelSourceIndex, levelTargetIndex = levelIndices(level)
+					if levelTargetIndex.hausdorffDistance(levelSourceIndex, icpBaseTransform, margin) <= margin:
+						if profile is not None:
+							profile.addCounts(skipped=True)
+						continue
+
+				levelSource = MeshModel.applyTransform(sourcePyramid.getLevel(level).polyData, icpBaseTransform)
+				levelIcpTarget = targetMesh.getIcpTarget() if level == 0 else targetPyramid.getIndex(level, IcpTarget)
+				icpResult = MeshModel.alignClosestPoints(levelSource, targetPyramid.getLevel(level).polyData, levelIndices(level)[1].getCellLocator(), matchCentroids, cancelled, profile, icp, levelIcpTarget)
+				if icpResult is None:
+					return None
+				matchCentroids = False												# Later levels start from the previous level's result
+				icpBaseTransform.Concatenate(icpResult.transform.GetMatrix())
+
+		# Full resolution distances, skipped when the coarse distance already decides the threshold
+		sourceIndex, targetIndex = levelIndices(0)
+		coarseIndices = levelIndices(coarsestLevel)
+
+		def fullDistance(transform, coarseDistance=None):
+			if coarsestLevel == 0:
+				if coarseDistance is not None:
+					return coarseDistance											# The coarsest level is the full mesh, already measured
+			elif bound is not None:
+				if coarseDistance is None:
+					coarseDistance = coarseIndices[1].hausdorffDistance(coarseIndices[0], transform)
+				lowerBound = coarseDistance - levelMargin(coarsestLevel, transform)
+				if lowerBound >= bound:
+					return lowerBound
+			return targetIndex.hausdorffDistance(sourceIndex, transform, bound)
+
+		distances = []
+		for stage, transform, coarseDistance in zip(COMPARISON_STAGES, (None, obbCandidate.transform, icpBaseTransform), (noAlignmentCoarseDist, obbCandidate.distance, None)):
+			if cancelled is not None and cancelled():
+				return None
+			with profileStage(profile, stage + "Distance", **meshCounts(sourceMesh.vtkSource.GetOutput(), targetMesh.vtkSource.GetOutput())):
+				distances.append(fullDistance(transform, coarseDistance))
+			if progress is not None:
+				progress(stage, distances[-1], sourceMesh.vtkSource.GetOutput() if transform is None else None)
+		noAlignmentHausDist, obbAlignmentHausDist, icpHausDist = distances
+
+		minHausDist = min([noAlignmentHausDist, obbAlignmentHausDist, icpHausDist])
+		if minHausDist == noAlignmentHausDist:
+			alignedMatrix = None
+		elif minHausDist == obbAlignmentHausDist:
+			alignedMatrix = flattenMatrix(obbCandidate.transform.GetMatrix())
+		else:
+			alignedMatrix = flattenMatrix(icpBaseTransform.GetMatrix())
+		return ComparisonRecord(noAlignmentHausDist, obbAlignmentHausDist, icpHausDist, alignedMatrix)
+
+	def measureDistances(sourceMesh, targetMesh, alignedMatrix, backend="vtk") -> DistanceField:
+		"""
+		Measures the per point distances between two meshes with the source in a given alignment, e.g. that of a cached
+		comparison record.
+
+		Args:
+			sourceMesh (MeshModel): Source mesh.
+			targetMesh (MeshModel): Target mesh.
+			alignedMatrix (tuple[float]): The 16 elements, row major, of the transform to apply to the source. None for
+				the unaligned source.
+			backend (str): Distance backend, "vtk" or "numpy". See getPreparedTarget.
+
+		Returns:
+			DistanceField: The distances in both directions and their statistics.
+		"""
+		transform = None
+		if alignedMatrix is not None:
+			transform = vtkTransform()
+			transform.SetMatrix(alignedMatrix)
+		return targetMesh.getPreparedTarget(backend).distanceField(sourceMesh.getPreparedTarget(backend), transform)
+
+	def reportComparison(record, sourcePolyData, progress):
+		"""
+		Reports every stage of a cached comparison record to a progress callback at once. Only the unaligned source is
+		available without rebuilding, so the other stages are reported without a mesh.
+
+		Args:
+			record (ComparisonRecord): The cached record.
+			sourcePolyData (vtkPolyData): Current output of the source mesh.
+			progress (callable): Progress callback, see compareMeshes.
 
 		Returns:
 			None
 		"""
-		# Get oriented bounding box for source and target
-		sourceOBBTree = vtkOBBTree()
-		sourceOBBTree.SetDataSet(source)
-		sourceOBBTree.SetMaxLevel(1)
-		sourceOBBTree.BuildLocator()
+		progress("noAlignment", record.noAlignmentHausDist, sourcePolyData)
+		progress("obb", record.obbAlignmentHausDist, None)
+		progress("icp", record.icpHausDist, None)
 
-		targetOBBTree = vtkOBBTree()
-		targetOBBTree.SetDataSet(target)
-		targetOBBTree.SetMaxLevel(1)
-		targetOBBTree.BuildLocator()
+	def applyTransform(polyData, transform, out=None) -> vtkPolyData:
+		"""
+		Transforms a copy of a polydata. Only the points (and normals) are copied: the copy shares the cells and every
+		other array with the original, so it costs one points array rather than a whole mesh.
 
-		# Create landmarks for source and target
-		sourceLandmarks = vtkPolyData()
-		sourceOBBTree.GenerateRepresentation(0, sourceLandmarks)
+		Args:
+			polyData (vtkPolyData): Polydata to transform. Not modified.
+			transform (vtkLinearTransform): Transform to apply.
+			out (numpy.ndarray): Preallocated array of the points' shape and type to write the transformed points to, e.g.
+				the points of a previous copy that is no longer needed. A new array if not given.
 
-		targetLandmarks = vtkPolyData()
-		targetOBBTree.GenerateRepresentation(0, targetLandmarks)
-		
-		# Initial landmark transform set up (set target, as this is not changing)
-		landmarkTransform = vtkLandmarkTransform()
-		landmarkTransform.SetModeToSimilarity()
-		landmarkTransform.SetTargetLandmarks(targetLandmarks.GetPoints())
-
-		# For each of the 3 axes, find the rotation transformation which minimizes the Hausdorff distance 
-		# between the rotated source bounding box and the target bounding box. Use the rotation that prodcues
-		# the overall smallest Hausdorff distance.
-		xDistance, xRotatedPoints = MeshModel.bestBoundingBoxOrientation("X", target, source, targetLandmarks, sourceLandmarks)
-		yDistance, yRotatedPoints = MeshModel.bestBoundingBoxOrientation("Y", target, source, targetLandmarks, sourceLandmarks)
-		zDistance, zRotatedPoints  = MeshModel.bestBoundingBoxOrientation("Z", target, source, targetLandmarks, sourceLandmarks)
-		
-		minDist = min([xDistance, yDistance, zDistance])
-		minDistPoints = vtkPoints()
-		if minDist == xDistance:
-			minDistPoints = xRotatedPoints
-		elif minDist == yDistance:
-			minDistPoints = yRotatedPoints
+		Returns:
+			vtkPolyData: The transformed copy.
+		"""
+		transformed = vtkPolyData()
+		transformed.ShallowCopy(polyData)
+		if polyData.GetPoints() is None:
+			return transformed
+
+		matrix = transformMatrix(transform)
+		points = transformPoints(vtk_to_numpy(polyData.GetPoints().GetData()), matrix, out)
+		transformedPoints = vtkPoints()
+		transformedPoints.SetData(numpy_to_vtk(points))							# Shares the array's memory, and keeps the array alive
+		transformed.SetPoints(transformedPoints)
+		if matrix[0, 0] > 0 and np.array_equal(matrix[:3, :3], matrix[0, 0] * np.eye(3)):
+			return transformed													# A uniform scale leaves unit normals as they are, keep sharing them
+		for attributes in (transformed.GetPointData(), transformed.GetCellData()):
+			normals = attributes.GetNormals()
+			if normals is not None:
+				transformedNormals = numpy_to_vtk(transformNormals(vtk_to_numpy(normals), matrix))
+				transformedNormals.SetName(normals.GetName())
+				attributes.SetNormals(transformedNormals)
+		return transformed
+
+	def transformInPlace(polyData, transform):
+		"""
+		Transforms the points (and normals) of a polydata in place, without any copy of the mesh.
+
+		Args:
+			polyData (vtkPolyData): Polydata to transform. Modified in place.
+			transform (vtkLinearTransform): Transform to apply.
+
+		Returns:
+			None
+		"""
+		if polyData.GetPoints() is None:
+			return
+
+		matrix = transformMatrix(transform)
+		points = vtk_to_numpy(polyData.GetPoints().GetData())
+		transformPoints(points, matrix, points)
+		polyData.GetPoints().Modified()
+		for attributes in (polyData.GetPointData(), polyData.GetCellData()):
+			normals = attributes.GetNormals()
+			if normals is not None:
+				normalValues = vtk_to_numpy(normals)
+				transformNormals(normalValues, matrix, normalValues)
+				normals.Modified()
+		polyData.Modified()
+
+	def alignClosestPoints(source, target, targetLocator, matchCentroids=True, cancelled=None, profile=None, settings=None, icpTarget=None) -> IcpResult:
+		"""
+		Rigidly aligns the source to the target with iterative closest point, using the method, landmarks and stopping
+		criteria of the settings.
+
+		The VTK method runs every iteration inside a single update, so when a cancellation check is given the iterations
+		are run ICP_ITERATION_STEP at a time instead, each step continuing from the source moved by the previous ones,
+		and the check is polled between steps. The result matches a single run to within float precision. The NumPy
+		methods poll the check every iteration.
+
+		Args:
+			source (vtkPolyData): Source mesh to align. Not modified.
+			target (vtkPolyData): Target mesh to align to.
+			targetLocator (vtkAbstractCellLocator): Cell locator built on the target, used by the VTK method.
+			matchCentroids (bool): Whether to translate the source's centroid onto the target's before the first iteration.
+			cancelled (callable): Returns True once the alignment should stop. None to run uninterrupted.
+			profile (ComparisonProfile): Opt-in profile to count the iterations run and record the convergence diagnostics
+				into, in its innermost open stage.
+			settings (IcpSettings): Method, landmark sampling and stopping criteria. None for the defaults.
+			icpTarget (IcpTarget): KD-tree and normals of the target, used by the NumPy methods. Built if not given.
+
+		Returns:
+			IcpResult: The transform taking the source onto its alignment with the target, and its convergence
+				diagnostics. None if cancelled.
+		"""
+		settings = IcpSettings() if settings is None else settings
+		if settings.method == "vtk":
+			result = MeshModel.alignClosestPointsVtk(source, target, targetLocator, settings, matchCentroids, cancelled, profile)
 		else:
-			minDistPoints=  zRotatedPoints
+			result = (icpTarget if icpTarget is not None else IcpTarget(target)).align(source, settings, matchCentroids, cancelled)
+			if result is not None and profile is not None:
+				profile.addCounts(iterations=result.iterations)
+		if result is not None and profile is not None:
+			profile.addCounts(method=result.method, converged=result.converged, rms=result.rms)
+		return result
+
+	def alignClosestPointsVtk(source, target, targetLocator, settings, matchCentroids=True, cancelled=None, profile=None) -> IcpResult:
+		"""
+		Runs the VTK method of alignClosestPoints: vtkIterativeClosestPointTransform, matching evenly strided landmarks to
+		the closest points of the target's surface.
 
-		# Create a transform based on the best rotational transform and apply it to the source
-		landmarkTransform.SetSourceLandmarks(minDistPoints)
-		landmarkTransform.Modified()
-		landmarkFilter = vtkTransformPolyDataFilter()
-		landmarkFilter.SetInputData(source)
-		landmarkFilter.SetTransform(landmarkTransform)
-		landmarkFilter.Update()
+		Args:
+			source (vtkPolyData): Source mesh to align. Not modified.
+			target (vtkPolyData): Target mesh to align to.
+			targetLocator (vtkAbstractCellLocator): Cell locator built on the target.
+			settings (IcpSettings): Number of landmarks and stopping criteria.
+			matchCentroids (bool): Whether to translate the source's centroid onto the target's before the first iteration.
+			cancelled (callable): Returns True once the alignment should stop. None to run uninterrupted.
+			profile (ComparisonProfile): Opt-in profile to count the iterations and steps run into.
 
-		source.DeepCopy(landmarkFilter.GetOutput())
-		return
-	
-	def bestBoundingBoxOrientation(axis, target, source, targetLandmarks, sourceLandmarks) -> tuple[float, vtkPoints]:
+		Returns:
+			IcpResult: The alignment and its diagnostics. None if cancelled.
+		"""
+		startTime = time.perf_counter()
+		stepIterations = settings.maxIterations if cancelled is None else ICP_ITERATION_STEP
+		alignedTransform = vtkTransform()
+		alignedTransform.PostMultiply()
+		stepSource = source
+		stepPoints = None
+		remainingIterations = settings.maxIterations
+		iterations = 0
+		meanMotion = None
+		converged = False
+		while remainingIterations > 0:
+			if cancelled is not None and cancelled():
+				return None
+
+			icpTransform = vtkIterativeClosestPointTransform()
+			icpTransform.SetSource(stepSource)
+			icpTransform.SetTarget(target)
+			icpTransform.SetLocator(targetLocator)
+			icpTransform.GetLandmarkTransform().SetModeToRigidBody()
+			icpTransform.SetMaximumNumberOfLandmarks(settings.landmarks)
+			icpTransform.SetMaximumMeanDistance(settings.tolerance)
+			requestedIterations = min(stepIterations, remainingIterations)
+			icpTransform.SetMaximumNumberOfIterations(requestedIterations)
+			icpTransform.CheckMeanDistanceOn()
+			if matchCentroids:
+				icpTransform.StartByMatchingCentroidsOn()
+				matchCentroids = False												# Later steps continue from the previous step's result
+			icpTransform.Update()
+			alignedTransform.Concatenate(icpTransform.GetMatrix())
+			iterations += icpTransform.GetNumberOfIterations()
+			meanMotion = icpTransform.GetMeanDistance()
+			if profile is not None:
+				profile.addCounts(iterations=icpTransform.GetNumberOfIterations(), steps=1)
+
+			if icpTransform.GetNumberOfIterations() < requestedIterations:
+				converged = True
+				break																# Converged before the end of the step
+			remainingIterations -= requestedIterations
+			if remainingIterations > 0:
+				stepSource = MeshModel.applyTransform(source, alignedTransform, stepPoints)
+				stepPoints = vtk_to_numpy(stepSource.GetPoints().GetData())		# Later steps overwrite the same buffer
+
+		# RMS distance from evenly strided landmarks, as VTK picks them, to the target's surface
+		points = vtk_to_numpy(source.GetPoints().GetData())
+		landmarkIds = np.linspace(0, len(points) - 1, min(settings.landmarks, len(points))).astype(np.int64)
+		squaredDistances = []
+		closestPoint = [0.0, 0.0, 0.0]
+		cellId, subId, squaredDistance = reference(0), reference(0), reference(0.0)
+		for landmarkId in landmarkIds:
+			targetLocator.FindClosestPoint(alignedTransform.TransformPoint(points[landmarkId].tolist()), closestPoint, cellId, subId, squaredDistance)
+			squaredDistances.append(squaredDistance.get())
+		return IcpResult(alignedTransform, "vtk", iterations, converged, math.sqrt(sum(squaredDistances) / len(squaredDistances)), meanMotion, time.perf_counter() - startTime)
+
+	def alignHypotheses(source, seeds, target, targetLocator, cancelled=None, profile=None, settings=None, icpTarget=None, workers=None) -> list[IcpResult]:
 		"""
-		Determines the best rotational transform about a single axis to minimize the Hausdorff distance
-		between the source and target bounding boxes, then applies that transform to the source's bounding
-		box.
+		Runs iterative closest point from several starting poses side by side, see IcpSettings.hypotheses. The hypotheses
+		advance ICP_ITERATION_STEP iterations at a time in a thread pool, and after each round those whose RMS is more
+		than HYPOTHESIS_PRUNE_RATIO times the leader's are dropped, so poor starts stop costing time early. Rounds run in
+		lock step, so which hypotheses survive does not depend on thread timing.
 
-		Note: This algorithm comes from the VTK API example AlignTwoPolyDatas --> https://examples.vtk.org/site/Python/PolyData/AlignTwoPolyDatas/
+		The VTK method's cell locator is not safe to query from several threads, so its hypotheses take turns. The NumPy
+		methods run concurrently.
 
 		Args:
-			source (vtkPolyData): Source mesh to use in bounding box alignment.
-			target (vtkPolyData): Target mesh to use in bounding box alignment.
-			targetLandmarks (vtkPolyData): Target bounding box landmarks.
-			sourceLandmarks (vtkPolyData): Source bounding box landmarks.
+			source (vtkPolyData): Source mesh to align. Not modified.
+			seeds (list[vtkLinearTransform]): Starting poses of the source, one per hypothesis.
+			target (vtkPolyData): Target mesh to align to.
+			targetLocator (vtkAbstractCellLocator): Cell locator built on the target, used by the VTK method.
+			cancelled (callable): Returns True once the alignment should stop. None to run uninterrupted.
+			profile (ComparisonProfile): Opt-in profile to record the hypotheses, the iterations run and the leader's
+				convergence diagnostics into, in its innermost open stage.
+			settings (IcpSettings): Method, landmark sampling and stopping criteria of each hypothesis. None for the defaults.
+			icpTarget (IcpTarget): KD-tree and normals of the target, used by the NumPy methods. Built if not given.
+			workers (int): Number of threads. Defaults to one per hypothesis, capped at the CPU count.
 
 		Returns:
-			distance(float): The Hausdorff distance between the transformed source bounding box and the target bounding box.
-			points(float): The transformed source's bounding box.
+			list[IcpResult]: The surviving hypotheses, lowest RMS first. Each transform takes the source itself onto its
+				alignment, seed included, and the iterations and seconds add up every round. None if cancelled.
 		"""
-		distancePointsFilter = vtkHausdorffDistancePointSetFilter()
-		candidateTransform = vtkTransform()
-		candidateFilter = vtkTransformPolyDataFilter()
-		landmarkTransform = vtkLandmarkTransform()
-		landmarkFilter = vtkTransformPolyDataFilter()
+		settings = IcpSettings() if settings is None else settings
+		if settings.method != "vtk":												# Built up front rather than raced for by the threads
+			icpTarget = icpTarget if icpTarget is not None else IcpTarget(target)
+			icpTarget.getTree()
+			if settings.method == "pointToPlane":
+				icpTarget.getNormals()
+		locatorLock = threading.Lock() if settings.method == "vtk" else contextlib.nullcontext()
+
+		transforms = []
+		for seed in seeds:
+			transform = vtkTransform()
+			transform.PostMultiply()
+			transform.Concatenate(seed.GetMatrix())
+			transforms.append(transform)
+		results = [None] * len(seeds)
+		iterations = [0] * len(seeds)
+		seconds = [0.0] * len(seeds)
+		survivors = list(range(len(seeds)))
+		active = list(survivors)
+
+		def step(hypothesis, roundSettings, matchCentroids) -> IcpResult:
+			stepSource = MeshModel.applyTransform(source, transforms[hypothesis])
+			with locatorLock:
+				return MeshModel.alignClosestPoints(stepSource, target, targetLocator, matchCentroids, cancelled, None, roundSettings, icpTarget)
+
+		with ThreadPoolExecutor(max_workers=workers if workers is not None else max(1, min(len(seeds), os.cpu_count() or 1))) as executor:
+			for roundStart in range(0, settings.maxIterations, ICP_ITERATION_STEP):
+				roundSettings = settings._replace(maxIterations=min(ICP_ITERATION_STEP, settings.maxIterations - roundStart))
+				roundResults = list(executor.map(step, active, [roundSettings] * len(active), [roundStart == 0] * len(active)))
+				if any(result is None for result in roundResults):
+					return None
+
+				finished = set()
+				for hypothesis, result in zip(active, roundResults):
+					transforms[hypothesis].Concatenate(result.transform.GetMatrix())
+					results[hypothesis] = result
+					iterations[hypothesis] += result.iterations
+					seconds[hypothesis] += result.seconds
+					if result.converged or result.iterations < roundSettings.maxIterations:
+						finished.add(hypothesis)										# Converged, or stalled without improving
+
+				leaderRms = min(results[hypothesis].rms for hypothesis in survivors)
+				survivors = [hypothesis for hypothesis in survivors if results[hypothesis].rms <= leaderRms * HYPOTHESIS_PRUNE_RATIO]
+				active = [hypothesis for hypothesis in survivors if hypothesis in active and hypothesis not in finished]
+				if not active:
+					break
+
+		survivors.sort(key=lambda hypothesis: results[hypothesis].rms)
+		hypotheses = [IcpResult(transforms[hypothesis], settings.method, iterations[hypothesis], results[hypothesis].converged, results[hypothesis].rms, results[hypothesis].meanMotion, seconds[hypothesis]) for hypothesis in survivors]
+		if profile is not None:
+			profile.addCounts(hypotheses=len(seeds), pruned=len(seeds) - len(survivors), iterations=sum(iterations), method=settings.method, converged=hypotheses[0].converged, rms=hypotheses[0].rms)
+		return hypotheses
+
+	def hypothesisSeeds(noAlignmentDistance, search, count) -> list[vtkTransform]:
+		"""
+		Chooses the starting poses of the ICP hypotheses: the unaligned source and the evaluated bounding box orientations,
+		best distance first, topped up with the next ranked orientations if too few were evaluated.
 
-		# Initial landmark transform set up (set target, as this is not changing)
-		landmarkTransform.SetModeToSimilarity()
-		landmarkTransform.SetTargetLandmarks(targetLandmarks.GetPoints())
+		Args:
+			noAlignmentDistance (float): Hausdorff distance of the unaligned source.
+			search (OrientationSearch): The finished bounding box search.
+			count (int): Number of poses wanted.
 
-		sourceCenter = sourceLandmarks.GetCenter()
+		Returns:
+			list[vtkTransform]: Up to count starting poses.
+		"""
+		poses = [(noAlignmentDistance, vtkTransform())]
+		poses += [(candidate.distance, candidate.transform) for candidate in search.candidates if candidate.distance is not None]
+		poses.sort(key=lambda pose: pose[0])									# Stable, so the unaligned source wins ties as in a single run
+		seeds = [transform for _, transform in poses[:count]]
+		seeds += [candidate.transform for candidate in search.candidates if candidate.distance is None][:count - len(seeds)]
+		return seeds
+
+	def selectHypothesis(results, sourceIndex, targetIndex, bound=None) -> tuple[IcpResult, float]:
+		"""
+		Picks the ICP hypothesis with the smallest Hausdorff distance. Each distance is bounded by the best found so far,
+		so losing hypotheses usually stop after a few points.
 
-		distanceToBeat = VTK_DOUBLE_MAX
-		distanceToBeatPoints = vtkPoints()
+		Args:
+			results (list[IcpResult]): The hypotheses, see alignHypotheses.
+			sourceIndex (PreparedTarget): Spatial index of the source the hypotheses were aligned from.
+			targetIndex (PreparedTarget): Spatial index of the target.
+			bound (float): Distance beyond which the exact value is not needed.
 
-		# Iterate through angles of rotation, updating the minimum distance and it's corresponding transformed 
-		# bounding box points as it goes.
-		for angle in range(0, 270, 90):
-			candidateTransform.Identity()
-			candidateTransform.Translate(sourceCenter[0], sourceCenter[1], sourceCenter[2])		# Translate the center of the source to 0, 0, 0 to perform the rotation
-			if axis == "X":
-				candidateTransform.RotateX(angle)
-			elif axis == "Y":
-				candidateTransform.RotateY(angle)
-			else:
-				candidateTransform.RotateZ(angle)
-			candidateTransform.Translate(-sourceCenter[0], -sourceCenter[1], -sourceCenter[2])	# Revert translation now that the rotation is complete
+		Returns:
+			tuple[IcpResult, float]: The winning hypothesis and its Hausdorff distance, exact below the bound.
+		"""
+		best, bestDistance = None, None
+		for result in results:
+			limit = bound if bestDistance is None else (bestDistance if bound is None else min(bound, bestDistance))
+			distance = targetIndex.hausdorffDistance(sourceIndex, result.transform, limit)
+			if bestDistance is None or distance < bestDistance:
+				best, bestDistance = result, distance
+		return best, bestDistance
+
+	def searchCounts(search) -> dict:
+		"""
+		Gets the profile counts of a finished oriented bounding box search.
 
-			candidateFilter.SetTransform(candidateTransform)
-			candidateFilter.SetInputData(sourceLandmarks)
-			candidateFilter.Update()
+		Args:
+			search (OrientationSearch): The search.
+
+		Returns:
+			dict: Number of orientations ranked and evaluated, and the seconds spent evaluating each one.
+		"""
+		evaluated = [candidate for candidate in search.candidates if candidate.distance is not None]
+		return {"orientationsRanked": len(search.candidates), "orientationsEvaluated": len(evaluated), "orientationSeconds": [candidate.seconds for candidate in evaluated]}
+
+	def alignBoundingBoxes(source, target, sourceIndex=None, targetIndex=None, search=None) -> vtkTransform:
+		"""
+		Finds the oriented bounding boxes of the source and target, and then aligns the source to the target using
+		whichever of the 24 orientations mapping one box onto the other gives the smallest Hausdorff distance. See
+		OrientationSearch for how the orientations are ranked and evaluated.
 
-			landmarkTransform.SetSourceLandmarks(candidateFilter.GetOutput().GetPoints())
-			landmarkTransform.Modified()
+		Note: This algorithm is based on the VTK API example AlignTwoPolyDatas --> https://examples.vtk.org/site/Python/PolyData/AlignTwoPolyDatas/
 
-			landmarkFilter.SetInputData(source)
-			landmarkFilter.SetTransform(landmarkTransform)
-			landmarkFilter.Update()
+		Args:
+			source (vtkPolyData): Source mesh to use in bounding box alignment. Modified in place.
+			target (vtkPolyData): Target mesh to use in bounding box alignment.
+			sourceIndex (PreparedTarget): Spatial index of the source before alignment. Built if not given.
+			targetIndex (PreparedTarget): Spatial index of the target. Built if not given.
+			search (OrientationSearch): Search engine to use, holds the per candidate report afterwards. Created if not given.
 
-			distancePointsFilter.SetInputData(0, target)
-			distancePointsFilter.SetInputData(1, landmarkFilter.GetOutput())
-			distancePointsFilter.Update()
+		Returns:
+			vtkTransform: The transform that was applied to the source.
+		"""
+		if sourceIndex is None:
+			sourceIndex = PreparedTarget(source)
+		if targetIndex is None:
+			targetIndex = PreparedTarget(target)
+		if search is None:
+			search = OrientationSearch()
 
-			candidateDistance = distancePointsFilter.GetOutput(0).GetFieldData().GetArray("HausdorffDistance").GetComponent(0, 0)
-			if candidateDistance < distanceToBeat:
-				distanceToBeat = candidateDistance
-				distanceToBeatPoints = candidateFilter.GetOutput().GetPoints()
+		best = search.run(sourceIndex, targetIndex)
 
-		return distanceToBeat, distanceToBeatPoints
\ No newline at end of file
+		MeshModel.transformInPlace(source, best.transform)						# Apply the best orientation's transform to the source
+		return best.transform
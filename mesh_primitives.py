@@ -0,0 +1,76 @@
+#region IMPORTS
+import math
+import threading
+from collections import OrderedDict
+from vtkmodules.vtkCommonExecutionModel import vtkAlgorithm
+from vtkmodules.vtkFiltersSources import vtkConeSource, vtkSphereSource
+#endregion IMPORTS
+
+SPHERE_RESOLUTION = 100														# Theta and phi resolution of spheres without a chord error
+CONE_RESOLUTION = 500														# Sides of cones without a chord error
+MIN_RESOLUTION = 8
+MAX_RESOLUTION = 1000
+PRIMITIVE_CACHE_ENTRIES = 16
+
+PRIMITIVE_SHAPES = ("sphere", "cone")
+
+# Unit tessellations by (shape, resolution), least recently used first
+unitPrimitives = OrderedDict()
+unitPrimitivesLock = threading.Lock()
+
+def chordResolution(radius, chordError) -> int:
+	"""
+	Chooses the number of segments around a circle so that no segment strays further than the chord error from the true
+	circle. A segment spanning angle a has a sagitta of radius * (1 - cos(a / 2)).
+
+	Args:
+		radius (float): Radius of the circle.
+		chordError (float): Largest allowed distance between a segment and the circle, in the same units as the radius.
+
+	Returns:
+		int: Number of segments, clamped to [MIN_RESOLUTION, MAX_RESOLUTION].
+	"""
+	if chordError >= radius:
+		return MIN_RESOLUTION
+	resolution = math.ceil(math.pi / math.acos(1 - chordError / radius))
+	return min(max(resolution, MIN_RESOLUTION), MAX_RESOLUTION)
+
+def unitPrimitive(shape, resolution):
+	"""
+	Gets the tessellation of a unit primitive, building it on first use: a sphere of radius 1, or a cone of radius 1 and
+	height 1 along the x axis, both centered on the origin. Points are in double precision, so scaling them loses
+	nothing. The returned polydata is shared by every caller and must not be modified.
+
+	Args:
+		shape (str): One of PRIMITIVE_SHAPES.
+		resolution (int): Theta and phi resolution of a sphere, number of sides of a cone.
+
+	Returns:
+		vtkPolyData: The unit tessellation.
+	"""
+	key = (shape, resolution)
+	with unitPrimitivesLock:
+		polyData = unitPrimitives.get(key)
+		if polyData is not None:
+			unitPrimitives.move_to_end(key)
+			return polyData
+
+	if shape == "sphere":
+		source = vtkSphereSource()
+		source.SetRadius(1.0)
+		source.SetPhiResolution(resolution)
+		source.SetThetaResolution(resolution)
+	else:
+		source = vtkConeSource()
+		source.SetRadius(1.0)
+		source.SetHeight(1.0)
+		source.SetResolution(resolution)
+	source.SetOutputPointsPrecision(vtkAlgorithm.DOUBLE_PRECISION)
+	source.Update()
+	polyData = source.GetOutput()
+
+	with unitPrimitivesLock:
+		unitPrimitives[key] = polyData
+		while len(unitPrimitives) > PRIMITIVE_CACHE_ENTRIES:
+			unitPrimitives.popitem(last=False)
+	return polyData
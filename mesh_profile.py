@@ -0,0 +1,237 @@
+#region IMPORTS
+import os
+import sys
+import json
+import time
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import NamedTuple
+try:
+	import resource
+except ImportError:
+	resource = None																# Not available on Windows, peak RSS is then not reported
+#endregion IMPORTS
+
+RSS_UNIT_BYTES = 1 if sys.platform == "darwin" else 1024						# getrusage reports ru_maxrss in bytes on macOS, KiB elsewhere
+
+class StageRecord(NamedTuple):
+	"""
+    Measurements of one finished stage of a profiled operation.
+
+    Attributes:
+        name (str): Name of the stage.
+        depth (int): Nesting depth, 0 for stages not run inside another stage.
+        start (float): Seconds from the start of the profile to the start of the stage.
+        seconds (float): Wall time of the stage.
+        peakMemoryBytes (int): Peak growth of the Python and NumPy heap during the stage, as traced by tracemalloc.
+            VTK's own allocations are not traced. None if memory was not traced.
+        maxRssBytes (int): Peak resident set size of the process so far when the stage ended, which does include VTK's
+            allocations. None where the platform does not report it.
+        counts (dict): Sizes and counters of the stage, such as point and cell counts or ICP iterations.
+    """
+	name: str
+	depth: int
+	start: float
+	seconds: float
+	peakMemoryBytes: int
+	maxRssBytes: int
+	counts: dict
+
+class ComparisonProfile:
+	"""
+    An opt-in record of where a comparison spends its time and memory. Pass one to MeshModel.compareMeshes and it
+    comes back filled with one StageRecord per stage, which can be printed or exported as a Chrome trace
+    (chrome://tracing or https://ui.perfetto.dev).
+
+    Stages are recorded from the thread running the comparison only. Tracing memory slows down Python allocations
+    noticeably, so it can be turned off when only timings are wanted.
+
+    Attributes:
+        traceMemory (bool): Whether to trace heap memory with tracemalloc.
+        stages (list[StageRecord]): Finished stages, in the order they finished.
+        origin (float): perf_counter() value the stage start times are relative to.
+    """
+
+	def __init__(self, traceMemory=True):
+		"""
+        Initializes a ComparisonProfile object.
+
+        Args:
+            traceMemory (bool): Whether to trace heap memory with tracemalloc.
+        """
+		self.traceMemory = traceMemory
+		self.stages = []
+		self.origin = time.perf_counter()
+		self.openStages = []
+		self.startedTracing = False
+
+	@contextmanager
+	def stage(self, name, **counts):
+		"""
+		Records the code run inside the context as a stage. Stages may be nested.
+
+		Args:
+			name (str): Name of the stage.
+			**counts: Initial counts of the stage, see addCounts.
+
+		Returns:
+			None
+		"""
+		if self.traceMemory and not self.openStages and not tracemalloc.is_tracing():
+			tracemalloc.start()
+			self.startedTracing = True
+		tracedBytes = self.notePeakMemory()
+		openStage = {"name": name, "start": time.perf_counter(), "startBytes": tracedBytes, "peakBytes": tracedBytes, "counts": dict(counts)}
+		self.openStages.append(openStage)
+		try:
+			yield
+		finally:
+			seconds = time.perf_counter() - openStage["start"]
+			self.notePeakMemory()
+			self.openStages.pop()
+
+			peakMemoryBytes = None
+			if tracemalloc.is_tracing():
+				peakMemoryBytes = max(0, openStage["peakBytes"] - openStage["startBytes"])
+			maxRssBytes = None
+			if resource is not None:
+				maxRssBytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * RSS_UNIT_BYTES
+			self.stages.append(StageRecord(name, len(self.openStages), openStage["start"] - self.origin, seconds, peakMemoryBytes, maxRssBytes, openStage["counts"]))
+
+			if self.startedTracing and not self.openStages:
+				tracemalloc.stop()
+				self.startedTracing = False
+
+	def notePeakMemory(self) -> int:
+		"""
+		Folds the traced peak since the last call into every open stage, then starts a new peak. tracemalloc only keeps a
+		single peak, this is what lets nested stages each have their own.
+
+		Args:
+			None
+
+		Returns:
+			int: Currently traced bytes, 0 if memory is not traced.
+		"""
+		if not tracemalloc.is_tracing():
+			return 0
+		tracedBytes, peakBytes = tracemalloc.get_traced_memory()
+		for openStage in self.openStages:
+			openStage["peakBytes"] = max(openStage["peakBytes"], peakBytes)
+		tracemalloc.reset_peak()
+		return tracedBytes
+
+	def addCounts(self, **counts):
+		"""
+		Adds counts to the innermost open stage. Numbers are summed with any earlier value of the same count, anything
+		else replaces it. Does nothing outside of a stage.
+
+		Args:
+			**counts: Counts to add, by name.
+
+		Returns:
+			None
+		"""
+		if not self.openStages:
+			return
+		stageCounts = self.openStages[-1]["counts"]
+		for key, value in counts.items():
+			if isinstance(value, (int, float)) and not isinstance(value, bool) and isinstance(stageCounts.get(key), (int, float)):
+				stageCounts[key] += value
+			else:
+				stageCounts[key] = value
+
+	def getStage(self, name) -> StageRecord:
+		"""
+		Gets the first finished stage of a given name.
+
+		Args:
+			name (str): Name of the stage.
+
+		Returns:
+			StageRecord: The stage, None if no stage of that name finished.
+		"""
+		return next((stage for stage in self.stages if stage.name == name), None)
+
+	def summary(self) -> str:
+		"""
+		Gets a human readable table of the stages, in the order they started.
+
+		Args:
+			None
+
+		Returns:
+			str: One line per stage with its wall time, peak memory and counts.
+		"""
+		lines = []
+		for stage in sorted(self.stages, key=lambda stage: (stage.start, stage.depth)):
+			memory = "" if stage.peakMemoryBytes is None else "{:0.1f}MB".format(stage.peakMemoryBytes / 1e6)
+			counts = " ".join("{}={}".format(key, value) for key, value in stage.counts.items() if not isinstance(value, (list, tuple)))
+			lines.append("{}{:<{}}{:>10.3f}ms{:>10}  {}".format("  " * stage.depth, stage.name, 24 - 2 * stage.depth, stage.seconds * 1000, memory, counts))
+		return "\n".join(lines)
+
+	def toChromeTrace(self) -> dict:
+		"""
+		Converts the stages to the Chrome trace event format, one complete event per stage.
+
+		Args:
+			None
+
+		Returns:
+			dict: The trace, ready to be written as JSON.
+		"""
+		processId = os.getpid()
+		threadId = threading.get_ident()
+		events = []
+		for stage in self.stages:
+			args = dict(stage.counts)
+			args["peakMemoryBytes"] = stage.peakMemoryBytes
+			args["maxRssBytes"] = stage.maxRssBytes
+			events.append({"name": stage.name, "cat": "compareMeshes", "ph": "X", "ts": stage.start * 1e6, "dur": stage.seconds * 1e6, "pid": processId, "tid": threadId, "args": args})
+		return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+	def saveChromeTrace(self, filepath):
+		"""
+		Writes the stages to a Chrome trace JSON file.
+
+		Args:
+			filepath (str): File to write.
+
+		Returns:
+			None
+		"""
+		with open(filepath, "w") as traceFile:
+			json.dump(self.toChromeTrace(), traceFile)
+
+def profileStage(profile, name, **counts):
+	"""
+	Opens a stage on a profile, if there is one. Lets instrumented code read the same whether or not it is profiled.
+
+	Args:
+		profile (ComparisonProfile): Profile to record into, None to record nothing.
+		name (str): Name of the stage.
+		**counts: Initial counts of the stage.
+
+	Returns:
+		contextmanager: Context covering the stage.
+	"""
+	if profile is None:
+		return nullcontext()
+	return profile.stage(name, **counts)
+
+def meshCounts(sourcePolyData, targetPolyData) -> dict:
+	"""
+	Gets the point and cell counts of a stage's source and target, as profile counts.
+
+	Args:
+		sourcePolyData (vtkPolyData): Source mesh of the stage.
+		targetPolyData (vtkPolyData): Target mesh of the stage.
+
+	Returns:
+		dict: Point and cell counts by name.
+	"""
+	return {
+		"sourcePoints": sourcePolyData.GetNumberOfPoints(), "sourceCells": sourcePolyData.GetNumberOfCells(),
+		"targetPoints": targetPolyData.GetNumberOfPoints(), "targetCells": targetPolyData.GetNumberOfCells(),
+	}
@@ -0,0 +1,209 @@
+#region IMPORTS
+import math
+from typing import NamedTuple
+import numpy as np
+from vtkmodules.util.numpy_support import numpy_to_vtk, vtk_to_numpy
+from vtkmodules.vtkCommonCore import VTK_ID_TYPE, vtkPoints
+from vtkmodules.vtkCommonDataModel import vtkCellArray, vtkPolyData
+#endregion IMPORTS
+
+DEFAULT_MIN_POINTS = 4096
+DEFAULT_MAX_LEVELS = 4
+FINEST_VOXEL_DIVISIONS = 1024												# Voxels along the bounding box diagonal at the finest subsampling tried
+PYRAMID_BLOCK_POINTS = 1 << 20
+
+class PyramidLevel(NamedTuple):
+	"""
+    One level of a MeshPyramid.
+
+    Attributes:
+        polyData (vtkPolyData): Points of the level, each with a vertex cell.
+        coveringRadius (float): Largest distance from any full resolution point to the level's points. The Hausdorff
+            distance between two meshes differs from that between their levels by at most the sum of both radii.
+        voxelSize (float): Edge length of the voxels the level was subsampled with, 0 for the full resolution level.
+    """
+	polyData: vtkPolyData
+	coveringRadius: float
+	voxelSize: float
+
+class MeshPyramid:
+	"""
+    A coarse to fine pyramid of voxel subsampled copies of a mesh's points, for aligning large meshes at low resolution
+    before refining. Level 0 is the full resolution mesh; each further level keeps one point per voxel, with the voxel
+    size doubling until fewer than minPoints remain.
+
+    Attributes:
+        polyData (vtkPolyData): The full resolution mesh. Must not be modified while the pyramid is in use.
+        mTime (int): Modified time of the mesh when the pyramid was built.
+        blockPoints (int): Points subsampled at a time.
+        levels (list[PyramidLevel]): Levels from finest (the mesh itself) to coarsest.
+        indices (dict[tuple, PreparedTarget]): Spatial indices of the coarse levels, by level and index type.
+    """
+
+	def __init__(self, polyData, minPoints=DEFAULT_MIN_POINTS, maxLevels=DEFAULT_MAX_LEVELS, blockPoints=PYRAMID_BLOCK_POINTS):
+		"""
+        Initializes a MeshPyramid object and builds its levels.
+
+        Args:
+            polyData (vtkPolyData): The full resolution mesh.
+            minPoints (int): Meshes with at most this many points are not subsampled any further.
+            maxLevels (int): Maximum number of coarse levels to build.
+            blockPoints (int): Points subsampled at a time, which bounds the temporaries for very large meshes.
+        """
+		self.polyData = polyData
+		self.blockPoints = blockPoints
+		self.mTime = polyData.GetMTime()
+		self.levels = [PyramidLevel(polyData, 0.0, 0.0)]
+		self.indices = {}
+		self.buildLevels(minPoints, maxLevels)
+
+	def buildLevels(self, minPoints, maxLevels):
+		"""
+		Builds the coarse levels. Every level is subsampled directly from the full resolution points, so the covering
+		radii do not accumulate from level to level. The points are read in blocks, so memory mapped meshes larger than
+		memory can be subsampled.
+
+		Args:
+			minPoints (int): Meshes with at most this many points are not subsampled any further.
+			maxLevels (int): Maximum number of coarse levels to build.
+
+		Returns:
+			None
+		"""
+		if self.polyData.GetPoints() is None:
+			return
+		points = vtk_to_numpy(self.polyData.GetPoints().GetData())
+		if len(points) <= minPoints:
+			return
+
+		lower = points.min(axis=0)
+		extent = points.max(axis=0) - lower
+		diagonal = float(np.linalg.norm(extent))
+		if diagonal == 0:
+			return
+
+		voxelSize = diagonal / FINEST_VOXEL_DIVISIONS
+		previousCount = len(points)
+		while len(self.levels) <= maxLevels and previousCount > minPoints:
+			levelVoxelSize = voxelSize
+			voxelSize *= 2
+			keys, representatives = self.voxelRepresentatives(points, lower, extent, levelVoxelSize, previousCount // 2)
+			if len(representatives) > previousCount // 2:
+				continue															# Too little reduction to be worth a level, try larger voxels
+
+			# Second pass measures each point's offset to its voxel's representative, again a block at a time
+			representativePoints = points[representatives]
+			coveringRadius = 0.0
+			for blockStart in range(0, len(points), self.blockPoints):
+				block = points[blockStart:blockStart + self.blockPoints]
+				offsets = block - representativePoints[np.searchsorted(keys, voxelKeys(block, lower, extent, levelVoxelSize))]
+				coveringRadius = max(coveringRadius, float(np.max(np.einsum("ij,ij->i", offsets, offsets))))
+			self.levels.append(PyramidLevel(pointCloud(points[np.sort(representatives)]), math.sqrt(coveringRadius), levelVoxelSize))
+			previousCount = len(representatives)
+
+	def voxelRepresentatives(self, points, lower, extent, voxelSize, maxVoxels) -> tuple[np.ndarray, np.ndarray]:
+		"""
+		Finds the occupied voxels and the first point in each, streaming the points a block at a time so memory grows with
+		the number of voxels rather than the number of points.
+
+		Args:
+			points (numpy.ndarray): Full resolution points, shape (n, 3). May be memory mapped.
+			lower (numpy.ndarray): Lower corner of the points' bounding box.
+			extent (numpy.ndarray): Size of the points' bounding box.
+			voxelSize (float): Edge length of the voxels.
+			maxVoxels (int): Voxel count past which the level is not wanted, the scan stops once it is exceeded.
+
+		Returns:
+			tuple[numpy.ndarray, numpy.ndarray]: The sorted keys of the occupied voxels, and the index of the first point
+				in each. Incomplete if there are more than maxVoxels.
+		"""
+		keys, representatives = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+		for blockStart in range(0, len(points), self.blockPoints):
+			blockKeys, blockRepresentatives = np.unique(voxelKeys(points[blockStart:blockStart + self.blockPoints], lower, extent, voxelSize), return_index=True)
+			# The known voxels come first, so np.unique keeps their earlier representatives
+			keys, first = np.unique(np.concatenate([keys, blockKeys]), return_index=True)
+			representatives = np.concatenate([representatives, blockStart + blockRepresentatives])[first]
+			if len(keys) > maxVoxels:
+				break
+		return keys, representatives
+
+	def isValidFor(self, polyData) -> bool:
+		"""
+		Checks whether this pyramid still describes the given polydata.
+
+		Args:
+			polyData (vtkPolyData): Polydata to check against.
+
+		Returns:
+			bool: True if the pyramid was built on this polydata and it has not been modified since.
+		"""
+		return polyData is self.polyData and polyData.GetMTime() <= self.mTime
+
+	def getLevel(self, level) -> PyramidLevel:
+		"""
+		Gets a level of the pyramid. Levels past the coarsest give the coarsest, so pyramids of different depths can be
+		walked together.
+
+		Args:
+			level (int): Level to get, 0 is full resolution.
+
+		Returns:
+			PyramidLevel: The level.
+		"""
+		return self.levels[min(level, len(self.levels) - 1)]
+
+	def getIndex(self, level, indexType):
+		"""
+		Gets a spatial index of a level, building it on first use.
+
+		Args:
+			level (int): Level to index, see getLevel.
+			indexType (type): PreparedTarget class to build the index with.
+
+		Returns:
+			PreparedTarget: Spatial index of the level.
+		"""
+		level = min(level, len(self.levels) - 1)
+		index = self.indices.get((level, indexType))
+		if index is None:
+			index = indexType(self.levels[level].polyData)
+			self.indices[(level, indexType)] = index
+		return index
+
+def voxelKeys(points, lower, extent, voxelSize) -> np.ndarray:
+	"""
+	Flattens the 3D voxel coordinates of points into one integer key per point, so a 1D unique can group them. Keys
+	follow the x, y, z order of the voxels.
+
+	Args:
+		points (numpy.ndarray): Points, shape (n, 3).
+		lower (numpy.ndarray): Lower corner of the voxel grid.
+		extent (numpy.ndarray): Size of the voxel grid, no point may lie beyond lower + extent.
+		voxelSize (float): Edge length of the voxels.
+
+	Returns:
+		numpy.ndarray: Key of each point's voxel, shape (n,).
+	"""
+	voxels = np.floor((points - lower) / voxelSize).astype(np.int64)
+	dims = np.floor(extent / voxelSize).astype(np.int64) + 1
+	return (voxels[:, 0] * dims[1] + voxels[:, 1]) * dims[2] + voxels[:, 2]
+
+def pointCloud(points) -> vtkPolyData:
+	"""
+	Builds a polydata of points with one vertex cell per point, which is what the cell locator used by ICP needs.
+
+	Args:
+		points (numpy.ndarray): Point coordinates, shape (n, 3).
+
+	Returns:
+		vtkPolyData: The point cloud.
+	"""
+	vtkPointArray = vtkPoints()
+	vtkPointArray.SetData(numpy_to_vtk(np.ascontiguousarray(points), deep=True))
+	vertices = vtkCellArray()
+	vertices.SetData(numpy_to_vtk(np.arange(len(points) + 1), deep=True, array_type=VTK_ID_TYPE), numpy_to_vtk(np.arange(len(points)), deep=True, array_type=VTK_ID_TYPE))
+
+	polyData = vtkPolyData()
+	polyData.SetPoints(vtkPointArray)
+	polyData.SetVerts(vertices)
+	return polyData
@@ -0,0 +1,114 @@
+#region IMPORTS
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+#endregion IMPORTS
+
+DEFAULT_MAX_ENTRIES = 256
+
+class ComparisonRecord(NamedTuple):
+	"""
+    The outcome of a mesh comparison, without any mesh data. The aligned source is kept only as the matrix that
+    produces it from the source mesh, so a record costs a few hundred bytes however large the meshes are.
+
+    Attributes:
+        noAlignmentHausDist (float): Hausdorff distance after no alignment.
+        obbAlignmentHausDist (float): Hausdorff distance after oriented bounding box alignment.
+        icpHausDist (float): Hausdorff distance after iterative closest point refinement.
+        alignedMatrix (tuple[float]): Row major 4x4 matrix taking the source onto its best alignment with the target.
+            None if the unaligned source was the best.
+    """
+	noAlignmentHausDist: float
+	obbAlignmentHausDist: float
+	icpHausDist: float
+	alignedMatrix: tuple = None
+
+def flattenMatrix(matrix) -> tuple:
+	"""
+	Flattens a VTK matrix into a plain tuple, which unlike the matrix is immutable and safe to keep in a record.
+
+	Args:
+		matrix (vtkMatrix4x4): Matrix to flatten.
+
+	Returns:
+		tuple[float]: The 16 elements in row major order.
+	"""
+	return tuple(matrix.GetElement(row, column) for row in range(4) for column in range(4))
+
+class ComparisonCache:
+	"""
+    A bounded, least recently used cache of comparison records, keyed by the fingerprints of the two meshes and
+    the comparison parameters. Safe to share between threads.
+
+    Attributes:
+        maxEntries (int): Maximum number of records kept.
+        hits (int): Number of lookups that found a record.
+        misses (int): Number of lookups that did not.
+    """
+
+	def __init__(self, maxEntries=DEFAULT_MAX_ENTRIES):
+		"""
+        Initializes a ComparisonCache object.
+
+        Args:
+            maxEntries (int): Maximum number of records kept.
+        """
+		self.maxEntries = maxEntries
+		self.hits = 0
+		self.misses = 0
+		self.records = OrderedDict()
+		self.lock = threading.Lock()
+
+	def get(self, key) -> ComparisonRecord:
+		"""
+		Looks up a record and marks it as recently used.
+
+		Args:
+			key (tuple): Key of the comparison, see MeshModel.compareMeshes.
+
+		Returns:
+			ComparisonRecord: The cached record, None if there is none.
+		"""
+		with self.lock:
+			record = self.records.get(key)
+			if record is None:
+				self.misses += 1
+				return None
+			self.records.move_to_end(key)
+			self.hits += 1
+			return record
+
+	def put(self, key, record):
+		"""
+		Stores a record, evicting the least recently used one if the cache is full.
+
+		Args:
+			key (tuple): Key of the comparison, see MeshModel.compareMeshes.
+			record (ComparisonRecord): Record to store.
+
+		Returns:
+			None
+		"""
+		with self.lock:
+			self.records[key] = record
+			self.records.move_to_end(key)
+			while len(self.records) > self.maxEntries:
+				self.records.popitem(last=False)
+
+	def clear(self):
+		"""
+		Removes every record and resets the hit/miss counters.
+
+		Args:
+			None
+
+		Returns:
+			None
+		"""
+		with self.lock:
+			self.records.clear()
+			self.hits = 0
+			self.misses = 0
+
+	def __len__(self) -> int:
+		return len(self.records)
@@ -0,0 +1,388 @@
+#region IMPORTS
+import os
+import math
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+import numpy as np
+from vtkmodules.util.numpy_support import vtk_to_numpy
+from mesh_alignment import transformMatrix, transformPoints
+from mesh_distance import DistanceField, PreparedTarget, distanceStats, inverseSimilarity
+#endregion IMPORTS
+
+TILE_POINTS = 1 << 20														# Most points per tile, meshes with fewer are not written to disk
+TREE_CACHE_POINTS = 1 << 23													# Points of the tile KD-trees kept in memory at once
+BLOCK_POINTS = 1 << 16														# Query points streamed through the tiles at a time
+WRITE_BLOCK_POINTS = 1 << 20												# Points assigned to tiles at a time while writing them
+SPLIT_SAMPLE_POINTS = 1 << 20												# Points sampled to choose the tile boundaries
+DEFAULT_TILE_DIR = os.environ.get("MESH_TILE_DIR")								# Where tiles are written, the system temporary directory if not set
+
+class TiledTarget(PreparedTarget):
+	"""
+    An out-of-core alternative to KDTreeTarget, for meshes larger than memory.
+
+    The points are split into spatial tiles by a k-d partition: balanced median splits, chosen on a sample, down to
+    tiles of at most about tilePoints points. The points are then written to disk grouped by tile in two streaming
+    passes, together with the index of the tiles (their ranges, bounds and the splits). A KD-tree is only built for a
+    tile when a query needs it, and the least recently used trees are dropped beyond a budget of cachePoints.
+
+    Queries stream the query points through the tiles in blocks. Each point is first matched in the tile of the
+    partition cell it falls in, then the other tiles are visited nearest first, and a tile is skipped as soon as its
+    bounding box is farther than the block's current closest distances, so a block usually only touches the few tiles
+    around it. A tiled source is streamed tile by tile, which keeps the blocks compact and
+    the trees they need in the cache. Memory is bounded by the trees' budget and the block size, apart from per point
+    distance arrays when they are asked for.
+
+    Meshes with at most tilePoints points form a single tile kept in memory, no files are written for them.
+
+    Attributes:
+        tilePoints (int): Most points per tile.
+        cachePoints (int): Points of the tile KD-trees kept in memory at once.
+        directory (str): Directory holding the tiles, removed with the object. None for a single in-memory tile.
+        points (numpy.ndarray): The points grouped by tile, memory mapped from the directory, shape (n, 3).
+        order (numpy.ndarray): Index in the polydata of each point of points, memory mapped. None for a single tile.
+        tileStarts (numpy.ndarray): Start of each tile in points, plus the total point count, shape (t + 1,).
+        tileMin (numpy.ndarray): Lower corner of each tile's bounding box, shape (t, 3). Infinite for empty tiles.
+        tileMax (numpy.ndarray): Upper corner of each tile's bounding box, shape (t, 3). Infinite for empty tiles.
+        splitAxes (numpy.ndarray): Axis of each split of the k-d partition, in heap order.
+        splitValues (numpy.ndarray): Coordinate of each split, points at or above it go to the upper child.
+        trees (OrderedDict[int, scipy.spatial.cKDTree]): Cached KD-trees by tile, least recently used first.
+        treeLock (threading.Lock): Guards the tree cache, queries may come from several threads.
+    """
+
+	def __init__(self, polyData, tilePoints=TILE_POINTS, cachePoints=TREE_CACHE_POINTS, directory=DEFAULT_TILE_DIR):
+		"""
+        Initializes a TiledTarget object and writes its tiles.
+
+        Args:
+            polyData (vtkPolyData): The polydata to index. Its points may be memory mapped, they are only read in blocks.
+            tilePoints (int): Most points per tile.
+            cachePoints (int): Points of the tile KD-trees kept in memory at once.
+            directory (str): Directory to create the tile directory in. The system temporary directory if None.
+        """
+		self.tilePoints = tilePoints
+		self.cachePoints = cachePoints
+		self.tileParent = directory
+		self.trees = OrderedDict()
+		self.treeLock = threading.Lock()
+		super().__init__(polyData)
+
+	def buildIndex(self):
+		"""
+		Splits the points into tiles and writes them to disk.
+
+		Args:
+			None
+
+		Returns:
+			None
+		"""
+		points = vtk_to_numpy(self.polyData.GetPoints().GetData())
+		self.directory = None
+		self.order = None
+		self.depth = 0 if len(points) <= self.tilePoints else math.ceil(math.log2(len(points) / self.tilePoints))
+		self.splitAxes = np.zeros((1 << self.depth) - 1, dtype=np.int64)
+		self.splitValues = np.zeros((1 << self.depth) - 1)
+		if self.depth == 0:
+			self.points = points
+			self.tileStarts = np.array([0, len(points)])
+			self.tileMin = points.min(axis=0, keepdims=True).astype(np.float64) if len(points) > 0 else np.full((1, 3), np.inf)
+			self.tileMax = points.max(axis=0, keepdims=True).astype(np.float64) if len(points) > 0 else np.full((1, 3), -np.inf)
+			return
+
+		stride = max(1, len(points) // SPLIT_SAMPLE_POINTS)
+		self.chooseSplits(0, 0, np.array(points[::stride], dtype=np.float64))
+
+		# First pass counts the points of each tile, the second writes each point to its tile's next free row
+		tileCount = 1 << self.depth
+		counts = np.zeros(tileCount, dtype=np.int64)
+		for blockStart in range(0, len(points), WRITE_BLOCK_POINTS):
+			counts += np.bincount(self.tileOf(points[blockStart:blockStart + WRITE_BLOCK_POINTS]), minlength=tileCount)
+		self.tileStarts = np.concatenate([[0], np.cumsum(counts)])
+
+		self.directory = tempfile.mkdtemp(prefix="mesh-tiles-", dir=self.tileParent)
+		weakref.finalize(self, shutil.rmtree, self.directory, True)
+		tiledPoints = np.lib.format.open_memmap(os.path.join(self.directory, "points.npy"), mode="w+", dtype=points.dtype, shape=points.shape)
+		order = np.lib.format.open_memmap(os.path.join(self.directory, "order.npy"), mode="w+", dtype=np.int64, shape=(len(points),))
+		self.tileMin = np.full((tileCount, 3), np.inf)
+		self.tileMax = np.full((tileCount, 3), -np.inf)
+		nextRows = self.tileStarts[:-1].copy()
+		for blockStart in range(0, len(points), WRITE_BLOCK_POINTS):
+			block = points[blockStart:blockStart + WRITE_BLOCK_POINTS]
+			tiles = self.tileOf(block)
+			byTile = np.argsort(tiles, kind="stable")
+			sortedTiles = tiles[byTile]
+			blockCounts = np.bincount(tiles, minlength=tileCount)
+			blockStarts = np.concatenate([[0], np.cumsum(blockCounts)[:-1]])
+			rows = nextRows[sortedTiles] + np.arange(len(block)) - blockStarts[sortedTiles]
+			tiledPoints[rows] = block[byTile]
+			order[rows] = blockStart + byTile
+			nextRows += blockCounts
+
+			present = blockCounts > 0
+			self.tileMin[present] = np.minimum(self.tileMin[present], np.minimum.reduceat(block[byTile], blockStarts[present], axis=0))
+			self.tileMax[present] = np.maximum(self.tileMax[present], np.maximum.reduceat(block[byTile], blockStarts[present], axis=0))
+		tiledPoints.flush()
+		order.flush()
+		del tiledPoints, order
+
+		np.savez(os.path.join(self.directory, "index.npz"), tileStarts=self.tileStarts, tileMin=self.tileMin, tileMax=self.tileMax, splitAxes=self.splitAxes, splitValues=self.splitValues)
+		self.points = np.load(os.path.join(self.directory, "points.npy"), mmap_mode="r")
+		self.order = np.load(os.path.join(self.directory, "order.npy"), mmap_mode="r")
+
+	def chooseSplits(self, heapIndex, level, sample):
+		"""
+		Chooses the splits of a node of the k-d partition and of all nodes below it, splitting the node's sample points at
+		their median along their longest extent.
+
+		Args:
+			heapIndex (int): Index of the node in splitAxes and splitValues.
+			level (int): Depth of the node, 0 for the root.
+			sample (numpy.ndarray): Sample points in the node, shape (k, 3).
+
+		Returns:
+			None
+		"""
+		if level == self.depth:
+			return
+		if len(sample) > 0:
+			axis = int(np.argmax(sample.max(axis=0) - sample.min(axis=0)))
+			self.splitAxes[heapIndex] = axis
+			self.splitValues[heapIndex] = np.median(sample[:, axis])
+		upper = sample[:, self.splitAxes[heapIndex]] >= self.splitValues[heapIndex]
+		self.chooseSplits(2 * heapIndex + 1, level + 1, sample[~upper])
+		self.chooseSplits(2 * heapIndex + 2, level + 1, sample[upper])
+
+	def tileOf(self, points) -> np.ndarray:
+		"""
+		Finds the tile of each point by walking it down the k-d partition.
+
+		Args:
+			points (numpy.ndarray): Points, shape (n, 3).
+
+		Returns:
+			numpy.ndarray: Tile index of each point, shape (n,).
+		"""
+		tiles = np.zeros(len(points), dtype=np.int64)
+		rows = np.arange(len(points))
+		for level in range(self.depth):
+			heapIndices = tiles + (1 << level) - 1
+			tiles = 2 * tiles + (points[rows, self.splitAxes[heapIndices]] >= self.splitValues[heapIndices])
+		return tiles
+
+	def getTree(self, tile):
+		"""
+		Gets the KD-tree of a tile, building it on first use and dropping the least recently used trees beyond the budget.
+
+		Args:
+			tile (int): Index of the tile.
+
+		Returns:
+			scipy.spatial.cKDTree: KD-tree over the tile's points.
+		"""
+		from scipy.spatial import cKDTree										# Imported on first use, SciPy doubles the import time of the module
+		with self.treeLock:
+			tree = self.trees.get(tile)
+			if tree is not None:
+				self.trees.move_to_end(tile)
+				return tree
+			tree = cKDTree(self.points[self.tileStarts[tile]:self.tileStarts[tile + 1]])
+			self.trees[tile] = tree
+			cachedPoints = sum(cachedTree.n for cachedTree in self.trees.values())
+			while cachedPoints > self.cachePoints and len(self.trees) > 1:
+				_, dropped = self.trees.popitem(last=False)
+				cachedPoints -= dropped.n
+			return tree
+
+	def closestDistances(self, points) -> np.ndarray:
+		"""
+		Finds the distance from each of a block of points to its closest point in the tiles. Each point is first matched
+		against the tile of the partition cell it falls in, which usually holds its closest point. Other tiles are then
+		visited nearest first, and only for the points whose current distance is farther than the tile's bounding box.
+
+		Args:
+			points (numpy.ndarray): Query points, shape (n, 3), in double precision.
+
+		Returns:
+			numpy.ndarray: Closest point distance of each query point, shape (n,).
+		"""
+		distances = np.full(len(points), np.inf)
+		if len(points) == 0:
+			return distances
+
+		# Unbounded queries from far outside a tile are slow, so every point starts in its own cell's tile
+		homeTiles = self.tileOf(points)
+		for tile in np.unique(homeTiles):
+			if self.tileStarts[tile] < self.tileStarts[tile + 1]:
+				members = np.flatnonzero(homeTiles == tile)
+				distances[members], _ = self.getTree(tile).query(points[members], workers=-1)
+
+		blockMin, blockMax = points.min(axis=0), points.max(axis=0)
+		gaps = np.maximum(np.maximum(self.tileMin - blockMax, blockMin - self.tileMax), 0)
+		tileDistances = np.sqrt(np.sum(np.square(gaps), axis=1))
+		for tile in np.argsort(tileDistances):
+			if self.tileStarts[tile] == self.tileStarts[tile + 1]:
+				continue															# Empty tile
+			if tileDistances[tile] >= distances.max():
+				break																# Every remaining tile is farther still
+
+			pointGaps = np.maximum(np.maximum(self.tileMin[tile] - points, points - self.tileMax[tile]), 0)
+			candidates = np.flatnonzero((np.sum(np.square(pointGaps), axis=1) < np.square(distances)) & (homeTiles != tile))
+			if len(candidates) == 0:
+				continue
+			tileHits, _ = self.getTree(tile).query(points[candidates], distance_upper_bound=distances[candidates].max(), workers=-1)
+			distances[candidates] = np.minimum(distances[candidates], tileHits)
+		return distances
+
+	def queryBlocks(self, source, matrix=None):
+		"""
+		Streams the points of a source through the tiles in blocks. A tiled source is read tile by tile, any other source
+		in the order of its points.
+
+		Args:
+			source (PreparedTarget): Source to measure from.
+			matrix (numpy.ndarray): Optional 4x4 transform to apply to each block before querying.
+
+		Returns:
+			Iterator[tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]]: For each block, the index of its points in the
+				source's polydata, the (transformed) points and their closest point distances.
+		"""
+		if isinstance(source, TiledTarget):
+			ranges = [(start, min(start + BLOCK_POINTS, end)) for start, end in zip(source.tileStarts[:-1], source.tileStarts[1:]) for start in range(start, end, BLOCK_POINTS)]
+			sourcePoints, sourceOrder = source.points, source.order
+		else:
+			sourcePoints, sourceOrder = vtk_to_numpy(source.polyData.GetPoints().GetData()), None
+			ranges = [(start, min(start + BLOCK_POINTS, len(sourcePoints))) for start in range(0, len(sourcePoints), BLOCK_POINTS)]
+
+		for start, end in ranges:
+			block = sourcePoints[start:end]
+			if matrix is None:
+				block = np.array(block, dtype=np.float64)
+			else:
+				block = transformPoints(block, matrix, np.empty(block.shape))
+			indices = np.arange(start, end) if sourceOrder is None else np.asarray(sourceOrder[start:end])
+			yield indices, block, self.closestDistances(block)
+
+	def maxClosestDistance(self, points, bound=None) -> float:
+		"""
+		Finds the largest distance from any of the given points to its closest point in the tiles, streaming the points
+		in blocks.
+
+		Args:
+			points (vtkPoints): Query points.
+			bound (float): Distance beyond which the exact value is not needed.
+
+		Returns:
+			float: The maximum closest point distance, 0 if there are no query points.
+		"""
+		pointArray = vtk_to_numpy(points.GetData())
+		maxDistance = 0.0
+		for start in range(0, len(pointArray), BLOCK_POINTS):
+			maxDistance = max(maxDistance, float(self.closestDistances(np.array(pointArray[start:start + BLOCK_POINTS], dtype=np.float64)).max()))
+			if bound is not None and maxDistance > bound:
+				break
+		return maxDistance
+
+	def closestSquaredDistances(self, points) -> np.ndarray:
+		"""
+		Finds the squared distance from each of the given points to its closest point in the tiles.
+
+		Args:
+			points (vtkPoints): Query points.
+
+		Returns:
+			numpy.ndarray: Squared closest point distance of each query point, shape (n,).
+		"""
+		pointArray = vtk_to_numpy(points.GetData())
+		squaredDistances = np.empty(len(pointArray))
+		for start in range(0, len(pointArray), BLOCK_POINTS):
+			squaredDistances[start:start + BLOCK_POINTS] = np.square(self.closestDistances(np.array(pointArray[start:start + BLOCK_POINTS], dtype=np.float64)))
+		return squaredDistances
+
+	def directedDistance(self, source, transform=None, bound=None) -> float:
+		"""
+		Gets the directed Hausdorff distance from a source to this target, streaming the source through the tiles. With
+		a bound, the stream stops after the first block with a point beyond it.
+
+		Args:
+			source (PreparedTarget): Source to measure from.
+			transform (vtkLinearTransform): Optional transform to apply to the source points before measuring.
+			bound (float): Distance beyond which the exact value is not needed.
+
+		Returns:
+			float: Directed Hausdorff distance from source to target.
+		"""
+		matrix = None if transform is None else transformMatrix(transform)
+		maxDistance = 0.0
+		for _, _, distances in self.queryBlocks(source, matrix):
+			if len(distances) > 0:
+				maxDistance = max(maxDistance, float(distances.max()))
+			if bound is not None and maxDistance > bound:
+				break
+		return maxDistance
+
+	def sourceDistances(self, source, transform=None) -> np.ndarray:
+		"""
+		Gets the distance from every point of a source to this target, in the order of the source's points, without
+		keeping the transformed points.
+
+		Args:
+			source (PreparedTarget): Source to measure from.
+			transform (vtkLinearTransform): Optional transform to apply to the source points before measuring.
+
+		Returns:
+			numpy.ndarray: Closest point distance of each source point, shape (n,).
+		"""
+		distances = np.empty(source.polyData.GetNumberOfPoints())
+		for indices, _, blockDistances in self.queryBlocks(source, None if transform is None else transformMatrix(transform)):
+			distances[indices] = blockDistances
+		return distances
+
+	def directedDistances(self, source, transform=None) -> tuple[np.ndarray, np.ndarray]:
+		"""
+		Gets the distance from every point of a source to this target, and the (transformed) source points. The points
+		are a full size array, distanceField does not need them.
+
+		Args:
+			source (PreparedTarget): Source to measure from.
+			transform (vtkLinearTransform): Optional transform to apply to the source points before measuring.
+
+		Returns:
+			tuple[numpy.ndarray, numpy.ndarray]: Closest point distance of each source point, shape (n,), and the
+				(transformed) source points they were measured from, shape (n, 3).
+		"""
+		distances = np.empty(source.polyData.GetNumberOfPoints())
+		points = np.empty((len(distances), 3))
+		for indices, blockPoints, blockDistances in self.queryBlocks(source, None if transform is None else transformMatrix(transform)):
+			distances[indices] = blockDistances
+			points[indices] = blockPoints
+		return distances, points
+
+	def distanceField(self, source, transform=None) -> DistanceField:
+		"""
+		Measures the distances in both directions and their statistics, see PreparedTarget.distanceField. Only the worst
+		source point is transformed to report it, the transformed source is never held in memory.
+
+		Args:
+			source (PreparedTarget): Source to compare against.
+			transform (vtkLinearTransform): Optional similarity transform to apply to the source.
+
+		Returns:
+			DistanceField: The distances in both directions and their statistics.
+		"""
+		sourcePoints = vtk_to_numpy(source.polyData.GetPoints().GetData())
+		targetPoints = vtk_to_numpy(self.polyData.GetPoints().GetData())
+		sourceDistances = self.sourceDistances(source, transform)
+		sourceStats = distanceStats(sourceDistances, sourcePoints)
+		if transform is None:
+			targetDistances = source.sourceDistances(self) if isinstance(source, TiledTarget) else source.directedDistances(self)[0]
+		else:
+			inverseTransform, scale = inverseSimilarity(transform)
+			targetDistances = source.sourceDistances(self, inverseTransform) if isinstance(source, TiledTarget) else source.directedDistances(self, inverseTransform)[0]
+			targetDistances *= scale
+			if sourceStats.worstPoint is not None:
+				worstPoint = transformPoints(np.array([sourceStats.worstPoint]), transformMatrix(transform))[0]
+				sourceStats = sourceStats._replace(worstPoint=tuple(float(coordinate) for coordinate in worstPoint))
+		return DistanceField(sourceDistances, targetDistances, sourceStats, distanceStats(targetDistances, targetPoints))
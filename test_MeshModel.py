@@ -1,5 +1,16 @@
 import math
-from mesh_model import MeshModel
+import os
+from mesh_model import MeshModel, COMPARISON_STAGES
+from mesh_results import ComparisonCache
+from mesh_distance import DISTANCE_ARRAY
+from mesh_alignment import orientedBox
+from vtkmodules.util.numpy_support import vtk_to_numpy
+from vtkmodules.vtkCommonDataModel import vtkPolyData
+from vtkmodules.vtkCommonTransforms import vtkTransform
+from vtkmodules.vtkFiltersCore import vtkMassProperties
+from vtkmodules.vtkFiltersGeneral import vtkTransformPolyDataFilter
+from vtkmodules.vtkFiltersSources import vtkSphereSource
+import numpy as np
 import pytest
 
 # Test cases: int radius, float radius, zero radius, negative radius
@@ -102,6 +113,35 @@ def test_coneScaling(radius, height, scalar, threshold):
 	
 	assert theoretical_volume * (1 - (threshold/100)) <= mesh.getVolume() <= theoretical_volume * (1 + (threshold/100))
 
+# Test cases: repeated scaling up and down, scaling that does not cancel out
+@pytest.mark.parametrize("scalars", [
+    [2, 0.5, 3, 1/3, 1.1, 0.9],
+	[1.3] * 50,
+])
+def test_scaleChain(scalars):
+	"""
+    Applies a long chain of scale operations and checks the pipeline does not grow, the cumulative scale is applied,
+    and resetting returns exactly the original points.
+
+    Args:
+        scalars (list[double]): Scales to apply in order.
+    """
+	mesh = MeshModel()
+	mesh.setSphereSource(radius=1)
+	originalPoints = mesh.vtkSource.GetOutput().GetPoints()
+	originalVolume = mesh.getVolume()
+
+	totalScale = 1
+	for scalar in scalars:
+		mesh.scaleMesh(scalar)
+		totalScale *= scalar
+		assert mesh.vtkSource is mesh.baseSource or mesh.vtkSource.GetInputAlgorithm() is mesh.baseSource
+
+	assert math.isclose(mesh.getVolume(), originalVolume * totalScale**3, rel_tol=1e-6)
+
+	mesh.resetScale()
+	assert mesh.vtkSource.GetOutput().GetPoints() is originalPoints
+
 # Test cases: same file, cone missing a piece, same shape but rotated, same shape different file type, different shapes, same shape but scaled
 @pytest.mark.parametrize("sourceMesh, targetMesh, threshold, expectedResult", [
     ('resources/cone.stl', 'resources/cone.stl', 0.01, True),
@@ -123,6 +163,251 @@ def meshComparisonTest(sourceMesh, targetMesh, threshold, expectedResult):
 	result  = MeshModel.compareMeshes(sourceMesh, targetMesh, threshold)[0]
 	assert result == expectedResult
 
+@pytest.mark.parametrize("meshPath", [
+    'resources/cone.stl',
+	'resources/M5-Nut.stl',
+])
+def test_propertiesScaleAnalytically(meshPath, monkeypatch):
+	"""
+    Checks the cached properties of a scaled mesh match those measured on the scaled mesh itself, and that scaling does
+    not measure the mesh again.
+
+    Args:
+        meshPath (str): Filepath of the mesh to load.
+    """
+	mesh = MeshModel()
+	mesh.loadMesh(os.path.abspath(meshPath))
+	computed = []
+	computeMassProperties = MeshModel.computeMassProperties
+	monkeypatch.setattr(MeshModel, "computeMassProperties", lambda polyData: computed.append(True) or computeMassProperties(polyData))
+
+	mesh.getVolume()
+	for scalar in [2, 0.25, 3]:
+		mesh.scaleMesh(scalar)
+		polyData = mesh.vtkSource.GetOutput()
+		mass = vtkMassProperties()
+		mass.SetInputData(polyData)
+		mass.Update()
+		assert mesh.getVolume() == pytest.approx(mass.GetVolume(), rel=1e-6)
+		assert mesh.getSurfaceArea() == pytest.approx(mass.GetSurfaceArea(), rel=1e-6)
+		assert mesh.getBounds() == pytest.approx(polyData.GetBounds(), rel=1e-6, abs=1e-9)
+		assert mesh.getCentroid() == pytest.approx(np.mean(np.array([polyData.GetPoint(i) for i in range(polyData.GetNumberOfPoints())]), axis=0), rel=1e-6, abs=1e-9)
+		# Axes with near equal extents (the nut's hexagon, the cone's base) may be picked differently within their plane
+		box = orientedBox(polyData)
+		assert np.allclose(mesh.getOrientedBox().center, box.center, rtol=1e-5, atol=1e-5)
+		assert np.allclose(np.linalg.norm(mesh.getOrientedBox().axes, axis=1), np.linalg.norm(box.axes, axis=1), rtol=1e-4)
+	assert len(computed) == 1
+
+def test_propertiesInvalidated():
+	"""
+    Checks cached properties are recomputed when the base source changes, and are empty for an empty mesh.
+    """
+	mesh = MeshModel()
+	assert mesh.getVolume() == 0.0 and mesh.getSurfaceArea() == 0.0
+	assert mesh.getBounds() is None and mesh.getCentroid() is None and mesh.getOrientedBox() is None
+
+	sphereSource = vtkSphereSource()
+	sphereSource.SetRadius(1)
+	mesh.setSource(sphereSource)
+	volume = mesh.getVolume()
+	bounds = mesh.getBounds()
+
+	sphereSource.SetRadius(2)															# Modifies the base source in place
+	sphereSource.Update()
+	assert mesh.getVolume() == pytest.approx(8 * volume)
+	assert mesh.getBounds() == pytest.approx([2 * bound for bound in bounds])
+
+	mesh.setConeSource(1, 3)
+	assert mesh.getVolume() == pytest.approx(getConeVolume(1, 3), rel=1e-2)
+
+@pytest.mark.parametrize("multiresolution", [False, True])
+def test_compareProgress(multiresolution):
+	"""
+    Checks every stage is reported once, in order and with the distance that is finally returned, both when the
+    comparison runs and when it is answered from the result cache.
+
+    Args:
+        multiresolution (bool): Whether to compare coarse to fine.
+    """
+	source = MeshModel()
+	source.loadMesh(os.path.abspath('resources/cone-cut.stl'))
+	target = MeshModel()
+	target.loadMesh(os.path.abspath('resources/cone-cut-rotated.stl'))
+	resultCache = ComparisonCache()
+
+	for _ in range(2):
+		reports = []
+		result = MeshModel.compareMeshes(source, target, 0.01, resultCache=resultCache, multiresolution=multiresolution, progress=lambda *report: reports.append(report))
+		assert [stage for stage, _, _ in reports] == list(COMPARISON_STAGES)
+		assert [distance for _, distance, _ in reports] == list(result[2:])
+		assert reports[0][2] is source.vtkSource.GetOutput()
+	assert resultCache.hits == 1
+
+@pytest.mark.parametrize("polls", [1, 2, 3])
+def test_compareCancelled(polls):
+	"""
+    Cancels a comparison at its first, second and third cancellation check (after the unaligned stage, after the
+    bounding box stage and before the first ICP step) and checks it stops without caching anything.
+
+    Args:
+        polls (int): Number of the check at which the comparison is cancelled.
+    """
+	source = MeshModel()
+	source.loadMesh(os.path.abspath('resources/cone-cut.stl'))
+	target = MeshModel()
+	target.loadMesh(os.path.abspath('resources/cone-cut-rotated.stl'))
+	resultCache = ComparisonCache()
+
+	checks = []
+	def cancelled():
+		checks.append(True)
+		return len(checks) >= polls
+
+	reports = []
+	result = MeshModel.compareMeshes(source, target, 0.01, resultCache=resultCache, progress=lambda *report: reports.append(report), cancelled=cancelled)
+	assert result == (False, None, None, None, None)
+	assert len(checks) == polls
+	assert len(reports) == min(polls, 2)
+	assert len(resultCache) == 0
+
+def test_steppedAlignment():
+	"""
+    Checks ICP run a few iterations at a time, as it is when it can be cancelled, reaches the same alignment as a
+    single uninterrupted run.
+    """
+	source = MeshModel()
+	source.loadMesh(os.path.abspath('resources/cone-cut.stl'))
+	target = MeshModel()
+	target.loadMesh(os.path.abspath('resources/cone-cut-rotated.stl'))
+	sourcePolyData = source.vtkSource.GetOutput()
+	targetPolyData = target.vtkSource.GetOutput()
+	locator = target.getPreparedTarget().getCellLocator()
+
+	uninterrupted = MeshModel.alignClosestPoints(sourcePolyData, targetPolyData, locator).transform.GetMatrix()
+	stepped = MeshModel.alignClosestPoints(sourcePolyData, targetPolyData, locator, cancelled=lambda: False).transform.GetMatrix()
+	for row in range(4):
+		for column in range(4):
+			assert stepped.GetElement(row, column) == pytest.approx(uninterrupted.GetElement(row, column), abs=1e-3)
+
+	assert MeshModel.alignClosestPoints(sourcePolyData, targetPolyData, locator, cancelled=lambda: True) is None
+
+def test_lazyComparison():
+	"""
+    Checks a lazy comparison gives the same distances as the default one, and that the aligned source built from its
+    transform on request is the best alignment.
+    """
+	source = MeshModel()
+	source.loadMesh(os.path.abspath('resources/cone-cut.stl'))
+	target = MeshModel()
+	target.loadMesh(os.path.abspath('resources/cone-cut-rotated.stl'))
+
+	result, alignedSource, *distances = MeshModel.compareMeshes(source, target, 0.01, resultCache=None)
+	comparison = MeshModel.compareMeshesLazy(source, target, 0.01, resultCache=None)
+	assert comparison.result == result
+	assert [comparison.noAlignmentHausDist, comparison.obbAlignmentHausDist, comparison.icpHausDist] == distances
+	assert len(comparison.alignedMatrix) == 16
+	assert comparison.sourcePolyData is source.vtkSource.GetOutput()
+
+	built = comparison.alignedSource()
+	assert np.allclose(vtk_to_numpy(built.GetPoints().GetData()), vtk_to_numpy(alignedSource.GetPoints().GetData()), atol=1e-5)
+	assert comparison.unpack()[2:] == tuple(distances)
+	assert MeshModel.compareMeshesLazy(MeshModel(), target, 0.01) is None
+	assert MeshModel.compareMeshes(MeshModel(), target, 0.01) == (False, None, None, None, None)
+
+@pytest.mark.parametrize("multiresolution", [False, True])
+def test_comparisonDistances(multiresolution):
+	"""
+    Checks a comparison can return the per point distances of its best alignment, consistent with its distances, and
+    attach them to the aligned source as point scalars without touching the source's own output. A repeated comparison
+    answered from the cache measures them too.
+
+    Args:
+        multiresolution (bool): Whether to compare coarse to fine.
+    """
+	source = MeshModel()
+	source.loadMesh(os.path.abspath('resources/cone-cut.stl'))
+	target = MeshModel()
+	target.loadMesh(os.path.abspath('resources/cone-cut-rotated.stl'))
+	resultCache = ComparisonCache()
+
+	for _ in range(2):
+		comparison = MeshModel.compareMeshesLazy(source, target, 0.01, resultCache=resultCache, multiresolution=multiresolution, distances=True)
+		field = comparison.distanceField
+		assert len(field.sourceDistances) == source.vtkSource.GetOutput().GetNumberOfPoints()
+		assert len(field.targetDistances) == target.vtkSource.GetOutput().GetNumberOfPoints()
+		assert field.hausdorffDistance() == pytest.approx(min(comparison[1:4]), abs=1e-6)
+
+		alignedSource = comparison.alignedSource()
+		assert alignedSource.GetPointData().GetScalars().GetName() == DISTANCE_ARRAY
+		assert np.array_equal(vtk_to_numpy(alignedSource.GetPointData().GetScalars()), field.sourceDistances)
+		assert source.vtkSource.GetOutput().GetPointData().GetScalars() is None
+	assert resultCache.hits == 1
+
+	result, alignedSource, *_ = MeshModel.compareMeshes(source, target, 0.01, resultCache=None, distances=True)
+	assert result and alignedSource.GetPointData().GetArray(DISTANCE_ARRAY) is not None
+
+def test_meshViews():
+	"""
+    Checks the points, faces and normals of a mesh are read only views of its VTK arrays rather than copies.
+    """
+	mesh = MeshModel()
+	mesh.setConeSource(radius=1, height=2)
+	polyData = mesh.vtkSource.GetOutput()
+	points = mesh.getPoints()
+
+	assert np.shares_memory(points, vtk_to_numpy(polyData.GetPoints().GetData()))
+	assert not points.flags.writeable
+	assert mesh.getFaces() is None												# The cone's base is a single polygon among triangles
+
+	mesh.loadMesh(os.path.abspath('resources/cone-cut.stl'))
+	faces = mesh.getFaces()
+	normals = mesh.getNormals()
+	assert faces.shape == (mesh.vtkSource.GetOutput().GetNumberOfPolys(), 3)
+	assert normals.shape == mesh.getPoints().shape
+	assert np.allclose(np.linalg.norm(normals, axis=1), 1)
+
+	mesh.scaleMesh(2)
+	assert np.allclose(mesh.getPoints(), 2 * vtk_to_numpy(mesh.baseSource.GetOutput().GetPoints().GetData()))
+	assert mesh.getNormals() is normals
+
+	assert MeshModel().getPoints() is None and MeshModel().getNormals() is None
+
+def test_applyTransform():
+	"""
+    Checks a transformed copy matches vtkTransformPolyDataFilter, shares the cells of the original instead of copying
+    them, and can write into a preallocated buffer. Transforming in place gives the same points.
+    """
+	mesh = MeshModel()
+	mesh.setSphereSource(radius=1)
+	polyData = mesh.vtkSource.GetOutput()
+	transform = vtkTransform()
+	transform.RotateWXYZ(30, 1, 2, 3)
+	transform.Translate(1, -2, 0.5)
+	transform.Scale(2, 2, 2)
+	transformFilter = vtkTransformPolyDataFilter()
+	transformFilter.SetInputData(polyData)
+	transformFilter.SetTransform(transform)
+	transformFilter.Update()
+	expected = transformFilter.GetOutput()
+
+	transformed = MeshModel.applyTransform(polyData, transform)
+	transformedPoints = vtk_to_numpy(transformed.GetPoints().GetData())
+	assert np.allclose(transformedPoints, vtk_to_numpy(expected.GetPoints().GetData()), atol=1e-6)
+	assert np.allclose(vtk_to_numpy(transformed.GetPointData().GetNormals()), vtk_to_numpy(expected.GetPointData().GetNormals()), atol=1e-6)
+	assert transformed.GetPolys() is polyData.GetPolys()
+
+	buffer = np.empty_like(transformedPoints)
+	reused = MeshModel.applyTransform(polyData, transform, buffer)
+	assert np.shares_memory(vtk_to_numpy(reused.GetPoints().GetData()), buffer)
+	assert np.array_equal(buffer, transformedPoints)
+
+	inPlace = vtkPolyData()
+	inPlace.DeepCopy(polyData)
+	mTime = inPlace.GetMTime()
+	MeshModel.transformInPlace(inPlace, transform)
+	assert np.array_equal(vtk_to_numpy(inPlace.GetPoints().GetData()), transformedPoints)
+	assert inPlace.GetMTime() > mTime
+
 def getConeVolume(radius, height) -> float:
 	return math.pi*math.pow(radius, 2)*(height / 3)
 
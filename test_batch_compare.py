@@ -0,0 +1,87 @@
+from batch_compare import BatchStats, collectMeshPaths, compareBatch, comparePair
+from mesh_model import MeshModel
+import pytest
+
+def test_collectMeshPaths():
+	"""
+    Checks that directories are expanded to the supported meshes they contain and files are passed through.
+    """
+	paths = collectMeshPaths(['resources', 'resources/cone.stl'])
+	names = [path.split('/')[-1] for path in paths]
+
+	assert 'cone.ply' in names
+	assert 'sphere.stl' in names
+	assert names.count('cone.stl') == 2
+
+# Test cases: identical pair, rotated pair, different shapes, missing file
+@pytest.mark.parametrize("sourceMesh, targetMesh, threshold, expectedResult, expectError", [
+    ('resources/cone.stl', 'resources/cone.stl', 0.01, True, False),
+	('resources/cone-cut.stl', 'resources/cone-cut-rotated.stl', 0.01, True, False),
+	('resources/cone.stl', 'resources/sphere.stl', 0.01, False, False),
+	('resources/cone.stl', 'resources/missing.stl', 0.01, False, True),
+])
+def test_compareBatchPair(sourceMesh, targetMesh, threshold, expectedResult, expectError):
+	"""
+    Runs a single pair through the worker pool and checks the outcome matches the expected result.
+
+    Args:
+        sourceMesh (str): Source mesh filepath.
+        targetMesh (str): Target mesh filepath.
+        threshold (double): Comparison's distance threshold for sameness.
+        expectedResult (bool): Expected result of the comparison.
+        expectError (bool): Whether the pair is expected to fail to load.
+    """
+	results = list(compareBatch([sourceMesh], [targetMesh], threshold, workers=1))
+
+	assert len(results) == 1
+	assert results[0].result == expectedResult
+	assert (results[0].error is not None) == expectError
+
+def test_compareBatchThroughput():
+	"""
+    Compares several sources against several targets and checks every pair is streamed back and counted.
+    """
+	sources = ['resources/cone.stl', 'resources/cone-cut.stl']
+	targets = ['resources/cone.ply', 'resources/cone-cut-rotated.stl', 'resources/cone-scaled2x.stl']
+	stats = BatchStats(0)
+	results = list(compareBatch(sources, targets, 0.01, workers=2, stats=stats))
+
+	assert len(results) == 6
+	assert stats.total == 6 and stats.completed == 6 and stats.failed == 0
+	assert stats.throughput() > 0
+	assert sum(result.result for result in results) == 2
+
+def test_compareBatchBadMesh(tmp_path):
+	"""
+    Puts an empty and a truncated mesh in a batch next to a valid pair and checks they are reported as failed while the
+    valid pair still completes.
+    """
+	emptyPath = str(tmp_path / "empty.stl")
+	with open(emptyPath, "wb") as emptyFile:
+		emptyFile.write(b" " * 80 + (0).to_bytes(4, "little"))			# Binary STL header with no triangles
+	truncatedPath = str(tmp_path / "truncated.stl")
+	with open('resources/cone-cut.stl', "rb") as meshFile:
+		contents = meshFile.read()
+	with open(truncatedPath, "wb") as truncatedFile:
+		truncatedFile.write(contents[:100])
+	stats = BatchStats(0)
+	results = list(compareBatch([emptyPath, truncatedPath, 'resources/cone.stl'], ['resources/cone.stl'], 0.01, workers=1, stats=stats))
+
+	assert len(results) == 3 and stats.completed == 3
+	byName = {result.source.split('/')[-1]: result for result in results}
+	assert byName['cone.stl'].result and byName['cone.stl'].error is None
+	for name in ('empty.stl', 'truncated.stl'):
+		assert byName[name].error is not None and not byName[name].result
+	assert stats.failed == 2
+
+def test_comparePairError(monkeypatch):
+	"""
+    Checks an exception raised while comparing a pair is returned as the pair's error instead of propagating.
+    """
+	def failingCompare(*args, **kwargs):
+		raise RuntimeError("broken mesh")
+	monkeypatch.setattr(MeshModel, "compareMeshesLazy", failingCompare)
+
+	pairResult = comparePair('resources/cone.stl', 'resources/cone-cut.stl', 0.01)
+	assert not pairResult.result
+	assert pairResult.error == "RuntimeError: broken mesh"
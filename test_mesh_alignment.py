@@ -0,0 +1,77 @@
+import numpy as np
+from mesh_model import MeshModel
+from mesh_alignment import BOX_SYMMETRIES, TRANSFORM_CHUNK, OrientationSearch, orientedBox, transformNormals, transformPoints
+import pytest
+
+def test_boxSymmetries():
+	"""
+    Checks the enumerated box symmetries are the 48 distinct signed permutations, half of them proper rotations.
+    """
+	determinants = [round(np.linalg.det(symmetry)) for symmetry in BOX_SYMMETRIES]
+
+	assert len({symmetry.tobytes() for symmetry in BOX_SYMMETRIES}) == 48
+	assert determinants.count(1) == 24 and determinants.count(-1) == 24
+
+# Test cases: same shape but rotated, same shape different file type, different shapes
+@pytest.mark.parametrize("sourceMesh, targetMesh, maxDistance", [
+	('resources/cone-cut.stl', 'resources/cone-cut-rotated.stl', 0.01),
+	('resources/cone.stl', 'resources/cone.ply', 0.2),
+	('resources/M5-Screw.stl', 'resources/M5-Nut.stl', None),
+])
+def test_orientationSearch(sourceMesh, targetMesh, maxDistance):
+	"""
+    Runs the orientation search and checks the ranking, the per candidate report and the chosen orientation.
+
+    Args:
+        sourceMesh (str): Source mesh filepath.
+        targetMesh (str): Target mesh filepath.
+        maxDistance (double): Largest acceptable Hausdorff distance after alignment, None to skip the check.
+    """
+	source = MeshModel()
+	source.loadMesh(sourceMesh)
+	target = MeshModel()
+	target.loadMesh(targetMesh)
+
+	search = OrientationSearch(topK=4, workers=2)
+	best = search.run(source.getPreparedTarget(), target.getPreparedTarget())
+	evaluated = [candidate for candidate in search.candidates if candidate.distance is not None]
+
+	assert len(search.candidates) == 24
+	assert 4 <= len(evaluated) <= 24
+	assert all(candidate.seconds > 0 for candidate in evaluated)
+	assert best.distance == min(candidate.distance for candidate in evaluated)
+	assert best.distance == pytest.approx(target.getPreparedTarget().hausdorffDistance(source.getPreparedTarget(), best.transform))
+	if maxDistance is not None:
+		assert best.distance < maxDistance
+
+def test_orientedBox():
+	"""
+    Checks the oriented box of an axis aligned cone matches its known extents.
+    """
+	mesh = MeshModel()
+	mesh.setConeSource(radius=1, height=4)
+	box = orientedBox(mesh.vtkSource.GetOutput())
+
+	assert np.allclose(box.center, [0, 0, 0], atol=1e-6)
+	assert np.linalg.norm(box.axes[0]) == pytest.approx(4, rel=1e-3)
+
+def test_transformPoints():
+	"""
+    Checks points spanning several chunks are transformed the same into a new array and in place, and that normals
+    stay unit length and perpendicular to transformed surface directions under a non uniform scale.
+    """
+	rng = np.random.default_rng(0)
+	points = rng.random((2 * TRANSFORM_CHUNK + 7, 3)).astype(np.float32)
+	matrix = np.diag([2.0, 3.0, 0.5, 1.0])
+	matrix[:3, 3] = (1, -1, 4)
+
+	transformed = transformPoints(points, matrix)
+	assert transformed.dtype == np.float32
+	assert np.allclose(transformed, points * (2, 3, 0.5) + (1, -1, 4))
+	assert transformPoints(points, matrix, points) is points
+	assert np.array_equal(points, transformed)
+
+	tangent, normal = np.array([[1.0, -1.0, 0.0]]), np.array([[1.0, 1.0, 0.0]]) / np.sqrt(2)
+	transformedNormal = transformNormals(normal, matrix)
+	assert np.linalg.norm(transformedNormal) == pytest.approx(1)
+	assert (tangent @ matrix[:3, :3].T) @ transformedNormal.T == pytest.approx(0)
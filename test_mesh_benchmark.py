@@ -0,0 +1,75 @@
+from mesh_benchmark import BenchmarkResult, benchmarkCase, benchmarkImports, findRegressions, loadBaseline, resourceCases, saveBaseline, scalingCurves, syntheticCases
+from mesh_model import COMPARISON_STAGES
+import subprocess
+import sys
+import pytest
+
+def test_benchmarkCase(tmp_path):
+	"""
+    Runs one round of every operation on a small sphere and a resource mesh, and checks each operation is timed.
+    """
+	cases = syntheticCases([8], []) + resourceCases(['resources/cone.stl'])
+	for case in cases:
+		results = benchmarkCase(case, 1, str(tmp_path))
+		operations = {result.operation for result in results}
+		assert {"saveMesh.stl", "saveMesh.ply", "scaleMesh", "getVolume", "alignBoundingBoxes", "compareMeshes.total"} <= operations
+		assert {"compareMeshes." + stage for stage in COMPARISON_STAGES} <= operations
+		assert ("loadMesh" in operations) == (case.filepath is not None)
+		assert all(len(result.times) == 1 and result.times[0] >= 0 for result in results)
+		assert all(result.points == case.polyData.GetNumberOfPoints() for result in results)
+		times = {result.operation: result.times[0] for result in results}
+		assert 0 < sum(times["compareMeshes." + stage] for stage in COMPARISON_STAGES) <= times["compareMeshes.total"]
+
+def test_baselineRegressions(tmp_path):
+	"""
+    Saves a baseline and checks only operations that slowed down beyond the tolerance are reported as regressions.
+    """
+	baselineResults = [
+		BenchmarkResult("sphere-8", "sphere", "getVolume", 100, 200, [0.010, 0.012, 0.011]),
+		BenchmarkResult("sphere-16", "sphere", "getVolume", 400, 800, [0.040, 0.044]),
+		BenchmarkResult("sphere-8", "sphere", "scaleMesh", 100, 200, [0.0001]),
+	]
+	baselinePath = str(tmp_path / "baseline.json")
+	saveBaseline(baselineResults, baselinePath, 3)
+	baseline = loadBaseline(baselinePath)
+	assert baseline[("sphere-8", "getVolume")] == 0.011
+
+	currentResults = [
+		BenchmarkResult("sphere-8", "sphere", "getVolume", 100, 200, [0.012]),		# Within tolerance
+		BenchmarkResult("sphere-16", "sphere", "getVolume", 400, 800, [0.084]),		# Twice as slow
+		BenchmarkResult("sphere-8", "sphere", "scaleMesh", 100, 200, [0.0003]),		# Slower, but below the noise floor
+		BenchmarkResult("sphere-32", "sphere", "getVolume", 1600, 3200, [1.0]),		# Not in the baseline
+	]
+	regressions = findRegressions(currentResults, baseline, 0.25)
+	assert [(case, operation) for case, operation, _, _ in regressions] == [("sphere-16", "getVolume")]
+	assert regressions[0][2:] == pytest.approx((0.042, 0.084))
+
+def test_scalingCurves():
+	"""
+    Checks the fitted exponent of an operation whose time grows linearly and one whose time is constant.
+    """
+	results = [BenchmarkResult("sphere-{}".format(points), "sphere", "linear", points, points, [points * 1e-6]) for points in (100, 1000, 10000)]
+	results += [BenchmarkResult("sphere-{}".format(points), "sphere", "constant", points, points, [1e-3]) for points in (100, 1000, 10000)]
+	results.append(BenchmarkResult("cone.stl", "resource", "linear", 25, 46, [1.0]))
+	exponents = {curve["operation"]: curve["exponent"] for curve in scalingCurves(results)}
+	assert abs(exponents["linear"] - 1) < 1e-6
+	assert abs(exponents["constant"]) < 1e-6
+
+def test_benchmarkImports():
+	"""
+    Times importing the model in a fresh interpreter and checks it is reported under its own family, without a curve.
+    """
+	results = benchmarkImports(['mesh_model'], 2)
+	assert [(result.case, result.operation) for result in results] == [("import", "import mesh_model")]
+	assert len(results[0].times) == 2 and all(seconds > 0 for seconds in results[0].times)
+	assert scalingCurves(results) == []
+
+def test_importedModules():
+	"""
+    Imports the model and loads a binary STL in a fresh interpreter, and checks none of the heavy modules a batch worker
+    does not need were loaded: the GUI, VTK's rendering and IO modules, and SciPy.
+    """
+	script = "import sys, mesh_model; mesh_model.MeshModel().loadMesh('resources/cone.stl'); print(' '.join(sys.modules))"
+	modules = set(subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout.split())
+	assert 'mesh_model' in modules
+	assert not {'vtk', 'PyQt5', 'scipy', 'vtkmodules.vtkRenderingCore', 'vtkmodules.vtkIOGeometry', 'vtkmodules.vtkIOPLY'} & modules
@@ -0,0 +1,113 @@
+from mesh_cache import MeshCache
+from mesh_model import MeshModel
+from vtkmodules.util.numpy_support import numpy_to_vtk, vtk_to_numpy
+from vtkmodules.vtkCommonDataModel import vtkPolyData
+import numpy as np
+import os
+import shutil
+import pytest
+
+@pytest.mark.parametrize("meshPath", [
+    'resources/cone.stl',
+	'resources/cone.ply',
+	'resources/M5-Nut.stl',
+])
+def test_cacheRoundTrip(meshPath, tmp_path):
+	"""
+    Loads a mesh twice through the cache and checks the cached copy has the same geometry as the parsed one.
+
+    Args:
+        meshPath (str): Filepath of the mesh to load.
+        tmp_path (pathlib.Path): Temporary directory for the cache.
+    """
+	cache = MeshCache(str(tmp_path))
+	parsedMesh = MeshModel()
+	cachedMesh = MeshModel()
+
+	assert parsedMesh.loadMesh(os.path.abspath(meshPath), cache)
+	assert cachedMesh.loadMesh(os.path.abspath(meshPath), cache)
+	assert cache.misses == 1 and cache.hits == 1
+
+	parsedPolyData = parsedMesh.vtkSource.GetOutput()
+	cachedPolyData = cachedMesh.vtkSource.GetOutput()
+	assert cachedPolyData.GetNumberOfCells() == parsedPolyData.GetNumberOfCells()
+	assert np.array_equal(vtk_to_numpy(cachedPolyData.GetPoints().GetData()), vtk_to_numpy(parsedPolyData.GetPoints().GetData()))
+	assert np.array_equal(vtk_to_numpy(cachedPolyData.GetPolys().GetConnectivityArray()), vtk_to_numpy(parsedPolyData.GetPolys().GetConnectivityArray()))
+	assert cachedMesh.getVolume() == pytest.approx(parsedMesh.getVolume())
+
+	# A cached mesh must still behave like any other source
+	cachedMesh.scaleMesh(2)
+	assert cachedMesh.getVolume() == pytest.approx(8 * parsedMesh.getVolume())
+
+def test_cacheKeyFollowsContents(tmp_path):
+	"""
+    Checks that entries are keyed by file contents: a copy of a file hits the same entry, and rewriting a file
+    invalidates it.
+    """
+	cache = MeshCache(str(tmp_path / "cache"))
+	meshPath = str(tmp_path / "mesh.stl")
+	shutil.copyfile('resources/cone.stl', meshPath)
+	copyPath = str(tmp_path / "copy.stl")
+	shutil.copyfile('resources/cone.stl', copyPath)
+
+	assert cache.fileKey(meshPath) == cache.fileKey(copyPath)
+	assert MeshModel().loadMesh(meshPath, cache)
+	assert MeshModel().loadMesh(copyPath, cache)
+	assert cache.hits == 1
+
+	shutil.copyfile('resources/sphere.stl', meshPath)
+	os.utime(meshPath, ns=(0, 0))
+	assert cache.fileKey(meshPath) != cache.fileKey(copyPath)
+	assert cache.load(meshPath) is None
+
+def test_cacheEviction(tmp_path):
+	"""
+    Fills a cache past its size limit and checks the least recently used entry is the one evicted.
+    """
+	cache = MeshCache(str(tmp_path))
+	for meshPath in ['resources/sphere.stl', 'resources/cone.stl']:
+		assert MeshModel().loadMesh(os.path.abspath(meshPath), cache)
+	sphereEntry = os.path.join(cache.entriesDir, cache.fileKey('resources/sphere.stl'))
+	coneEntry = os.path.join(cache.entriesDir, cache.fileKey('resources/cone.stl'))
+	os.utime(sphereEntry, ns=(0, 0))										# Sphere is now the least recently used
+
+	cache.maxBytes = sum(entry.stat().st_size for entry in os.scandir(coneEntry))
+	cache.evict()
+	assert not os.path.isdir(sphereEntry)
+	assert os.path.isdir(coneEntry)
+	assert cache.load('resources/cone.stl') is not None
+
+def test_cacheActiveAttributes(tmp_path):
+	"""
+    Checks the arrays a reader marked as the active normals and scalars are active again on a cache hit.
+    """
+	cache = MeshCache(str(tmp_path))
+	mesh = MeshModel()
+	mesh.setSphereSource(radius=1)
+	polyData = vtkPolyData()
+	polyData.DeepCopy(mesh.vtkSource.GetOutput())
+	pointCount = polyData.GetNumberOfPoints()
+	scalars = numpy_to_vtk(np.arange(pointCount, dtype=np.float32))
+	scalars.SetName("Height")
+	polyData.GetPointData().SetScalars(scalars)
+	extra = numpy_to_vtk(np.zeros(pointCount, dtype=np.float32))
+	extra.SetName("Extra")
+	polyData.GetPointData().AddArray(extra)
+	cellScalars = numpy_to_vtk(np.arange(polyData.GetNumberOfCells(), dtype=np.int32))
+	cellScalars.SetName("Label")
+	polyData.GetCellData().SetScalars(cellScalars)
+
+	cache.store('resources/sphere.stl', polyData)
+	cachedPolyData = cache.load('resources/sphere.stl')
+	assert cachedPolyData.GetPointData().GetNormals().GetName() == polyData.GetPointData().GetNormals().GetName()
+	assert cachedPolyData.GetPointData().GetScalars().GetName() == "Height"
+	assert cachedPolyData.GetCellData().GetScalars().GetName() == "Label"
+	assert cachedPolyData.GetPointData().GetArray("Extra") is not None
+
+def test_cacheSkipsEmptyMesh(tmp_path):
+	"""
+    Checks a mesh without points, e.g. from a failed parse, is not cached instead of failing the load.
+    """
+	cache = MeshCache(str(tmp_path))
+	cache.store('resources/cone.stl', vtkPolyData())
+	assert cache.load('resources/cone.stl') is None
@@ -0,0 +1,120 @@
+from mesh_cli import expandInputs, outputPath, parseShard, selectShard
+import subprocess
+import json
+import os
+import sys
+
+def runCli(*args) -> tuple[int, list[dict]]:
+	"""
+    Runs the command line tool in a separate process.
+
+    Args:
+        *args (str): Arguments passed to mesh_cli.py.
+
+    Returns:
+        tuple[int, list[dict]]: The exit code and the JSON records printed to stdout.
+    """
+	completed = subprocess.run([sys.executable, 'mesh_cli.py', *args], capture_output=True, text=True)
+	return completed.returncode, [json.loads(line) for line in completed.stdout.splitlines()]
+
+def test_expandInputs():
+	"""
+    Checks globs, directories and files are expanded to a sorted list of unique meshes, skipping other files.
+    """
+	paths = expandInputs(['resources/cone*.stl', 'resources', 'resources/cone.stl', 'requirements.txt*'])
+	names = [os.path.basename(path) for path in paths]
+
+	assert paths == sorted(set(paths))
+	assert 'cone.ply' in names and 'sphere.stl' in names
+	assert names.count('cone.stl') == 1
+	assert 'requirements.txt' not in names
+
+def test_selectShard():
+	"""
+    Checks the shards of a job array cover every input exactly once.
+    """
+	paths = [str(index) for index in range(10)]
+	shards = [selectShard(paths, parseShard("{}/3".format(index))) for index in range(3)]
+
+	assert selectShard(paths, None) == paths
+	assert shards[0] == ['0', '3', '6', '9']
+	assert sorted(sum(shards, []), key=int) == paths
+
+def test_invalidShard():
+	"""
+    Checks a shard that does not exist or is malformed is a usage error, not an empty run or a traceback.
+    """
+	for shard in ('5/4', '4/4', '0/0', '1-4', '1/4/2', '-1/4', 'a/b'):
+		completed = subprocess.run([sys.executable, 'mesh_cli.py', 'stats', 'resources/cone.stl', '--shard', shard], capture_output=True, text=True)
+		assert completed.returncode == 2
+		assert '--shard' in completed.stderr and 'Traceback' not in completed.stderr
+		assert completed.stdout == ''
+
+def test_outputPath():
+	"""
+    Checks outputs are written next to the input unless an output directory is given.
+    """
+	assert outputPath('/data/part.STL', None, '-scaled', None) == '/data/part-scaled.stl'
+	assert outputPath('/data/part.stl', '/out', '', '.ply') == '/out/part.ply'
+
+def test_stats():
+	"""
+    Prints the properties of every cone and checks each line is a JSON record, and that a missing input is reported
+    as an error record and a failing exit code.
+    """
+	returnCode, records = runCli('stats', 'resources/cone*', 'resources/missing.stl')
+	byName = {os.path.basename(record["input"]): record for record in records}
+
+	assert returnCode == 1
+	assert byName['cone.stl']["points"] > 0 and byName['cone.stl']["volume"] > 0
+	assert len(byName['cone.stl']["bounds"]) == 6
+	assert "error" in byName['missing.stl']
+
+def test_scaleAndConvert(tmp_path):
+	"""
+    Scales a mesh, converts the result to another format and checks the volume of both outputs.
+    """
+	returnCode, records = runCli('scale', 'resources/cone.stl', '--factor', '2', '--output-dir', str(tmp_path))
+	assert returnCode == 0
+	scaledPath = records[0]["output"]
+	assert os.path.isfile(scaledPath)
+
+	returnCode, records = runCli('convert', scaledPath, '--format', '.ply')
+	assert returnCode == 0 and records[0]["output"].endswith('cone-scaled.ply')
+
+	_, original = runCli('stats', 'resources/cone.stl')
+	_, converted = runCli('stats', records[0]["output"])
+	assert abs(converted[0]["volume"] - 8 * original[0]["volume"]) < 1e-6 * converted[0]["volume"]
+
+def test_compare():
+	"""
+    Compares two meshes against a reference and checks one JSON record is printed per pair.
+    """
+	returnCode, records = runCli('compare', '--sources', 'resources/cone-cut.stl', 'resources/sphere.stl', '--targets', 'resources/cone-cut-rotated.stl', '--workers', '1')
+	byName = {os.path.basename(record["source"]): record for record in records}
+
+	assert returnCode == 0
+	assert byName['cone-cut.stl']["result"] is True
+	assert byName['sphere.stl']["result"] is False
+
+def test_noGui():
+	"""
+    Checks the command line tool runs without importing the GUI toolkit.
+    """
+	completed = subprocess.run([sys.executable, '-c', 'import sys, mesh_cli; print("PyQt5" in sys.modules)'], capture_output=True, text=True)
+	assert completed.stdout.strip() == 'False'
+
+def test_indexAndIdentify(tmp_path):
+	"""
+    Indexes the resource meshes, identifies a rotated mesh against the index, then removes its match.
+    """
+	libraryPath = str(tmp_path / "library.json")
+	returnCode, records = runCli('index', libraryPath, 'resources')
+	assert returnCode == 0 and len(records) == len(os.listdir('resources'))
+
+	returnCode, records = runCli('identify', libraryPath, 'resources/cone-cut.stl', '--candidates', '2')
+	assert returnCode == 0 and len(records[0]["candidates"]) == 2
+	assert os.path.basename(records[0]["match"]) in ('cone-cut.stl', 'cone-cut-rotated.stl')
+
+	returnCode, records = runCli('index', libraryPath, 'resources/cone-cut.stl', '--remove')
+	assert returnCode == 0 and records[0]["removed"]
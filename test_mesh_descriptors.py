@@ -0,0 +1,54 @@
+from mesh_descriptors import D2_BINS, ShapeDescriptor, shapeDescriptor
+from mesh_model import MeshModel
+from vtkmodules.vtkCommonTransforms import vtkTransform
+import numpy as np
+import os
+import pytest
+
+def test_rigidInvariance():
+	"""
+    Moves a mesh and checks its descriptor does not change.
+    """
+	mesh = MeshModel()
+	mesh.loadMesh(os.path.abspath('resources/M5-Screw.stl'))
+	transform = vtkTransform()
+	transform.RotateWXYZ(40, 1, 2, 3)
+	transform.Translate(5, -2, 7)
+	original = shapeDescriptor(mesh.vtkSource.GetOutput())
+	moved = shapeDescriptor(MeshModel.applyTransform(mesh.vtkSource.GetOutput(), transform))
+
+	assert moved.volume == pytest.approx(original.volume, rel=1e-6)
+	assert moved.area == pytest.approx(original.area, rel=1e-6)
+	assert moved.radii == pytest.approx(original.radii, rel=1e-6)
+	assert np.abs(moved.d2 - original.d2).sum() < 0.1
+
+def test_sphereDescriptor():
+	"""
+    Checks the measured sizes of a finely tessellated sphere against their closed forms, and that the histogram is a
+    distribution.
+    """
+	mesh = MeshModel()
+	mesh.setSphereSource(2, resolution=64)
+	descriptor = shapeDescriptor(mesh.vtkSource.GetOutput())
+
+	assert descriptor.volume == pytest.approx(4 / 3 * np.pi * 2**3, rel=1e-2)
+	assert descriptor.area == pytest.approx(4 * np.pi * 2**2, rel=1e-2)
+	assert descriptor.radii == pytest.approx([2 / np.sqrt(3)] * 3, rel=1e-2)	# Each axis of a sphere's surface has variance r^2 / 3
+	assert len(descriptor.d2) == D2_BINS and descriptor.d2.sum() == pytest.approx(1)
+
+def test_scaledDescriptor():
+	"""
+    Scales a mesh and checks the model's descriptor scales analytically to the measured one, and that the descriptor
+    survives conversion to a dict.
+    """
+	mesh = MeshModel()
+	mesh.setConeSource(3, 5)
+	mesh.scaleMesh(2)
+	scaled = mesh.getShapeDescriptor()
+	measured = shapeDescriptor(mesh.vtkSource.GetOutput())
+
+	assert scaled.volume == pytest.approx(measured.volume, rel=1e-9)
+	assert scaled.area == pytest.approx(measured.area, rel=1e-9)
+	assert scaled.radii == pytest.approx(measured.radii, rel=1e-9)
+	assert np.array_equal(ShapeDescriptor.fromDict(scaled.toDict()).vector(), scaled.vector())
+	assert MeshModel().getShapeDescriptor() is None
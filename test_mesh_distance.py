@@ -0,0 +1,200 @@
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from mesh_model import MeshModel
+from mesh_distance import DISTANCE_PERCENTILES, PreparedTarget, KDTreeTarget, distanceStats
+from vtkmodules.util.numpy_support import vtk_to_numpy
+import numpy as np
+from vtkmodules.vtkCommonTransforms import vtkTransform
+from vtkmodules.vtkFiltersGeneral import vtkTransformPolyDataFilter
+from vtkmodules.vtkFiltersModeling import vtkHausdorffDistancePointSetFilter
+import pytest
+
+def getFilterHausdorffDistance(source, target) -> float:
+	hausDistFilter = vtkHausdorffDistancePointSetFilter()
+	hausDistFilter.SetInputData(0, target)
+	hausDistFilter.SetInputData(1, source)
+	hausDistFilter.Update()
+	return hausDistFilter.GetOutput(0).GetFieldData().GetArray('HausdorffDistance').GetComponent(0, 0)
+
+# Test cases: identical meshes, nearby meshes, a scaled and rotated similarity transform
+@pytest.mark.parametrize("sourceMesh, targetMesh, scale, angle", [
+    ('resources/cone.stl', 'resources/cone.stl', 1, 0),
+    ('resources/cone-cut.stl', 'resources/cone.stl', 1, 0),
+	('resources/cone-cut.stl', 'resources/cone-cut-rotated.stl', 1.5, 30),
+])
+def test_hausdorffDistance(sourceMesh, targetMesh, scale, angle):
+	"""
+    Compares the prepared target's symmetric Hausdorff distance against vtkHausdorffDistancePointSetFilter run on an
+    explicitly transformed copy of the source.
+
+    Args:
+        sourceMesh (str): Source mesh filepath.
+        targetMesh (str): Target mesh filepath.
+        scale (double): Uniform scale of the transform applied to the source.
+        angle (double): Rotation (degrees) about the z axis of the transform applied to the source.
+    """
+	source = MeshModel()
+	source.loadMesh(sourceMesh)
+	target = MeshModel()
+	target.loadMesh(targetMesh)
+
+	transform = vtkTransform()
+	transform.RotateZ(angle)
+	transform.Scale(scale, scale, scale)
+	transformFilter = vtkTransformPolyDataFilter()
+	transformFilter.SetInputData(source.vtkSource.GetOutput())
+	transformFilter.SetTransform(transform)
+	transformFilter.Update()
+
+	expected = getFilterHausdorffDistance(transformFilter.GetOutput(), target.vtkSource.GetOutput())
+	actual = target.getPreparedTarget().hausdorffDistance(source.getPreparedTarget(), transform)
+
+	assert math.isclose(actual, expected, rel_tol=1e-5, abs_tol=1e-6)
+
+def test_preparedTargetCache():
+	"""
+    Checks the prepared target is reused until the mesh changes.
+    """
+	mesh = MeshModel()
+	mesh.setSphereSource(radius=1)
+	preparedTarget = mesh.getPreparedTarget()
+
+	assert mesh.getPreparedTarget() is preparedTarget
+
+	mesh.scaleMesh(2)
+	assert mesh.getPreparedTarget() is not preparedTarget
+	assert isinstance(mesh.getPreparedTarget(), PreparedTarget)
+
+def test_concurrentQueries():
+	"""
+    Checks queries from several threads at once agree with serial queries, without sharing a locator between them.
+    """
+	source = MeshModel()
+	source.loadMesh('resources/cone-cut.stl')
+	target = MeshModel()
+	target.loadMesh('resources/cone-cut-rotated.stl')
+	sourceIndex = source.getPreparedTarget()
+	targetIndex = target.getPreparedTarget()
+	transforms = []
+	for angle in range(0, 360, 45):
+		transform = vtkTransform()
+		transform.RotateZ(angle)
+		transforms.append(transform)
+
+	expected = [targetIndex.hausdorffDistance(sourceIndex, transform) for transform in transforms]
+	barrier = threading.Barrier(len(transforms))
+
+	def query(transform) -> float:
+		barrier.wait()
+		return targetIndex.hausdorffDistance(sourceIndex, transform)
+
+	with ThreadPoolExecutor(max_workers=len(transforms)) as executor:
+		actual = list(executor.map(query, transforms))
+
+	assert actual == expected
+	assert 1 <= len(targetIndex.queryIndices) <= len(transforms)
+
+# Test cases: identical meshes, nearby meshes, far apart meshes
+@pytest.mark.parametrize("sourceMesh, targetMesh", [
+    ('resources/cone.stl', 'resources/cone.stl'),
+    ('resources/cone-cut.stl', 'resources/cone.stl'),
+	('resources/M5-Screw.stl', 'resources/sphere.stl'),
+])
+def test_numpyBackend(sourceMesh, targetMesh):
+	"""
+    Checks the NumPy KD-tree backend agrees with the VTK backend when exact, and stops above the bound when bounded.
+
+    Args:
+        sourceMesh (str): Source mesh filepath.
+        targetMesh (str): Target mesh filepath.
+    """
+	source = MeshModel()
+	source.loadMesh(sourceMesh)
+	target = MeshModel()
+	target.loadMesh(targetMesh)
+
+	expected = target.getPreparedTarget("vtk").hausdorffDistance(source.getPreparedTarget("vtk"))
+	sourceIndex = source.getPreparedTarget("numpy")
+	targetIndex = target.getPreparedTarget("numpy")
+	assert isinstance(targetIndex, KDTreeTarget)
+	assert math.isclose(targetIndex.hausdorffDistance(sourceIndex), expected, rel_tol=1e-5, abs_tol=1e-6)
+
+	bound = 0.01
+	bounded = targetIndex.hausdorffDistance(sourceIndex, bound=bound)
+	if expected < bound:
+		assert math.isclose(bounded, expected, rel_tol=1e-5, abs_tol=1e-6)
+	else:
+		assert bound < bounded <= expected * (1 + 1e-5)
+
+# Test cases: same file, cone missing a piece, same shape but rotated, different shapes
+@pytest.mark.parametrize("sourceMesh, targetMesh, expectedResult", [
+    ('resources/cone.stl', 'resources/cone.stl', True),
+    ('resources/cone.stl', 'resources/cone-cut.stl', False),
+	('resources/cone-cut.stl', 'resources/cone-cut-rotated.stl', True),
+	('resources/cone.stl', 'resources/sphere.stl', False),
+])
+def test_compareMeshesEarlyExit(sourceMesh, targetMesh, expectedResult):
+	"""
+    Checks the NumPy backend with early exit reaches the same verdict as the exact comparison.
+
+    Args:
+        sourceMesh (str): Source mesh filepath.
+        targetMesh (str): Target mesh filepath.
+        expectedResult (bool): Expected result of the comparison.
+    """
+	source = MeshModel()
+	source.loadMesh(sourceMesh)
+	target = MeshModel()
+	target.loadMesh(targetMesh)
+
+	assert MeshModel.compareMeshes(source, target, 0.01)[0] == expectedResult
+	assert MeshModel.compareMeshes(source, target, 0.01, backend="numpy", exact=False)[0] == expectedResult
+
+@pytest.mark.parametrize("backend", ["vtk", "numpy", "tiled"])
+def test_distanceField(backend):
+	"""
+    Checks the per point distances in both directions match vtkHausdorffDistancePointSetFilter's point arrays, and that
+    the field's Hausdorff distance is the one hausdorffDistance reports.
+
+    Args:
+        backend (str): Distance backend.
+    """
+	source = MeshModel()
+	source.loadMesh('resources/cone-cut.stl')
+	target = MeshModel()
+	target.loadMesh('resources/cone.stl')
+	transform = vtkTransform()
+	transform.RotateZ(10)
+	transform.Scale(1.2, 1.2, 1.2)
+	transformFilter = vtkTransformPolyDataFilter()
+	transformFilter.SetInputData(source.vtkSource.GetOutput())
+	transformFilter.SetTransform(transform)
+	transformFilter.Update()
+	hausDistFilter = vtkHausdorffDistancePointSetFilter()
+	hausDistFilter.SetInputData(0, transformFilter.GetOutput())
+	hausDistFilter.SetInputData(1, target.vtkSource.GetOutput())
+	hausDistFilter.Update()
+
+	sourceIndex = source.getPreparedTarget(backend)
+	targetIndex = target.getPreparedTarget(backend)
+	field = targetIndex.distanceField(sourceIndex, transform)
+	assert np.allclose(field.sourceDistances, vtk_to_numpy(hausDistFilter.GetOutput(0).GetPointData().GetArray('Distance')), atol=1e-5)
+	assert np.allclose(field.targetDistances, vtk_to_numpy(hausDistFilter.GetOutput(1).GetPointData().GetArray('Distance')), atol=1e-5)
+	assert field.hausdorffDistance() == pytest.approx(targetIndex.hausdorffDistance(sourceIndex, transform), abs=1e-9)
+
+	stats = field.sourceStats
+	assert stats.maximum == field.sourceDistances[stats.worstIndex]
+	assert stats.worstPoint == pytest.approx(transform.TransformPoint(source.vtkSource.GetOutput().GetPoint(stats.worstIndex)), abs=1e-5)
+	assert stats.mean <= stats.rms <= stats.maximum
+
+def test_distanceStats():
+	"""
+    Checks the statistics of a known set of distances.
+    """
+	stats = distanceStats(np.array([3.0, 4.0, 0.0, 0.0]), np.arange(12.0).reshape(4, 3))
+
+	assert stats.maximum == 4.0 and stats.worstIndex == 1 and stats.worstPoint == (3.0, 4.0, 5.0)
+	assert stats.mean == pytest.approx(1.75) and stats.rms == pytest.approx(2.5)
+	assert len(stats.percentiles) == len(DISTANCE_PERCENTILES) and stats.percentiles[0] == pytest.approx(1.5)
+	assert distanceStats(np.zeros(0), np.zeros((0, 3))).worstPoint is None
@@ -0,0 +1,184 @@
+from mesh_icp import ICP_ITERATION_STEP, IcpSettings, sampleLandmarks
+from mesh_model import MeshModel
+from mesh_profile import ComparisonProfile
+from mesh_results import ComparisonCache
+from vtkmodules.vtkCommonDataModel import vtkPolyData
+from vtkmodules.vtkCommonTransforms import vtkTransform
+import numpy as np
+import os
+import pytest
+
+def movedMesh(filename) -> tuple[MeshModel, vtkPolyData, vtkTransform]:
+	"""
+    Loads a mesh and a slightly rotated and translated copy of it.
+
+    Args:
+        filename (str): File name of the mesh in resources.
+
+    Returns:
+        tuple[MeshModel, vtkPolyData, vtkTransform]: The mesh, the moved copy and the transform that moved it.
+    """
+	mesh = MeshModel()
+	mesh.loadMesh(os.path.abspath(os.path.join('resources', filename)))
+	transform = vtkTransform()
+	transform.RotateWXYZ(8, 1, 2, 0.5)
+	transform.Translate(0.3, -0.2, 0.1)
+	return mesh, MeshModel.applyTransform(mesh.vtkSource.GetOutput(), transform), transform
+
+@pytest.mark.parametrize("method, sampling", [
+	('pointToPoint', 'uniform'),
+	('pointToPoint', 'normalSpace'),
+	('pointToPlane', 'uniform'),
+	('pointToPlane', 'curvature'),
+])
+def test_methodsUndoMotion(method, sampling):
+	"""
+    Aligns a moved copy of a mesh back onto it and checks the motion is undone, in fewer iterations than VTK needs.
+
+    Args:
+        method (str): ICP method.
+        sampling (str): Landmark sampling.
+    """
+	mesh, moved, transform = movedMesh('cone-cut.stl')
+	locator = mesh.getPreparedTarget().getCellLocator()
+	result = MeshModel.alignClosestPoints(moved, mesh.vtkSource.GetOutput(), locator, settings=IcpSettings(method=method, sampling=sampling), icpTarget=mesh.getIcpTarget())
+	vtkResult = MeshModel.alignClosestPoints(moved, mesh.vtkSource.GetOutput(), locator)
+
+	undone = np.array([[result.transform.GetMatrix().GetElement(row, column) for column in range(4)] for row in range(4)])
+	motion = np.array([[transform.GetMatrix().GetElement(row, column) for column in range(4)] for row in range(4)])
+	assert np.abs(undone @ motion - np.eye(4)).max() < 1e-3
+	assert result.method == method and result.converged
+	assert result.rms < 1e-3 and result.seconds > 0
+	assert result.iterations < vtkResult.iterations
+
+def test_iterationCapNotConverged():
+	"""
+    Checks VTK's ICP reports a run stopped by an iteration budget that is not a multiple of the step as not converged,
+    whether it runs in steps (cancellable) or in one go.
+    """
+	mesh, moved, _ = movedMesh('cone-cut.stl')
+	locator = mesh.getPreparedTarget().getCellLocator()
+	settings = IcpSettings(maxIterations=ICP_ITERATION_STEP + 3, tolerance=0.0)
+	for cancelled in (None, lambda: False):
+		result = MeshModel.alignClosestPoints(moved, mesh.vtkSource.GetOutput(), locator, cancelled=cancelled, settings=settings)
+		assert result.iterations == settings.maxIterations
+		assert not result.converged
+
+@pytest.mark.parametrize("method", ['pointToPoint', 'pointToPlane'])
+def test_stalledDiagnostics(method):
+	"""
+    Aligns two different shapes, which stalls rather than converges, and checks the diagnostics describe the pose that
+    is returned: its RMS and mean motion, with the convergence flag following from that motion.
+
+    Args:
+        method (str): ICP method.
+    """
+	source = MeshModel()
+	source.loadMesh(os.path.abspath('resources/M5-Nut.stl'))
+	target = MeshModel()
+	target.loadMesh(os.path.abspath('resources/cone.stl'))
+	settings = IcpSettings(method=method)
+	result = target.getIcpTarget().align(source.vtkSource.GetOutput(), settings)
+
+	assert not result.converged
+	assert result.converged == (result.meanMotion < settings.tolerance)
+	assert result.rms < np.inf and result.meanMotion < np.inf
+
+def test_sampleLandmarks():
+	"""
+    Checks every sampling returns the requested number of distinct landmarks, the same ones on every call.
+    """
+	mesh = MeshModel()
+	mesh.loadMesh(os.path.abspath('resources/M5-Nut.stl'))
+	polyData = mesh.vtkSource.GetOutput()
+	for sampling in ('uniform', 'normalSpace', 'curvature'):
+		landmarks = sampleLandmarks(polyData, IcpSettings(sampling=sampling, landmarks=50))
+		assert len(np.unique(landmarks)) == 50
+		assert np.array_equal(landmarks, sampleLandmarks(polyData, IcpSettings(sampling=sampling, landmarks=50)))
+	assert len(sampleLandmarks(polyData, IcpSettings(landmarks=10**9))) == polyData.GetNumberOfPoints()
+
+def test_icpTargetReused():
+	"""
+    Checks the model keeps its ICP target, and its KD-tree, until the mesh changes.
+    """
+	mesh = MeshModel()
+	mesh.setConeSource(2, 4)
+	icpTarget = mesh.getIcpTarget()
+	tree = icpTarget.getTree()
+	assert mesh.getIcpTarget() is icpTarget and icpTarget.getTree() is tree
+	assert icpTarget.getNormals().shape == (mesh.vtkSource.GetOutput().GetNumberOfPoints(), 3)
+
+	mesh.scaleMesh(2)
+	assert mesh.getIcpTarget() is not icpTarget
+
+@pytest.mark.parametrize("multiresolution", [False, True])
+def test_compareWithSettings(multiresolution):
+	"""
+    Compares a mesh against a rotated copy with point to plane ICP, checks the diagnostics are profiled and that
+    results for different settings are cached separately.
+
+    Args:
+        multiresolution (bool): Whether to compare coarse to fine.
+    """
+	source = MeshModel()
+	source.loadMesh(os.path.abspath('resources/cone-cut.stl'))
+	target = MeshModel()
+	target.loadMesh(os.path.abspath('resources/cone-cut-rotated.stl'))
+	resultCache = ComparisonCache()
+	profile = ComparisonProfile(traceMemory=False)
+	settings = IcpSettings(method='pointToPlane', sampling='normalSpace')
+
+	result = MeshModel.compareMeshes(source, target, 0.01, resultCache=resultCache, multiresolution=multiresolution, profile=profile, icp=settings)
+	assert result[0]
+	icpStage = profile.getStage('icp')
+	assert icpStage.counts['method'] == 'pointToPlane' and icpStage.counts['iterations'] > 0
+	assert 'rms' in icpStage.counts and 'converged' in icpStage.counts
+
+	MeshModel.compareMeshes(source, target, 0.01, resultCache=resultCache, multiresolution=multiresolution)
+	assert len(resultCache) == 2
+
+@pytest.mark.parametrize("method", ['vtk', 'pointToPlane'])
+def test_alignHypotheses(method):
+	"""
+    Refines a flipped and a near starting pose side by side, and checks the flipped one is pruned while the near one
+    undoes the motion, the same way on every run.
+
+    Args:
+        method (str): ICP method.
+    """
+	mesh, moved, transform = movedMesh('cone-cut.stl')
+	locator = mesh.getPreparedTarget().getCellLocator()
+	flipped = vtkTransform()
+	flipped.RotateX(180)
+	settings = IcpSettings(method=method)
+	results = MeshModel.alignHypotheses(moved, [flipped, vtkTransform()], mesh.vtkSource.GetOutput(), locator, settings=settings, icpTarget=mesh.getIcpTarget(), workers=2)
+	flippedResult = MeshModel.alignClosestPoints(MeshModel.applyTransform(moved, flipped), mesh.vtkSource.GetOutput(), locator, settings=settings, icpTarget=mesh.getIcpTarget())
+
+	assert len(results) == 1 and results[0].rms < flippedResult.rms / 100
+	undone = np.array([[results[0].transform.GetMatrix().GetElement(row, column) for column in range(4)] for row in range(4)])
+	motion = np.array([[transform.GetMatrix().GetElement(row, column) for column in range(4)] for row in range(4)])
+	assert np.abs(undone @ motion - np.eye(4)).max() < 1e-3
+
+	repeated = MeshModel.alignHypotheses(moved, [flipped, vtkTransform()], mesh.vtkSource.GetOutput(), locator, settings=settings, icpTarget=mesh.getIcpTarget(), workers=2)
+	assert [result.rms for result in repeated] == [result.rms for result in results]
+
+@pytest.mark.parametrize("multiresolution", [False, True])
+def test_compareWithHypotheses(multiresolution):
+	"""
+    Compares a mesh against a rotated copy with several ICP hypotheses, and checks the result is at least as good as a
+    single run's and that the hypotheses are profiled.
+
+    Args:
+        multiresolution (bool): Whether to compare coarse to fine.
+    """
+	source = MeshModel()
+	source.loadMesh(os.path.abspath('resources/M5-Nut.stl'))
+	target = MeshModel()
+	target.setPolyData(movedMesh('M5-Nut.stl')[1])
+	profile = ComparisonProfile(traceMemory=False)
+
+	single = MeshModel.compareMeshesLazy(source, target, 0.01, resultCache=None, multiresolution=multiresolution)
+	multiple = MeshModel.compareMeshesLazy(source, target, 0.01, resultCache=None, multiresolution=multiresolution, profile=profile, icp=IcpSettings(hypotheses=4))
+	assert multiple.result and multiple.icpHausDist <= single.icpHausDist + 1e-6
+	icpStage = profile.getStage('icp')
+	assert icpStage.counts['hypotheses'] == 4 and 0 <= icpStage.counts['pruned'] < 4
@@ -0,0 +1,135 @@
+from mesh_io import readMesh, writeMesh, readBinaryStl, mergeVertices
+from mesh_model import MeshModel
+from vtkmodules.util.numpy_support import numpy_to_vtk, vtk_to_numpy
+from vtkmodules.vtkCommonDataModel import vtkPolyData
+from vtkmodules.vtkIOGeometry import vtkSTLReader
+from vtkmodules.vtkIOPLY import vtkPLYReader
+import numpy as np
+import os
+import pytest
+
+def assertSameMesh(polyData, otherPolyData):
+	"""
+    Checks two meshes have identical points and polygons.
+
+    Args:
+        polyData (vtkPolyData): First mesh.
+        otherPolyData (vtkPolyData): Second mesh.
+    """
+	assert np.array_equal(vtk_to_numpy(polyData.GetPoints().GetData()), vtk_to_numpy(otherPolyData.GetPoints().GetData()))
+	assert np.array_equal(vtk_to_numpy(polyData.GetPolys().GetOffsetsArray()), vtk_to_numpy(otherPolyData.GetPolys().GetOffsetsArray()))
+	assert np.array_equal(vtk_to_numpy(polyData.GetPolys().GetConnectivityArray()), vtk_to_numpy(otherPolyData.GetPolys().GetConnectivityArray()))
+
+@pytest.mark.parametrize("meshPath", [
+    'resources/cone.stl',
+	'resources/cone-cut.stl',
+	'resources/M5-Nut.stl',
+])
+def test_readBinaryStl(meshPath):
+	"""
+    Checks the fast path reads binary STL files exactly as vtkSTLReader does, point order included.
+
+    Args:
+        meshPath (str): Filepath of the mesh.
+    """
+	reader = vtkSTLReader()
+	reader.SetFileName(meshPath)
+	reader.Update()
+	assertSameMesh(readMesh(meshPath), reader.GetOutput())
+
+@pytest.mark.parametrize("meshPath", [
+    'resources/cone-scaled2x.stl',
+	'resources/sphere.stl',
+	'resources/cone.ply',
+])
+def test_readFallback(meshPath):
+	"""
+    Checks files the fast path does not handle (ASCII STL, mixed polygon PLY) are left to the VTK readers.
+
+    Args:
+        meshPath (str): Filepath of the mesh.
+    """
+	assert readMesh(meshPath) is None
+	mesh = MeshModel()
+	assert mesh.loadMesh(os.path.abspath(meshPath))
+	assert mesh.vtkSource.GetOutput().GetNumberOfCells() > 0
+
+def test_mergeVertices():
+	"""
+    Checks vertices are merged across chunks, numbered by first use, with -0.0 and 0.0 treated as the same point.
+    """
+	triangles = np.array([
+		[[0, 0, 0], [1, 0, 0], [0, 1, 0]],
+		[[1, 0, 0], [0, 1, 0], [1, 1, 0]],
+		[[-0.0, 0, 0], [1, 1, 0], [0, 0, 1]],
+	], dtype=np.float32)
+	points, indices = mergeVertices([triangles[:2], triangles[2:]], len(triangles))
+
+	assert np.array_equal(points, np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [1, 1, 0], [0, 0, 1]], dtype=np.float32))
+	assert np.array_equal(indices, np.array([[0, 1, 2], [1, 2, 3], [0, 3, 4]]))
+
+@pytest.mark.parametrize("extension, reader", [
+    ('.stl', vtkSTLReader),
+	('.ply', vtkPLYReader),
+])
+def test_writeRoundTrip(extension, reader, tmp_path):
+	"""
+    Writes a mesh in small chunks through the fast path and checks both the fast path and VTK read it back unchanged.
+
+    Args:
+        extension (str): File format to write.
+        reader (type): VTK reader class for the format.
+        tmp_path (pathlib.Path): Temporary directory for the written file.
+    """
+	mesh = MeshModel()
+	mesh.setSphereSource(5)
+	polyData = mesh.vtkSource.GetOutput()
+	filepath = str(tmp_path / ("sphere" + extension))
+	assert mesh.saveMesh(filepath)
+
+	vtkReader = reader()
+	vtkReader.SetFileName(filepath)
+	vtkReader.Update()
+	assertSameMesh(readMesh(filepath), vtkReader.GetOutput())
+	assert readMesh(filepath).GetNumberOfPolys() == polyData.GetNumberOfPolys()
+
+	# Same set of points (STL does not store the point order)
+	writtenPoints = np.unique(vtk_to_numpy(readMesh(filepath).GetPoints().GetData()), axis=0)
+	assert np.array_equal(writtenPoints, np.unique(vtk_to_numpy(polyData.GetPoints().GetData()).astype(np.float32), axis=0))
+
+def test_writeUnsupported(tmp_path):
+	"""
+    Checks meshes with mixed polygon sizes are left to the VTK writers.
+    """
+	mesh = MeshModel()
+	mesh.setConeSource(5, 10)
+	assert not writeMesh(str(tmp_path / "cone.ply"), mesh.vtkSource.GetOutput())
+	assert mesh.saveMesh(str(tmp_path / "cone.ply"))
+	assert readBinaryStl(str(tmp_path / "cone.ply")) is None
+
+def test_writePlyPointData(tmp_path):
+	"""
+    Checks the PLY fast path keeps point normals, colours and texture coordinates, readable by both readers.
+    """
+	mesh = MeshModel()
+	mesh.setSphereSource(5)
+	polyData = vtkPolyData()
+	polyData.DeepCopy(mesh.vtkSource.GetOutput())
+	pointCount = polyData.GetNumberOfPoints()
+	colours = numpy_to_vtk(np.arange(pointCount * 4).reshape(-1, 4).astype(np.uint8), deep=True)
+	colours.SetName("RGBA")
+	polyData.GetPointData().AddArray(colours)
+	tcoords = numpy_to_vtk(np.random.default_rng(0).random((pointCount, 2)).astype(np.float32), deep=True)
+	tcoords.SetName("TCoords")
+	polyData.GetPointData().SetTCoords(tcoords)
+	filepath = str(tmp_path / "sphere.ply")
+	assert writeMesh(filepath, polyData)
+
+	vtkReader = vtkPLYReader()
+	vtkReader.SetFileName(filepath)
+	vtkReader.Update()
+	for writtenPolyData in (readMesh(filepath), vtkReader.GetOutput()):
+		pointData = writtenPolyData.GetPointData()
+		assert np.allclose(vtk_to_numpy(pointData.GetNormals()), vtk_to_numpy(polyData.GetPointData().GetNormals()))
+		assert np.array_equal(vtk_to_numpy(pointData.GetTCoords()), vtk_to_numpy(tcoords))
+	assert np.array_equal(vtk_to_numpy(readMesh(filepath).GetPointData().GetArray("RGBA")), vtk_to_numpy(colours))
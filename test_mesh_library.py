@@ -0,0 +1,101 @@
+from mesh_library import MeshLibrary
+from mesh_model import MeshModel
+import shutil
+import os
+import pytest
+
+def test_queryRanksSameShapeFirst():
+	"""
+    Indexes the resource meshes and checks a rotated copy of a mesh ranks its original (and itself) ahead of every
+    other shape, and that a scaled copy ranks the scaled original first.
+    """
+	library = MeshLibrary()
+	for filename in sorted(os.listdir('resources')):
+		assert library.addFile(os.path.join('resources', filename))
+	assert len(library) == len(os.listdir('resources'))
+
+	query = MeshModel()
+	query.loadMesh(os.path.abspath('resources/cone-cut-rotated.stl'))
+	names = [os.path.basename(name) for name, _ in library.query(query, 3)]
+	assert sorted(names[:2]) == ['cone-cut-rotated.stl', 'cone-cut.stl']
+
+	query.loadMesh(os.path.abspath('resources/cone.stl'))
+	query.scaleMesh(2)
+	assert os.path.basename(library.query(query, 1)[0][0]) == 'cone-scaled2x.stl'
+
+def test_addRemovePersist(tmp_path):
+	"""
+    Adds and removes references, saves the index and checks a library loaded from it returns the same candidates.
+    """
+	libraryPath = str(tmp_path / "library.json")
+	library = MeshLibrary(libraryPath)
+	sphere = MeshModel()
+	sphere.setSphereSource(2)
+	cone = MeshModel()
+	cone.setConeSource(2, 4)
+	library.add("sphere", sphere)
+	library.add("cone", cone)
+	library.add("bigCone", cone)
+	assert library.query(cone, 1)[0][0] in ("cone", "bigCone")
+
+	assert library.remove("bigCone") and not library.remove("bigCone")
+	assert library.query(cone, 5)[0] == ("cone", 0.0)
+	library.save()
+
+	loaded = MeshLibrary(libraryPath)
+	assert len(loaded) == 2 and "sphere" in loaded and "bigCone" not in loaded
+	assert loaded.query(sphere, 5) == library.query(sphere, 5)
+	assert MeshLibrary().query(sphere) == []
+
+def test_addFileIncremental(tmp_path):
+	"""
+    Checks an unchanged file is not measured again, and a changed one is.
+    """
+	meshPath = str(tmp_path / "part.stl")
+	shutil.copy('resources/cone.stl', meshPath)
+	library = MeshLibrary()
+	assert library.addFile(meshPath)
+	entry = library.entries[meshPath]
+	assert library.addFile(meshPath) and library.entries[meshPath] is entry
+
+	shutil.copy('resources/sphere.stl', meshPath)
+	assert library.addFile(meshPath) and library.entries[meshPath] is not entry
+	assert not library.addFile(str(tmp_path / "missing.stl"))
+
+def test_identify():
+	"""
+    Identifies a rotated mesh, checking only the shortlisted candidates are compared and the original is matched.
+    """
+	library = MeshLibrary()
+	for filename in ('cone-cut.stl', 'cone.stl', 'sphere.stl', 'M5-Nut.stl'):
+		library.addFile(os.path.join('resources', filename))
+	query = MeshModel()
+	query.loadMesh(os.path.abspath('resources/cone-cut-rotated.stl'))
+
+	matches = library.identify(query, 0.01, k=2)
+	assert len(matches) == 2
+	assert os.path.basename(matches[0].name) == 'cone-cut.stl' and matches[0].result
+	assert not matches[1].result
+
+def test_emptyMeshes(tmp_path, monkeypatch):
+	"""
+    Checks empty meshes are refused when indexing, and that a reference failing its comparison is reported as not
+    matching instead of aborting the identification.
+    """
+	emptyPath = str(tmp_path / "empty.stl")
+	with open(emptyPath, "wb") as emptyFile:
+		emptyFile.write(b" " * 80 + (0).to_bytes(4, "little"))			# Binary STL header with no triangles
+	library = MeshLibrary()
+	with pytest.raises(ValueError):
+		library.add("empty", MeshModel())
+	assert not library.addFile(emptyPath)
+	assert len(library) == 0
+
+	library.addFile('resources/cone.stl')
+	query = MeshModel()
+	query.loadMesh(os.path.abspath('resources/cone.stl'))
+	def failingCompare(*args, **kwargs):
+		raise RuntimeError("broken reference")
+	monkeypatch.setattr(MeshModel, "compareMeshesLazy", failingCompare)
+	matches = library.identify(query, 0.01)
+	assert len(matches) == 1 and not matches[0].result and matches[0].icpHausDist is None
@@ -0,0 +1,93 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from mesh_model import MeshModel
+from mesh_lod import decimateMesh
+from vtkmodules.util.numpy_support import numpy_to_vtk, vtk_to_numpy
+from vtkmodules.vtkFiltersSources import vtkSphereSource
+import numpy as np
+import os
+
+def denseSphere(resolution=300) -> MeshModel:
+	"""
+    Creates a sphere with many more cells than a small level of detail budget.
+
+    Args:
+        resolution (int): Theta and phi resolution of the sphere.
+
+    Returns:
+        MeshModel: The sphere.
+    """
+	sphereSource = vtkSphereSource()
+	sphereSource.SetRadius(2.0)
+	sphereSource.SetThetaResolution(resolution)
+	sphereSource.SetPhiResolution(resolution)
+	return MeshModel(sphereSource)
+
+def test_decimateMesh():
+	"""
+    Checks the coarse level fits the cell budget, keeps the mesh's extent and carries its point scalars over.
+    """
+	polyData = denseSphere().vtkSource.GetOutput()
+	distances = numpy_to_vtk(np.linalg.norm(vtk_to_numpy(polyData.GetPoints().GetData()), axis=1) + 1.0)
+	distances.SetName("Distance")
+	polyData.GetPointData().SetScalars(distances)
+	level = decimateMesh(polyData, 5000)
+
+	assert 1000 < level.GetNumberOfCells() <= 5000
+	assert np.allclose(level.GetBounds(), polyData.GetBounds(), atol=0.1)
+	scalars = level.GetPointData().GetScalars()
+	assert scalars.GetName() == "Distance" and scalars.GetNumberOfTuples() == level.GetNumberOfPoints()
+	assert np.allclose(vtk_to_numpy(scalars), 3.0, atol=1e-6)
+
+def test_decimateSmallMesh():
+	"""
+    Checks meshes within the budget, and meshes without polygons, get no coarse level.
+    """
+	mesh = MeshModel()
+	mesh.loadMesh(os.path.abspath('resources/cone-cut.stl'))
+
+	assert decimateMesh(mesh.vtkSource.GetOutput()) is None
+	assert decimateMesh(mesh.vtkSource.GetOutput(), 10) is not None
+	assert decimateMesh(denseSphere().getPyramid().getLevel(1).polyData, 10) is None
+
+def test_interactiveLevel():
+	"""
+    Checks the model caches its coarse level, scales it with the mesh and rebuilds it when the mesh changes.
+    """
+	mesh = denseSphere(800)
+	level = mesh.getInteractiveLevel()
+	assert level is not None and mesh.getInteractiveLevel() is level
+
+	mesh.scaleMesh(3)
+	assert np.allclose(mesh.getInteractiveLevel().GetBounds(), [3 * bound for bound in level.GetBounds()])
+
+	mesh.setConeSource(5, 10)
+	assert mesh.getInteractiveLevel() is None
+	assert MeshModel().getInteractiveLevel() is None
+
+def test_interactiveLevelConcurrent():
+	"""
+    Checks building the coarse level on worker threads while another thread reads the mesh's other properties leaves
+    every thread with the same cached values.
+    """
+	mesh = denseSphere(800)
+	barrier = threading.Barrier(4)
+
+	def buildLevel():
+		barrier.wait()
+		return mesh.getInteractiveLevel()
+
+	def readProperties():
+		barrier.wait()
+		return mesh.getOrientedBox(), mesh.getVolume()
+
+	with ThreadPoolExecutor(max_workers=4) as executor:
+		levels = [executor.submit(buildLevel) for _ in range(2)]
+		properties = [executor.submit(readProperties) for _ in range(2)]
+		levels = [future.result() for future in levels]
+		properties = [future.result() for future in properties]
+
+	assert levels[0] is not None and all(level is mesh.getInteractiveLevel() for level in levels)
+	assert properties[0][1] == properties[1][1] == mesh.getVolume()
+	assert np.array_equal(properties[0][0].axes, properties[1][0].axes)
+	assert set(mesh.baseProperties[1]) == {"interactiveLevel", "orientedBox", "massProperties"}
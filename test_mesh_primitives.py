@@ -0,0 +1,82 @@
+from mesh_model import MeshModel
+from mesh_primitives import MAX_RESOLUTION, MIN_RESOLUTION, PRIMITIVE_CACHE_ENTRIES, chordResolution, unitPrimitive
+from vtkmodules.util.numpy_support import vtk_to_numpy
+from vtkmodules.vtkFiltersSources import vtkConeSource, vtkSphereSource
+import numpy as np
+import math
+import pytest
+
+@pytest.mark.parametrize("radius, chordError", [
+    (1, 0.001),
+    (25, 0.01),
+    (0.01, 0.001),
+])
+def test_chordResolution(radius, chordError):
+	"""
+    Checks the chosen number of segments keeps the sagitta within the chord error, and that one segment fewer would not.
+
+    Args:
+        radius (double): Radius of the circle.
+        chordError (double): Largest allowed distance between a segment and the circle.
+    """
+	resolution = chordResolution(radius, chordError)
+
+	assert MIN_RESOLUTION <= resolution <= MAX_RESOLUTION
+	assert radius * (1 - math.cos(math.pi / resolution)) <= chordError or resolution == MAX_RESOLUTION
+	assert radius * (1 - math.cos(math.pi / (resolution - 1))) > chordError or resolution == MIN_RESOLUTION
+
+def test_primitivesMatchSources():
+	"""
+    Checks spheres and cones built from the cached unit primitives have exactly the points and cells of the VTK
+    sources they replace.
+    """
+	sphereSource = vtkSphereSource()
+	sphereSource.SetRadius(2.57)
+	sphereSource.SetPhiResolution(100)
+	sphereSource.SetThetaResolution(100)
+	coneSource = vtkConeSource()
+	coneSource.SetRadius(1.27)
+	coneSource.SetHeight(5.89)
+	coneSource.SetResolution(500)
+
+	mesh = MeshModel()
+	for setPrimitive, source in [(lambda: mesh.setSphereSource(2.57), sphereSource), (lambda: mesh.setConeSource(1.27, 5.89), coneSource)]:
+		setPrimitive()
+		source.Update()
+		polyData = mesh.vtkSource.GetOutput()
+		expected = source.GetOutput()
+
+		assert np.array_equal(vtk_to_numpy(polyData.GetPoints().GetData()), vtk_to_numpy(expected.GetPoints().GetData()))
+		assert np.array_equal(vtk_to_numpy(polyData.GetPolys().GetConnectivityArray()), vtk_to_numpy(expected.GetPolys().GetConnectivityArray()))
+
+def test_primitiveCache():
+	"""
+    Checks primitives of the same shape and resolution share one cached tessellation, and that the cache is bounded.
+    """
+	first, second = MeshModel(), MeshModel()
+	first.setSphereSource(1, resolution=20)
+	second.setSphereSource(5, resolution=20)
+
+	assert unitPrimitive("sphere", 20) is unitPrimitive("sphere", 20)
+	assert first.vtkSource.GetOutput().GetPolys().GetConnectivityArray() is second.vtkSource.GetOutput().GetPolys().GetConnectivityArray()
+	assert np.allclose(second.getBounds(), [5 * bound for bound in first.getBounds()], atol=1e-5)
+
+	unitSphere = unitPrimitive("sphere", 20)
+	for resolution in range(30, 30 + PRIMITIVE_CACHE_ENTRIES):
+		unitPrimitive("cone", resolution)
+	assert unitPrimitive("sphere", 20) is not unitSphere
+
+def test_chordErrorPrimitives():
+	"""
+    Checks a small sphere made to a chord error has far fewer cells than the default, while staying within the error
+    of the true surface.
+    """
+	mesh = MeshModel()
+	mesh.setSphereSource(0.01, chordError=1e-4)
+	points = vtk_to_numpy(mesh.vtkSource.GetOutput().GetPoints().GetData())
+	default = MeshModel()
+	default.setSphereSource(0.01)
+
+	assert mesh.vtkSource.GetOutput().GetNumberOfCells() < default.vtkSource.GetOutput().GetNumberOfCells() / 10
+	assert np.allclose(np.linalg.norm(points, axis=1), 0.01, rtol=1e-6)
+	assert mesh.getVolume() == pytest.approx(4 / 3 * math.pi * 0.01**3, rel=0.05)
@@ -0,0 +1,77 @@
+from mesh_model import MeshModel
+from mesh_profile import ComparisonProfile, profileStage
+import numpy as np
+import json
+import os
+import pytest
+
+def test_nestedStages(tmp_path):
+	"""
+    Records nested stages and checks their nesting, counts, timings and memory, and the exported Chrome trace.
+    """
+	profile = ComparisonProfile()
+	with profile.stage("outer", points=10):
+		with profile.stage("inner"):
+			array = np.ones(1 << 20)											# 8MB, traced by tracemalloc
+			profile.addCounts(iterations=3)
+			profile.addCounts(iterations=4, converged=True)
+		del array
+		profile.addCounts(points=5)
+
+	inner = profile.getStage("inner")
+	outer = profile.getStage("outer")
+	assert [stage.name for stage in profile.stages] == ["inner", "outer"]
+	assert inner.depth == 1 and outer.depth == 0
+	assert inner.counts == {"iterations": 7, "converged": True}
+	assert outer.counts == {"points": 15}
+	assert outer.start <= inner.start and inner.start + inner.seconds <= outer.start + outer.seconds
+	assert inner.peakMemoryBytes >= 8 << 20 and outer.peakMemoryBytes >= inner.peakMemoryBytes
+	assert profile.getStage("missing") is None
+
+	tracePath = str(tmp_path / "trace.json")
+	profile.saveChromeTrace(tracePath)
+	with open(tracePath) as traceFile:
+		events = json.load(traceFile)["traceEvents"]
+	assert [event["name"] for event in events] == ["inner", "outer"]
+	assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
+	assert events[0]["args"]["iterations"] == 7
+
+def test_profileStageDisabled():
+	"""
+    Checks stages opened without a profile run their body and record nothing, and that memory tracing can be turned off.
+    """
+	ran = []
+	with profileStage(None, "stage"):
+		ran.append(True)
+	assert ran == [True]
+
+	profile = ComparisonProfile(traceMemory=False)
+	with profileStage(profile, "stage"):
+		pass
+	assert profile.getStage("stage").peakMemoryBytes is None
+
+@pytest.mark.parametrize("multiresolution", [False, True])
+def test_profiledComparison(multiresolution):
+	"""
+    Profiles a comparison and checks every stage is recorded with its mesh sizes, the ICP iterations are counted, and
+    the results are the same as without a profile.
+
+    Args:
+        multiresolution (bool): Whether to compare coarse to fine.
+    """
+	source = MeshModel()
+	source.loadMesh(os.path.abspath('resources/cone.stl'))
+	target = MeshModel()
+	target.loadMesh(os.path.abspath('resources/cone.ply'))
+
+	profile = ComparisonProfile()
+	profiled = MeshModel.compareMeshes(source, target, 0.01, resultCache=None, multiresolution=multiresolution, profile=profile)
+	unprofiled = MeshModel.compareMeshes(source, target, 0.01, resultCache=None, multiresolution=multiresolution)
+	assert profiled[0] == unprofiled[0] and profiled[2:] == unprofiled[2:]
+
+	names = {stage.name for stage in profile.stages}
+	assert {"resultLookup", "buildIndex", "noAlignment", "obb", "icp", "icpDistance"} <= names
+	assert profile.getStage("resultLookup").counts["hit"] is False
+	assert profile.getStage("noAlignment").counts["sourcePoints"] == source.vtkSource.GetOutput().GetNumberOfPoints()
+	assert profile.getStage("obb").counts["orientationsEvaluated"] > 0
+	assert sum(stage.counts.get("iterations", 0) for stage in profile.stages if stage.name == "icp") > 0
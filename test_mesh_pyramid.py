@@ -0,0 +1,95 @@
+from mesh_model import MeshModel
+from mesh_pyramid import MeshPyramid
+from mesh_distance import PreparedTarget
+from vtkmodules.util.numpy_support import vtk_to_numpy
+from vtkmodules.vtkFiltersModeling import vtkLinearSubdivisionFilter
+from scipy.spatial import cKDTree
+import os
+import pytest
+
+def loadDenseMesh(filepath, subdivisions=2) -> MeshModel:
+	"""
+    Loads a mesh from the resources folder and subdivides it, so it is large enough to have coarse levels.
+
+    Args:
+        filepath (str): Relative filepath of the mesh.
+        subdivisions (int): Number of linear subdivision passes, each quadruples the triangle count.
+
+    Returns:
+        MeshModel: The subdivided mesh.
+    """
+	mesh = MeshModel()
+	mesh.loadMesh(os.path.abspath(filepath))
+	subdivisionFilter = vtkLinearSubdivisionFilter()
+	subdivisionFilter.SetInputConnection(mesh.vtkSource.GetOutputPort())
+	subdivisionFilter.SetNumberOfSubdivisions(subdivisions)
+	return MeshModel(subdivisionFilter)
+
+def test_pyramidLevels():
+	"""
+    Checks each level is smaller than the last and that its covering radius really bounds the distance from every full
+    resolution point to the level.
+    """
+	polyData = loadDenseMesh('resources/cone-cut.stl').vtkSource.GetOutput()
+	pyramid = MeshPyramid(polyData, minPoints=256)
+	points = vtk_to_numpy(polyData.GetPoints().GetData())
+
+	assert len(pyramid.levels) > 2
+	assert pyramid.levels[0].polyData is polyData
+	for finer, coarser in zip(pyramid.levels, pyramid.levels[1:]):
+		assert coarser.polyData.GetNumberOfPoints() <= finer.polyData.GetNumberOfPoints() // 2
+		assert coarser.coveringRadius >= finer.coveringRadius
+		distances, _ = cKDTree(vtk_to_numpy(coarser.polyData.GetPoints().GetData())).query(points)
+		assert distances.max() <= coarser.coveringRadius + 1e-9
+	assert pyramid.levels[-1].polyData.GetNumberOfPoints() <= 256 or len(pyramid.levels) == 5
+	assert pyramid.getLevel(100) is pyramid.levels[-1]
+
+def test_pyramidBlocks():
+	"""
+    Checks subsampling the points a block at a time gives exactly the levels of subsampling them all at once.
+    """
+	polyData = loadDenseMesh('resources/M5-Screw.stl').vtkSource.GetOutput()
+	pyramid = MeshPyramid(polyData, minPoints=256)
+	blockPyramid = MeshPyramid(polyData, minPoints=256, blockPoints=1000)
+
+	assert len(blockPyramid.levels) == len(pyramid.levels) > 2
+	for level, blockLevel in zip(pyramid.levels[1:], blockPyramid.levels[1:]):
+		assert blockLevel.coveringRadius == level.coveringRadius and blockLevel.voxelSize == level.voxelSize
+		assert (vtk_to_numpy(blockLevel.polyData.GetPoints().GetData()) == vtk_to_numpy(level.polyData.GetPoints().GetData())).all()
+
+def test_pyramidSmallMesh():
+	"""
+    Checks meshes with few points are left at full resolution.
+    """
+	mesh = MeshModel()
+	mesh.setConeSource(5, 10)
+	pyramid = mesh.getPyramid()
+
+	assert len(pyramid.levels) == 1
+	assert mesh.getPyramid() is pyramid
+
+# Test cases: same mesh, rotated copy, different shapes
+@pytest.mark.parametrize("sourceMesh, targetMesh, expectedResult", [
+    ('resources/cone-cut.stl', 'resources/cone-cut.stl', True),
+	('resources/cone-cut.stl', 'resources/cone-cut-rotated.stl', True),
+	('resources/cone.stl', 'resources/cone-cut.stl', False),
+	('resources/M5-Nut.stl', 'resources/cone.stl', False),
+])
+def test_compareMeshesMultiresolution(sourceMesh, targetMesh, expectedResult):
+	"""
+    Compares dense meshes coarse to fine and checks the verdict, and that distances below the threshold are exact.
+
+    Args:
+        sourceMesh (str): Source mesh filepath.
+        targetMesh (str): Target mesh filepath.
+        expectedResult (bool): Expected result of the comparison.
+    """
+	source = loadDenseMesh(sourceMesh)
+	target = loadDenseMesh(targetMesh)
+	result, alignedSource, *distances = MeshModel.compareMeshes(source, target, 0.01, resultCache=None, multiresolution=True, exact=False)
+
+	assert result == expectedResult
+	if result:
+		alignedIndex = PreparedTarget(alignedSource)
+		assert target.getPreparedTarget().hausdorffDistance(alignedIndex) == pytest.approx(min(distances), abs=1e-6)
+	assert MeshModel.compareMeshes(source, target, 0.01, resultCache=None, outOfCore=True, exact=False)[0] == expectedResult
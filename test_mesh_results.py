@@ -0,0 +1,84 @@
+from mesh_model import MeshModel
+from mesh_results import ComparisonCache, ComparisonRecord
+from mesh_distance import PreparedTarget
+import os
+import pytest
+
+def loadMesh(filepath) -> MeshModel:
+	"""
+    Loads a mesh from the resources folder.
+
+    Args:
+        filepath (str): Relative filepath of the mesh.
+
+    Returns:
+        MeshModel: The loaded mesh.
+    """
+	mesh = MeshModel()
+	mesh.loadMesh(os.path.abspath(filepath))
+	return mesh
+
+def test_fingerprint():
+	"""
+    Checks fingerprints are equal for equal geometry and change with the geometry and the scale.
+    """
+	cone = loadMesh('resources/cone.stl')
+	otherCone = loadMesh('resources/cone.stl')
+	sphere = loadMesh('resources/sphere.stl')
+
+	assert MeshModel().getFingerprint() is None
+	assert cone.getFingerprint() == otherCone.getFingerprint()
+	assert cone.getFingerprint() != sphere.getFingerprint()
+
+	fingerprint = cone.getFingerprint()
+	cone.scaleMesh(2)
+	assert cone.getFingerprint() != fingerprint
+	cone.resetScale()
+	assert cone.getFingerprint() == fingerprint
+
+@pytest.mark.parametrize("sourceMesh, targetMesh", [
+    ('resources/cone.stl', 'resources/cone.stl'),
+	('resources/cone-cut.stl', 'resources/cone-cut-rotated.stl'),
+	('resources/cone.stl', 'resources/cone.ply'),
+])
+def test_compareMeshesMemoized(sourceMesh, targetMesh):
+	"""
+    Compares a pair twice and checks the second comparison is served from the cache with identical distances and an
+    aligned source matching the first one.
+
+    Args:
+        sourceMesh (str): Source mesh filepath.
+        targetMesh (str): Target mesh filepath.
+    """
+	resultCache = ComparisonCache()
+	source = loadMesh(sourceMesh)
+	target = loadMesh(targetMesh)
+
+	first = MeshModel.compareMeshes(source, target, 0.01, resultCache=resultCache)
+	second = MeshModel.compareMeshes(source, target, 0.01, resultCache=resultCache)
+	assert resultCache.hits == 1 and resultCache.misses == 1
+	assert second[0] == first[0]
+	assert second[2:] == first[2:]
+
+	alignedDistance = PreparedTarget(target.vtkSource.GetOutput()).hausdorffDistance(PreparedTarget(second[1]))
+	assert alignedDistance == pytest.approx(min(first[2:]), abs=1e-6)
+
+	# Exact distances are reused across thresholds, the verdict is not
+	third = MeshModel.compareMeshes(source, target, 1e9, resultCache=resultCache)
+	assert resultCache.hits == 2
+	assert third[0]
+
+def test_comparisonCacheBound():
+	"""
+    Checks the cache holds at most maxEntries records and evicts the least recently used first.
+    """
+	resultCache = ComparisonCache(maxEntries=2)
+	record = ComparisonRecord(0.0, 0.0, 0.0)
+	resultCache.put("a", record)
+	resultCache.put("b", record)
+	resultCache.get("a")
+	resultCache.put("c", record)
+
+	assert len(resultCache) == 2
+	assert resultCache.get("b") is None
+	assert resultCache.get("a") is record and resultCache.get("c") is record
@@ -0,0 +1,124 @@
+from mesh_cache import MeshCache
+from mesh_distance import KDTreeTarget
+from mesh_model import DISTANCE_BACKENDS, MeshModel
+from mesh_tiles import TiledTarget
+from test_mesh_pyramid import loadDenseMesh
+from vtkmodules.vtkCommonTransforms import vtkTransform
+import numpy as np
+import functools
+import os
+import pytest
+
+def similarityTransform() -> vtkTransform:
+	"""
+    Creates a rotated, scaled and shifted similarity transform.
+
+    Returns:
+        vtkTransform: The transform.
+    """
+	transform = vtkTransform()
+	transform.Translate(0.3, -0.2, 0.1)
+	transform.RotateZ(20)
+	transform.Scale(1.1, 1.1, 1.1)
+	return transform
+
+def test_tiles(tmp_path):
+	"""
+    Checks the points are split into bounded tiles written to disk, that every point lands in exactly one tile inside its
+    bounding box, and that the tiles are removed with the index.
+
+    Args:
+        tmp_path (pathlib.Path): Directory to write the tiles in.
+    """
+	polyData = loadDenseMesh('resources/cone-cut.stl', 4).vtkSource.GetOutput()
+	tiled = TiledTarget(polyData, tilePoints=2000, directory=str(tmp_path))
+	points = np.asarray(KDTreeTarget(polyData).pointArray)
+
+	tileSizes = np.diff(tiled.tileStarts)
+	assert len(tileSizes) > 4 and tileSizes.max() <= 2 * 2000
+	assert sorted(os.listdir(tiled.directory)) == ["index.npz", "order.npy", "points.npy"]
+	assert (np.sort(tiled.order) == np.arange(len(points))).all()
+	assert (tiled.points == points[tiled.order]).all()
+	for tile in range(len(tileSizes)):
+		tilePoints = tiled.points[tiled.tileStarts[tile]:tiled.tileStarts[tile + 1]]
+		assert (tilePoints >= tiled.tileMin[tile]).all() and (tilePoints <= tiled.tileMax[tile]).all()
+
+	directory = tiled.directory
+	del tiled
+	assert not os.path.exists(directory)
+
+@pytest.mark.parametrize("sourceMesh, targetMesh", [
+    ('resources/cone-cut.stl', 'resources/cone.stl'),
+	('resources/cone-cut.stl', 'resources/cone-cut-rotated.stl'),
+])
+def test_tiledDistances(sourceMesh, targetMesh):
+	"""
+    Checks distances measured tile by tile, through a tree cache smaller than the mesh, are exactly those of a single
+    KD-tree over the whole mesh.
+
+    Args:
+        sourceMesh (str): Source mesh filepath.
+        targetMesh (str): Target mesh filepath.
+    """
+	source = loadDenseMesh(sourceMesh, 4).vtkSource.GetOutput()
+	target = loadDenseMesh(targetMesh, 4).vtkSource.GetOutput()
+	tiledSource = TiledTarget(source, tilePoints=1500, cachePoints=4000)
+	tiledTarget = TiledTarget(target, tilePoints=1000, cachePoints=4000)
+	sourceIndex, targetIndex = KDTreeTarget(source), KDTreeTarget(target)
+	transform = similarityTransform()
+
+	assert tiledTarget.hausdorffDistance(tiledSource, transform) == targetIndex.hausdorffDistance(sourceIndex, transform)
+	assert tiledTarget.hausdorffDistance(sourceIndex) == targetIndex.hausdorffDistance(sourceIndex)
+	assert sum(tree.n for tree in tiledTarget.trees.values()) <= 4000 or len(tiledTarget.trees) == 1
+
+	field = tiledTarget.distanceField(tiledSource, transform)
+	expected = targetIndex.distanceField(sourceIndex, transform)
+	assert np.array_equal(field.sourceDistances, expected.sourceDistances)
+	assert np.array_equal(field.targetDistances, expected.targetDistances)
+	assert field.sourceStats.worstIndex == expected.sourceStats.worstIndex
+	assert field.sourceStats.worstPoint == pytest.approx(expected.sourceStats.worstPoint, abs=1e-9)
+
+	distances, points = tiledTarget.directedDistances(tiledSource, transform)
+	expectedDistances, expectedPoints = targetIndex.directedDistances(sourceIndex, transform)
+	assert np.array_equal(distances, expectedDistances)
+	assert np.allclose(points, expectedPoints)
+
+def test_tiledBound():
+	"""
+    Checks a bounded query still reports a distance beyond the bound, and exact distances below it.
+    """
+	source = loadDenseMesh('resources/cone-cut.stl', 4).vtkSource.GetOutput()
+	tiledSource = TiledTarget(source, tilePoints=1000)
+	exact = tiledSource.directedDistance(tiledSource, similarityTransform())
+
+	bounded = tiledSource.directedDistance(tiledSource, similarityTransform(), bound=exact / 10)
+	assert exact / 10 < bounded <= exact
+	assert tiledSource.directedDistance(tiledSource, similarityTransform(), bound=exact * 2) == exact
+
+def test_outOfCoreComparison(tmp_path, monkeypatch):
+	"""
+    Compares meshes memory mapped from the mesh cache out of core, with tiles small enough that both meshes span many, and checks it agrees
+    with the in-memory comparison.
+
+    Args:
+        tmp_path (pathlib.Path): Temporary directory for the mesh cache.
+        monkeypatch (pytest.MonkeyPatch): Shrinks the tiles of the "tiled" backend.
+    """
+	monkeypatch.setitem(DISTANCE_BACKENDS, "tiled", functools.partial(TiledTarget, tilePoints=2000))
+	cache = MeshCache(str(tmp_path / "cache"))
+	meshes = []
+	for filepath in ['resources/cone-cut.stl', 'resources/cone-cut-rotated.stl']:
+		denseFilepath = str(tmp_path / (os.path.splitext(os.path.basename(filepath))[0] + ".vtp"))
+		loadDenseMesh(filepath, 4).saveMesh(denseFilepath)
+		mesh = MeshModel()
+		mesh.loadMesh(denseFilepath, cache)
+		mesh.loadMesh(denseFilepath, cache)
+		meshes.append(mesh)
+	source, target = meshes
+	assert cache.hits == 2
+
+	result, _, noAlignmentHausDist, _, icpHausDist = MeshModel.compareMeshes(source, target, 0.01, resultCache=None, outOfCore=True)
+	expected = MeshModel.compareMeshes(source, target, 0.01, resultCache=None, multiresolution=True)
+	assert result == expected[0] == True
+	assert noAlignmentHausDist == pytest.approx(expected[2], abs=1e-6)
+	assert icpHausDist < 0.01